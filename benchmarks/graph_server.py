@@ -0,0 +1,586 @@
+"""A local stand-in for the parts of the Microsoft Graph drive API this SDK uses.
+
+Items are kept in memory. The server answers the endpoints that OneDrive and
+SharePoint call:
+
+    GET  /v1.0/{drive}/root:/{path}               item metadata
+    GET  /v1.0/{drive}/items/{id}                 item metadata
+    GET  /v1.0/{drive}/root/children              listings, paged with $top
+    GET  /v1.0/{drive}/root:/{path}:/children
+    GET  /v1.0/{drive}/items/{id}/children
+    POST /v1.0/{drive}/.../children               create a folder
+    PUT  /v1.0/{drive}/.../content                simple upload
+    GET  /v1.0/{drive}/.../content                redirect to the download URL
+    POST /v1.0/{drive}/.../createUploadSession    upload session
+    PUT  /upload/{session}                        ranged fragment upload
+    GET  /download/{id}                           download URL with Range support
+    POST /v1.0/$batch                             JSON batching
+
+where {drive} is me/drive or drives/{drive_id} (every drive ID shares one
+store). Every request can be delayed by a fixed latency, bodies can be limited
+to a bandwidth and every Nth request can be answered with a 429.
+
+Run it on its own and point a client at the printed base URL:
+
+    python benchmarks/graph_server.py --port 8000 --latency 0.02
+
+    drive = OneDrive("token", base_url="http://127.0.0.1:8000/v1.0")
+"""
+
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from msdrive.ranges import merge_ranges, subtract_ranges
+
+API_PREFIX = "/v1.0"
+DRIVE_PATTERN = re.compile(r"^/(?:me/drive|drives/[^/]+)(/.*)?$")
+ITEM_PATTERN = re.compile(
+    r"^/(?:root|items/(?P<id>[^/:]+))"
+    r"(?::/(?P<path>[^:]*):?)?"
+    r"(?:/(?P<action>children|content|createUploadSession))?$"
+)
+DEFAULT_PAGE_SIZE = 200
+IO_CHUNK_SIZE = 65536
+
+
+class GraphError(Exception):
+    """Answered as a Graph error response"""
+
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+class Store:
+    """Thread-safe in-memory drive."""
+
+    def __init__(self) -> None:
+        self.items = {}
+        self.children = {}
+        self.content = {}
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self.root = self._new_item(None, "root", folder=True)
+
+    def _new_item(self, parent: Optional[dict], name: str, folder: bool) -> dict:
+        item_id = "{:016X}".format(next(self._ids))
+        item = {
+            "id": item_id,
+            "name": name,
+            "size": 0,
+            "eTag": '"{{{}}},1"'.format(item_id),
+            "cTag": '"c:{{{}}},1"'.format(item_id),
+            "lastModifiedDateTime": _now(),
+        }
+
+        if folder:
+            item["folder"] = {"childCount": 0}
+            self.children[item_id] = {}
+        else:
+            item["file"] = {"mimeType": "application/octet-stream"}
+
+        if parent is not None:
+            path = "/drive/root:"
+
+            if "parentReference" in parent:
+                path = parent["parentReference"]["path"] + "/" + parent["name"]
+
+            item["parentReference"] = {"id": parent["id"], "path": path}
+            self.children[parent["id"]][name.lower()] = item_id
+            parent["folder"]["childCount"] += 1
+
+        self.items[item_id] = item
+
+        return item
+
+    def get(self, item_id: Optional[str], path: Optional[str] = None) -> dict:
+        with self._lock:
+            item = self.root if item_id is None else self.items.get(item_id)
+
+            for name in _split_path(path):
+                if item is None or "folder" not in item:
+                    item = None
+                    break
+
+                child_id = self.children[item["id"]].get(name.lower())
+                item = self.items.get(child_id)
+
+            if item is None:
+                raise GraphError(
+                    404, "itemNotFound", "The resource could not be found."
+                )
+
+            return item
+
+    def folder(self, item_id: Optional[str], path: Optional[str]) -> dict:
+        """Get a folder, creating it and any missing parents on the way."""
+        with self._lock:
+            item = self.root if item_id is None else self.get(item_id)
+
+            for name in _split_path(path):
+                child_id = self.children[item["id"]].get(name.lower())
+                item = self.items.get(child_id) or self._new_item(item, name, True)
+
+                if "folder" not in item:
+                    raise GraphError(409, "nameAlreadyExists", "A file has that name.")
+
+            return item
+
+    def create_folder(self, parent: dict, name: str) -> dict:
+        with self._lock:
+            if name.lower() in self.children[parent["id"]]:
+                raise GraphError(409, "nameAlreadyExists", "The name already exists.")
+
+            return self._new_item(parent, name, True)
+
+    def list(self, folder: dict) -> List[dict]:
+        with self._lock:
+            if "folder" not in folder:
+                raise GraphError(400, "invalidRequest", "The item is not a folder.")
+
+            return [self.items[i] for i in self.children[folder["id"]].values()]
+
+    def write(self, item_id: Optional[str], path: Optional[str], data: bytes) -> dict:
+        """Create or replace a file with new content."""
+        with self._lock:
+            parts = _split_path(path)
+
+            if parts:
+                parent = self.folder(item_id, "/".join(parts[:-1]))
+                child_id = self.children[parent["id"]].get(parts[-1].lower())
+                item = self.items.get(child_id) or self._new_item(
+                    parent, parts[-1], False
+                )
+            else:
+                item = self.get(item_id)
+
+            if "folder" in item:
+                raise GraphError(409, "nameAlreadyExists", "A folder has that name.")
+
+            version = int(item["eTag"].rsplit(",", 1)[1].rstrip('"')) + 1
+            item["eTag"] = '"{{{}}},{}"'.format(item["id"], version)
+            item["cTag"] = '"c:{{{}}},{}"'.format(item["id"], version)
+            item["size"] = len(data)
+            item["lastModifiedDateTime"] = _now()
+            self.content[item["id"]] = bytes(data)
+
+            return item
+
+
+class UploadSession:
+    def __init__(self, item_id: Optional[str], path: Optional[str]) -> None:
+        self.item_id = item_id
+        self.path = path
+        self.data = bytearray()
+        self.size = None
+        self.received = []
+        self.lock = threading.Lock()
+
+    def put(self, start: int, data: bytes, size: Optional[int]) -> bool:
+        """Store a fragment, True once the whole file has arrived."""
+        with self.lock:
+            end = start + len(data)
+
+            if size is not None:
+                self.size = size
+
+            if len(self.data) < end:
+                self.data.extend(bytes(end - len(self.data)))
+
+            self.data[start:end] = data
+            self.received = merge_ranges(self.received + [(start, end)])
+
+            return self.size is not None and self.received == [(0, self.size)]
+
+    def next_expected_ranges(self) -> List[str]:
+        if self.size is None:
+            return ["{}-".format(self.received[-1][1] if self.received else 0)]
+
+        missing = subtract_ranges([(0, self.size)], self.received)
+
+        return [
+            "{}-{}".format(s, e - 1) if e < self.size else "{}-".format(s)
+            for s, e in missing
+        ]
+
+
+class GraphServer:
+    """Serves a Store over HTTP on 127.0.0.1 from a background thread.
+
+    Use as a context manager, base_url is the root to pass to OneDrive/SharePoint.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        throttle_every: int = 0,
+        retry_after: float = 0,
+    ) -> None:
+        """Class constructor
+
+        Args:
+            port (int): [OPTIONAL] Port to listen on (default is any free port)
+            latency (float): [OPTIONAL] Seconds to delay every response by
+            bandwidth (float): [OPTIONAL] Bytes per second for each request and response body
+            throttle_every (int): [OPTIONAL] Answer every Nth request with a 429
+            retry_after (float): [OPTIONAL] Retry-After seconds sent with each 429
+        """
+        self.store = Store()
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self._counter_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    @property
+    def base_url(self) -> str:
+        return self.url + API_PREFIX
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def add_file(self, path: str, data: bytes) -> dict:
+        """Seed the drive with a file, creating its folders."""
+        return self.store.write(None, path, data)
+
+    def add_folder(self, path: str) -> dict:
+        """Seed the drive with a folder, creating its parents."""
+        return self.store.folder(None, path)
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "throttled": self.throttled}
+
+    def _should_throttle(self) -> bool:
+        with self._counter_lock:
+            self.requests += 1
+
+            if self.throttle_every and self.requests % self.throttle_every == 0:
+                self.throttled += 1
+                return True
+
+            return False
+
+    def dispatch(
+        self, method: str, target: str, headers: dict, body: bytes
+    ) -> Tuple[int, dict, object]:
+        """Answer one API call, returning (status, headers, JSON or bytes body)."""
+        parts = urlsplit(target)
+        path = parts.path
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+        try:
+            if path.startswith("/upload/"):
+                return self._upload_session(method, path[8:], headers, body)
+
+            if path.startswith("/download/"):
+                return self._download(path[10:], headers)
+
+            if path.startswith(API_PREFIX):
+                path = path[len(API_PREFIX) :]
+
+            if path == "/$batch" and method == "POST":
+                return self._batch(json.loads(body))
+
+            match = DRIVE_PATTERN.match(path)
+            item = match and ITEM_PATTERN.match(unquote(match.group(1) or ""))
+
+            if not item:
+                raise GraphError(400, "invalidRequest", "Unsupported URL: " + path)
+
+            return self._drive(method, item, query, body)
+        except GraphError as err:
+            return (
+                err.status,
+                {},
+                {"error": {"code": err.code, "message": str(err)}},
+            )
+
+    def _drive(self, method: str, match, query: dict, body: bytes) -> tuple:
+        item_id, path, action = match.group("id", "path", "action")
+        store = self.store
+
+        if action is None and method == "GET":
+            return 200, {}, self._item_json(store.get(item_id, path), query)
+
+        if action == "children" and method == "GET":
+            return 200, {}, self._page(store.get(item_id, path), query)
+
+        if action == "children" and method == "POST":
+            data = json.loads(body)
+            folder = store.create_folder(store.folder(item_id, path), data["name"])
+            return 201, {}, self._item_json(folder, query)
+
+        if action == "content" and method == "PUT":
+            return 201, {}, self._item_json(store.write(item_id, path, body), query)
+
+        if action == "content" and method == "GET":
+            location = self._item_json(store.get(item_id, path), {})
+            return 302, {"Location": location["@microsoft.graph.downloadUrl"]}, b""
+
+        if action == "createUploadSession" and method == "POST":
+            session_id = uuid.uuid4().hex
+            store.sessions[session_id] = UploadSession(item_id, path)
+            return (
+                200,
+                {},
+                {
+                    "uploadUrl": "{}/upload/{}".format(self.url, session_id),
+                    "expirationDateTime": _now(86400),
+                    "nextExpectedRanges": ["0-"],
+                },
+            )
+
+        raise GraphError(405, "invalidRequest", "Unsupported method: " + method)
+
+    def _item_json(self, item: dict, query: dict) -> dict:
+        data = dict(item)
+
+        if "file" in data:
+            data["@microsoft.graph.downloadUrl"] = "{}/download/{}".format(
+                self.url, item["id"]
+            )
+
+        return _select(data, query.get("$select"))
+
+    def _page(self, folder: dict, query: dict) -> dict:
+        items = self.store.list(folder)
+        top = int(query.get("$top") or DEFAULT_PAGE_SIZE)
+        skip = int(query.get("$skiptoken") or 0)
+        page = {"value": [self._item_json(i, query) for i in items[skip : skip + top]]}
+
+        if skip + top < len(items):
+            params = {**query, "$top": top, "$skiptoken": skip + top}
+            page["@odata.nextLink"] = "{}{}/items/{}/children?{}".format(
+                self.base_url,
+                "/me/drive",
+                folder["id"],
+                "&".join("{}={}".format(k, quote(str(v))) for k, v in params.items()),
+            )
+
+        return page
+
+    def _upload_session(
+        self, method: str, session_id: str, headers: dict, body: bytes
+    ) -> tuple:
+        session = self.store.sessions.get(session_id)
+
+        if session is None:
+            raise GraphError(404, "itemNotFound", "The upload session was not found.")
+
+        if method == "DELETE":
+            del self.store.sessions[session_id]
+            return 204, {}, b""
+
+        if method == "GET":
+            return 200, {}, {"nextExpectedRanges": session.next_expected_ranges()}
+
+        match = re.match(
+            r"bytes (\d+)-(\d+)/(\d+|\*)", headers.get("Content-Range", "")
+        )
+
+        if not match:
+            raise GraphError(400, "invalidRange", "Missing or invalid Content-Range.")
+
+        start = int(match.group(1))
+        size = None if match.group(3) == "*" else int(match.group(3))
+
+        if int(match.group(2)) - start + 1 != len(body):
+            raise GraphError(400, "invalidRange", "Content-Range does not match.")
+
+        if not session.put(start, body, size):
+            return 202, {}, {"nextExpectedRanges": session.next_expected_ranges()}
+
+        del self.store.sessions[session_id]
+        item = self.store.write(session.item_id, session.path, session.data)
+
+        return 201, {}, self._item_json(item, {})
+
+    def _download(self, item_id: str, headers: dict) -> tuple:
+        content = self.store.content.get(item_id)
+
+        if content is None:
+            raise GraphError(404, "itemNotFound", "The resource could not be found.")
+
+        match = re.match(r"bytes=(\d+)-(\d*)$", headers.get("Range", ""))
+
+        if not match:
+            return 200, {}, content
+
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(content) - 1), len(content) - 1)
+
+        if start >= len(content):
+            return 416, {"Content-Range": "bytes */{}".format(len(content))}, b""
+
+        return (
+            206,
+            {"Content-Range": "bytes {}-{}/{}".format(start, end, len(content))},
+            content[start : end + 1],
+        )
+
+    def _batch(self, data: dict) -> tuple:
+        responses = []
+
+        for request in data.get("requests", []):
+            status, _, body = self.dispatch(
+                request["method"],
+                API_PREFIX + request["url"],
+                request.get("headers") or {},
+                json.dumps(request["body"]).encode() if "body" in request else b"",
+            )
+            responses.append({"id": request["id"], "status": status, "body": body})
+
+        return 200, {}, {"responses": responses}
+
+
+def _handler(server: GraphServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep connections alive like Graph does
+        disable_nagle_algorithm = True  # headers and body are written separately
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            self._handle()
+
+        do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+        def _handle(self) -> None:
+            body = self._read_body()
+
+            if server.latency:
+                time.sleep(server.latency)
+
+            if server._should_throttle():
+                status, headers, payload = (
+                    429,
+                    {"Retry-After": "{:g}".format(server.retry_after)},
+                    {"error": {"code": "tooManyRequests", "message": "Throttled"}},
+                )
+            else:
+                status, headers, payload = server.dispatch(
+                    self.command, self.path, self.headers, body
+                )
+
+            if isinstance(payload, (dict, list)):
+                payload = json.dumps(payload).encode()
+                headers = {**headers, "Content-Type": "application/json"}
+
+            self.send_response(status)
+
+            for name, value in headers.items():
+                self.send_header(name, value)
+
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+
+            if self.command != "HEAD":
+                self._write_body(payload)
+
+        def _read_body(self) -> bytes:
+            remaining = int(self.headers.get("Content-Length") or 0)
+            chunks = []
+
+            while remaining:
+                chunk = self.rfile.read(min(remaining, IO_CHUNK_SIZE))
+
+                if not chunk:
+                    break
+
+                chunks.append(chunk)
+                remaining -= len(chunk)
+                self._limit(len(chunk))
+
+            return b"".join(chunks)
+
+        def _write_body(self, payload: bytes) -> None:
+            view = memoryview(payload)
+
+            for start in range(0, len(view), IO_CHUNK_SIZE):
+                chunk = view[start : start + IO_CHUNK_SIZE]
+                self.wfile.write(chunk)
+                self._limit(len(chunk))
+
+        def _limit(self, size: int) -> None:
+            if server.bandwidth:
+                time.sleep(size / server.bandwidth)
+
+    return Handler
+
+
+def _now(offset: float = 0) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + offset))
+
+
+def _split_path(path: Optional[str]) -> List[str]:
+    return [p for p in (path or "").split("/") if p]
+
+
+def _select(data: dict, select: Optional[str]) -> dict:
+    if not select:
+        return data
+
+    fields = set(select.split(","))
+
+    return {k: v for k, v in data.items() if k in fields}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bandwidth-mb", type=float, default=0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    args = parser.parse_args()
+
+    server = GraphServer(
+        port=args.port,
+        latency=args.latency,
+        bandwidth=args.bandwidth_mb * 1048576 or None,
+        throttle_every=args.throttle_every,
+    )
+    print("Serving the Graph API stand-in at " + server.base_url)
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare hashing throughput with plain download throughput.
+
+Prints the MB/s of each hash Graph reports, fed in download-sized (8KB) and
+1MB chunks, then the MB/s of download_item with and without verify. The
+download is emulated with requests-mock so no network is used:
+
+    python benchmarks/hash_throughput.py --size-mb 256
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from msdrive import OneDrive
+from msdrive.constants import BASE_GRAPH_URL, DOWNLOAD_CHUNK_SIZE
+from msdrive.hashes import HASH_ALGORITHMS, QuickXorHash, hash_value, new_hash
+from requests_mock import Mocker
+
+DOWNLOAD_URL = "https://download.example.com/benchmark"
+
+
+def hash_speed(name: str, data: bytes, chunk_size: int) -> float:
+    view = memoryview(data)
+    hasher = new_hash(name)
+    started = time.perf_counter()
+
+    for i in range(0, len(view), chunk_size):
+        hasher.update(view[i : i + chunk_size])
+
+    hash_value(hasher)
+
+    return len(data) / 1048576 / (time.perf_counter() - started)
+
+
+def download_speed(data: bytes, file_path: str, verify: object) -> float:
+    drive = OneDrive("token")
+    item = {
+        "name": "benchmark.bin",
+        "size": len(data),
+        "file": {"hashes": {"quickXorHash": QuickXorHash(data).b64digest()}},
+        "@microsoft.graph.downloadUrl": DOWNLOAD_URL,
+    }
+
+    if verify and verify is not True:
+        hasher = new_hash(verify[0])
+        hasher.update(data)
+        item["file"]["hashes"][verify[0]] = hash_value(hasher)
+
+    with Mocker() as m:
+        m.get(f"{BASE_GRAPH_URL}/me/drive/root:/benchmark.bin", json=item)
+        m.get(DOWNLOAD_URL, content=data)
+
+        started = time.perf_counter()
+        drive.download_item(
+            item_path="/benchmark.bin", file_path=file_path, verify=verify
+        )
+
+    return len(data) / 1048576 / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=256)
+    args = parser.parse_args()
+
+    data = os.urandom(args.size_mb * 1048576)
+
+    print(f"{'hash':<14}{'8KB chunks MB/s':>18}{'1MB chunks MB/s':>18}")
+
+    for name in HASH_ALGORITHMS:
+        small = hash_speed(name, data, DOWNLOAD_CHUNK_SIZE)
+        large = hash_speed(name, data, 1048576)
+        print(f"{name:<14}{small:>18.1f}{large:>18.1f}")
+
+    print()
+    print(f"{'download_item':<28}{'MB/s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "benchmark.bin")
+
+        for label, verify in [
+            ("plain", False),
+            ("verify quickXorHash", True),
+            ("verify sha256Hash", ["sha256Hash"]),
+        ]:
+            speed = download_speed(data, file_path, verify)
+            print(f"{label:<28}{speed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Compare the memory held by a large listing as dicts and as typed DriveItems.
+
+Builds Graph-like listing pages of realistic DriveItem JSON, parses them the
+way the client does and keeps every item, either as the plain dicts or as
+compact DriveItem objects (typed=True). Memory is measured with tracemalloc,
+so only what the items retain is counted:
+
+    python benchmarks/model_memory.py --items 1000000
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+from msdrive.models import DriveItem
+
+PAGE_SIZE = 1000
+ITEM = {
+    "@microsoft.graph.downloadUrl": "https://contoso.sharepoint.com/_layouts/15/download.aspx?UniqueId=6a4f3b2c-{i}&tempauth=v1.eyJhdWQiOiIwMDAwMDAwMy0wMDAwLTBmZjEtY2UwMC0wMDAwMDAwMDAwMDAi",
+    "createdDateTime": "2023-04-01T09:12:44Z",
+    "eTag": '"{6A4F3B2C-1C2B-4E5F-9A8B-{i}},3"',
+    "id": "01BYE5RZ6A4F3B2C1C2B4E5F{i}",
+    "lastModifiedDateTime": "2024-02-18T16:03:21Z",
+    "name": "Quarterly report {i}.xlsx",
+    "webUrl": "https://contoso.sharepoint.com/sites/finance/Shared%20Documents/Reports/Quarterly%20report%20{i}.xlsx",
+    "cTag": '"c:{6A4F3B2C-1C2B-4E5F-9A8B-{i}},5"',
+    "size": 18230,
+    "createdBy": {
+        "user": {
+            "email": "megan@contoso.com",
+            "id": "48d31887-5fad-4d73-a9f5-3c356e68a038",
+            "displayName": "Megan Bowen",
+        }
+    },
+    "lastModifiedBy": {
+        "user": {
+            "email": "alex@contoso.com",
+            "id": "5bde3e51-d13b-4db1-9948-fe4b109d11a7",
+            "displayName": "Alex Wilber",
+        }
+    },
+    "parentReference": {
+        "driveType": "documentLibrary",
+        "driveId": "b!Uj8Ft4JmrEy9wIwxfDuHYnnwQmB8nzBKiyfPVbRk8gE0pDL7qJkMQ5zE",
+        "id": "01BYE5RZ56Y2GOVW7725BZO354PWSELRRZ",
+        "name": "Reports",
+        "path": "/drives/b!Uj8Ft4JmrEy9wIwxfDuHYnnwQmB8nzBKiyfPVbRk8gE0pDL7qJkMQ5zE/root:/Reports",
+        "siteId": "b7153f52-6682-4cac-bdc0-8c317c3b8762",
+    },
+    "file": {
+        "mimeType": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "hashes": {"quickXorHash": "{i}ZmFrZWhhc2g="},
+    },
+    "fileSystemInfo": {
+        "createdDateTime": "2023-04-01T09:12:44Z",
+        "lastModifiedDateTime": "2024-02-18T16:03:21Z",
+    },
+    "shared": {"scope": "users"},
+}
+# A typical item from a document library listing, {i} makes every item unique
+ITEM_JSON = json.dumps(ITEM)
+
+
+def page_text(start: int, count: int) -> str:
+    items = [ITEM_JSON.replace("{i}", "%012d" % i) for i in range(start, start + count)]
+
+    return '{"value":[' + ",".join(items) + "]}"
+
+
+def load_pages(count: int, convert: Callable[[List[dict]], list], keep: bool) -> tuple:
+    """Parse count items page by page, returns (items kept, seconds parsing)."""
+    kept = []
+    elapsed = 0.0
+
+    for start in range(0, count, PAGE_SIZE):
+        text = page_text(start, min(PAGE_SIZE, count - start))
+        started = time.perf_counter()
+        items = convert(json.loads(text)["value"])  # json.loads is what r.json() does
+        elapsed += time.perf_counter() - started
+
+        if keep:
+            kept.extend(items)
+
+    return kept, elapsed
+
+
+MODELS = {
+    "dict": lambda items: items,
+    "DriveItem": lambda items: [DriveItem(item) for item in items],
+}
+
+
+def child(mode: str, count: int) -> dict:
+    convert = MODELS[mode]
+
+    # Time without tracemalloc, which slows allocation down a lot
+    _, elapsed = load_pages(count, convert, keep=False)
+
+    gc.collect()
+    tracemalloc.start()
+    kept, _ = load_pages(count, convert, keep=True)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    assert all(item["name"] for item in kept)
+    lookup = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "kept_bytes": current,
+        "peak_bytes": peak,
+        "items_per_second": count / elapsed,
+        "lookup_ns": lookup * 1e9 / count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000000)
+    parser.add_argument("--child", choices=MODELS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.items)))
+        return
+
+    print(f"{args.items:,} items, {len(page_text(0, 1)):,} bytes of JSON each")
+    print(
+        f"{'':<12}{'kept MB':>12}{'bytes/item':>12}{'peak MB':>12}"
+        f"{'items/s':>12}{'item[] ns':>12}"
+    )
+
+    # Each mode runs in a fresh process so one running out of memory (1M dicts
+    # need several GB) does not stop the other
+    for mode in MODELS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--items", str(args.items)],
+            stdout=subprocess.PIPE,
+        )
+
+        if output.returncode:
+            print(f"{mode:<12}{'failed (out of memory?)':>36}")
+            continue
+
+        r = json.loads(output.stdout)
+        print(
+            f"{mode:<12}{r['kept_bytes'] / 1048576:>12.1f}"
+            f"{r['kept_bytes'] / args.items:>12.0f}{r['peak_bytes'] / 1048576:>12.1f}"
+            f"{r['items_per_second']:>12.0f}{r['lookup_ns']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure the bytes a resumed upload saves after it is killed partway through.
+
+The upload session is emulated with requests-mock so no network is used:
+
+    python benchmarks/resume_upload.py --size-mb 64 --kill-at 0.9
+"""
+
+import argparse
+import os
+import tempfile
+
+from msdrive import OneDrive
+from msdrive.constants import BASE_GRAPH_URL
+from requests_mock import Mocker
+
+UPLOAD_URL = "https://upload.example.com/session/benchmark"
+
+
+class Killed(Exception):
+    """Raised by the fake upload session to simulate a killed process"""
+
+
+class FakeUploadSession:
+    def __init__(self, file_size: int, kill_after: int) -> None:
+        self.file_size = file_size
+        self.kill_after = kill_after
+        self.received = 0
+        self.bytes_sent = 0
+
+    def put(self, request, context):
+        if self.kill_after is not None and self.bytes_sent >= self.kill_after:
+            raise Killed()
+
+        start, end = request.headers["Content-Range"][6:].split("/")[0].split("-")
+        self.bytes_sent += len(request.body)
+        self.received = max(self.received, int(end) + 1)
+
+        if self.received == self.file_size:
+            context.status_code = 201
+            return {"name": "benchmark.bin"}
+
+        context.status_code = 202
+        return {"nextExpectedRanges": [f"{self.received}-"]}
+
+    def get(self, request, context):
+        return {"nextExpectedRanges": [f"{self.received}-"]}
+
+
+def run(file_path: str, file_size: int, kill_at: float, resume: bool) -> int:
+    drive = OneDrive("token")
+    fake = FakeUploadSession(file_size, int(file_size * kill_at))
+
+    with Mocker() as m:
+        m.post(
+            f"{BASE_GRAPH_URL}/me/drive/root:/benchmark.bin:/createUploadSession",
+            json=lambda request, context: {
+                "uploadUrl": UPLOAD_URL,
+                "nextExpectedRanges": ["0-"],
+            },
+        )
+        m.put(UPLOAD_URL, json=fake.put)
+        m.get(UPLOAD_URL, json=fake.get)
+
+        kwargs = dict(item_path="/benchmark.bin", file_path=file_path, resume=resume)
+
+        try:
+            drive.upload_item(**kwargs)
+        except Killed:
+            pass
+
+        # Restart the transfer, a fresh session is created when not resuming
+        fake.kill_after = None
+
+        if not resume:
+            fake.received = 0
+
+        drive.upload_item(**kwargs)
+
+    return fake.bytes_sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--kill-at", type=float, default=0.9)
+    args = parser.parse_args()
+
+    file_size = args.size_mb * 1048576
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "benchmark.bin")
+
+        with open(file_path, "wb") as f:
+            f.write(os.urandom(file_size))
+
+        restarted = run(file_path, file_size, args.kill_at, resume=False)
+        resumed = run(file_path, file_size, args.kill_at, resume=True)
+
+    print(f"file size:            {file_size:>14,} bytes")
+    print(f"restart from zero:    {restarted:>14,} bytes sent")
+    print(f"resumed upload:       {resumed:>14,} bytes sent")
+    print(f"saved by resuming:    {restarted - resumed:>14,} bytes")
+
+
+if __name__ == "__main__":
+    main()
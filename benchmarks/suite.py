@@ -0,0 +1,347 @@
+"""Measure throughput and latency of the client against the local Graph stand-in.
+
+Every scenario runs against benchmarks/graph_server.py over real HTTP, so
+connection pooling, threading and retries are exercised without a network or a
+Microsoft account. Results are written as JSON and can be compared with an
+earlier run to catch regressions, the exit status is 1 when one is found:
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --latency 0.02 --baseline results.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import msdrive
+from graph_server import GraphServer
+from msdrive import OneDrive
+from msdrive.instrumentation import RequestEvent
+
+RATES = ("ops_per_sec", "mb_per_sec", "items_per_sec")
+# Metrics where a lower value is better, every other metric is a rate
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "max_ms", "requests_per_op")
+
+
+class Recorder:
+    """on_request listener that counts the requests a scenario makes."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.throttle_wait = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        with self._lock:
+            self.requests += 1
+            self.retries += event.retries
+            self.throttle_wait += event.throttle_wait
+
+
+def run_scenario(
+    name: str,
+    drive: OneDrive,
+    recorder: Recorder,
+    operation: Callable[[int], int],
+    count: int,
+    concurrency: int,
+) -> dict:
+    """Run operation(i) count times over concurrency threads.
+
+    The operation returns the number of payload bytes it moved (0 if none).
+    """
+    latencies = [0.0] * count
+    moved = [0] * count
+
+    def timed(i: int) -> None:
+        started = time.perf_counter()
+        moved[i] = operation(i)
+        latencies[i] = time.perf_counter() - started
+
+    requests, retries, waited = (
+        recorder.requests,
+        recorder.retries,
+        recorder.throttle_wait,
+    )
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(count)))
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        "name": name,
+        "operations": count,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "ops_per_sec": round(count / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "requests_per_op": round((recorder.requests - requests) / count, 3),
+        "retries": recorder.retries - retries,
+        "throttle_wait_seconds": round(recorder.throttle_wait - waited, 4),
+    }
+
+    if sum(moved):
+        result["mb_per_sec"] = round(sum(moved) / 1048576 / elapsed, 2)
+
+    return result
+
+
+def run_suite(args: argparse.Namespace, tmp: str) -> List[dict]:
+    results = []
+    size = args.file_mb * 1048576
+    payload = os.urandom(size)
+    small = os.urandom(args.small_kb * 1024)
+    upload_path = os.path.join(tmp, "upload.bin")
+
+    with open(upload_path, "wb") as f:
+        f.write(payload)
+
+    # A tree of folders tree_width wide and tree_depth deep with tree_files in each
+    tree = level = [""]
+
+    for _ in range(args.tree_depth):
+        level = [
+            p + "/folder{}".format(i) for p in level for i in range(args.tree_width)
+        ]
+        tree = tree + level
+
+    tree_items = len(tree) - 1 + len(tree) * args.tree_files
+
+    def scenario(
+        name: str,
+        operation: Callable,
+        count: int,
+        concurrency: Optional[int] = None,
+        items: int = 0,
+        **server_kwargs,
+    ) -> None:
+        server_kwargs.setdefault("latency", args.latency)
+        server_kwargs.setdefault("bandwidth", args.bandwidth_mb * 1048576 or None)
+
+        with GraphServer(**server_kwargs) as server:
+            server.add_file("/bench/large.bin", payload)
+
+            for i in range(args.items):
+                server.add_file("/bench/items/item{}.txt".format(i), small)
+
+            if name == "walk":
+                for path in tree:
+                    for i in range(args.tree_files):
+                        server.add_file("/tree{}/file{}.txt".format(path, i), b"x")
+
+            recorder = Recorder()
+
+            with OneDrive(
+                "token",
+                base_url=server.base_url,
+                pool_maxsize=max(args.concurrency, args.workers),
+                on_request=recorder,
+            ) as drive:
+                result = run_scenario(
+                    name,
+                    drive,
+                    recorder,
+                    lambda i: operation(drive, i),
+                    count,
+                    concurrency or args.concurrency,
+                )
+
+            result["server"] = server.stats()
+
+        if items:
+            result["items_per_sec"] = round(items * result["ops_per_sec"], 2)
+
+        results.append(result)
+        print(_summary(result), flush=True)
+
+    def get_item_data(drive: OneDrive, i: int) -> int:
+        drive.get_item_data(item_path="/bench/items/item{}.txt".format(i % args.items))
+        return 0
+
+    def batch_item_data(drive: OneDrive, i: int) -> int:
+        drive.batch(
+            [
+                (
+                    "get_item_data",
+                    {
+                        "item_path": "/bench/items/item{}.txt".format(
+                            (i * 20 + j) % args.items
+                        )
+                    },
+                )
+                for j in range(20)
+            ]
+        )
+        return 0
+
+    def list_items(drive: OneDrive, i: int) -> int:
+        items = list(drive.iter_items(folder_path="/bench/items", top=200))
+        assert len(items) == args.items
+        return 0
+
+    def upload_small(drive: OneDrive, i: int) -> int:
+        drive.upload_item(item_path="/bench/upload/small{}.bin".format(i), data=small)
+        return len(small)
+
+    def upload_large(drive: OneDrive, i: int) -> int:
+        drive.upload_item(
+            item_path="/bench/upload/large{}.bin".format(i),
+            file_path=upload_path,
+            max_workers=args.workers,
+        )
+        return size
+
+    def walk(drive: OneDrive, i: int) -> int:
+        walked = 0
+
+        for _, folders, files in drive.walk(
+            folder_path="/tree", max_workers=args.workers
+        ):
+            walked += len(folders) + len(files)
+
+        assert walked == tree_items
+        return 0
+
+    def download_large(drive: OneDrive, i: int) -> int:
+        drive.download_item(
+            item_path="/bench/large.bin",
+            file_path=os.path.join(tmp, "download{}.bin".format(i)),
+            max_workers=args.workers,
+        )
+        return size
+
+    scenario("get_item_data", get_item_data, args.operations)
+    scenario(
+        "get_item_data_throttled",
+        get_item_data,
+        args.operations,
+        throttle_every=10,
+        retry_after=0.01,
+    )
+    scenario("batch_get_item_data_x20", batch_item_data, max(args.operations // 20, 1))
+    scenario("list_items", list_items, max(args.operations // 50, 1))
+    scenario("upload_item_small", upload_small, args.operations)
+    scenario("upload_item_large", upload_large, args.transfers)
+    scenario("download_item_large", download_large, args.transfers)
+    scenario("walk", walk, args.transfers, concurrency=1, items=tree_items)
+
+    return results
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """List the metrics that are more than tolerance worse than the baseline."""
+    previous = {r["name"]: r for r in baseline}
+    regressions = []
+
+    for result in results:
+        before = previous.get(result["name"])
+
+        if before is None:
+            continue
+
+        for metric in RATES + LOWER_IS_BETTER:
+            old, new = before.get(metric), result.get(metric)
+
+            if not old or new is None:
+                continue
+
+            change = (new - old) / old
+
+            if metric not in LOWER_IS_BETTER:
+                change = -change
+
+            if change > tolerance:
+                regressions.append(
+                    "{} {}: {} -> {} ({:+.0%})".format(
+                        result["name"], metric, old, new, (new - old) / old
+                    )
+                )
+
+    return regressions
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    # values must be sorted, interpolates between the closest ranks
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _summary(result: dict) -> str:
+    rate = ""
+
+    if "mb_per_sec" in result:
+        rate = "{:>10.1f} MB/s".format(result["mb_per_sec"])
+    elif "items_per_sec" in result:
+        rate = "{:>10.0f} items/s".format(result["items_per_sec"])
+
+    return "{:<26}{:>10.1f} ops/s  p50 {:>8.2f} ms  p99 {:>8.2f} ms{}".format(
+        result["name"], result["ops_per_sec"], result["p50_ms"], result["p99_ms"], rate
+    )
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--bandwidth-mb", type=float, default=0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--operations", type=int, default=400)
+    parser.add_argument("--transfers", type=int, default=4)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--small-kb", type=int, default=64)
+    parser.add_argument("--file-mb", type=int, default=32)
+    parser.add_argument("--tree-width", type=int, default=10)
+    parser.add_argument("--tree-depth", type=int, default=3)
+    parser.add_argument("--tree-files", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_suite(args, tmp)
+
+    report = {
+        "msdrive_version": msdrive.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "settings": vars(args),
+        "results": results,
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("Results written to " + args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+
+        for regression in regressions:
+            print("REGRESSION " + regression)
+
+        return 1 if regressions else None
+
+    return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Compare peak RSS and throughput of the large-upload read modes.
+
+Each read mode (copy, buffer, mmap) uploads the same file in a fresh process so
+the peak resident set sizes do not affect each other. The upload session is
+emulated with requests-mock so no network is used:
+
+    python benchmarks/upload_memory.py --size-mb 512 --chunk-mb 10 --workers 4
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from msdrive import OneDrive
+from msdrive.constants import BASE_GRAPH_URL, CHUNK_UPLOAD_ALIGNMENT
+from requests_mock import Mocker
+
+UPLOAD_URL = "https://upload.example.com/session/benchmark"
+MODES = ("copy", "buffer", "mmap")
+
+
+def peak_rss() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def child(file_path: str, read_mode: str, chunk_size: int, workers: int) -> dict:
+    file_size = os.stat(file_path).st_size
+    drive = OneDrive("token")
+
+    with Mocker() as m:
+
+        def put(request, context):
+            # Keep request history from holding on to every fragment
+            del m.request_history[:]
+            end = int(request.headers["Content-Range"].split("/")[0].split("-")[1])
+            context.status_code = 201 if end == file_size - 1 else 202
+            return {"name": "benchmark.bin"}
+
+        m.post(
+            f"{BASE_GRAPH_URL}/me/drive/root:/benchmark.bin:/createUploadSession",
+            json={"uploadUrl": UPLOAD_URL},
+        )
+        m.put(UPLOAD_URL, json=put)
+
+        baseline = peak_rss()
+        started = time.perf_counter()
+        drive.upload_item(
+            item_path="/benchmark.bin",
+            file_path=file_path,
+            chunk_size=chunk_size,
+            max_workers=workers,
+            read_mode=read_mode,
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "read_mode": read_mode,
+        "seconds": elapsed,
+        "mb_per_second": file_size / 1048576 / elapsed,
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--chunk-mb", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child", nargs=2, metavar=("FILE", "MODE"))
+    args = parser.parse_args()
+
+    # Round the chunk size to the 320KiB multiple Graph requires
+    chunk_size = max(1, args.chunk_mb * 1048576 // CHUNK_UPLOAD_ALIGNMENT)
+    chunk_size *= CHUNK_UPLOAD_ALIGNMENT
+
+    if args.child:
+        result = child(args.child[0], args.child[1], chunk_size, args.workers)
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "benchmark.bin")
+
+        with open(file_path, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1048576))
+
+        print(
+            f"{args.size_mb}MB file, {chunk_size:,} byte fragments, {args.workers} workers"
+        )
+        print(f"{'mode':<8}{'MB/s':>10}{'peak RSS MB':>14}{'growth MB':>12}")
+
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", file_path, mode]
+                + ["--chunk-mb", str(args.chunk_mb), "--workers", str(args.workers)],
+                check=True,
+                stdout=subprocess.PIPE,
+            ).stdout
+            r = json.loads(output)
+            growth = (r["peak_rss"] - r["baseline_rss"]) / 1048576
+            print(
+                f"{mode:<8}{r['mb_per_second']:>10.1f}"
+                f"{r['peak_rss'] / 1048576:>14.1f}{growth:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -27,3 +27,21 @@ def get_access_token():
 token = get_access_token()
 drive = OneDrive(token)
 print(drive.list_items())
+
+
+# For long-running jobs pass a callable instead, it is called again shortly before
+# the token expires (MSAL serves the refreshed token from its cache)
+def get_token_result():
+    app = msal.ConfidentialClientApplication(
+        CLIENT_ID, authority=AUTHORITY_URL, client_credential="client_secret_here"
+    )
+
+    return app.acquire_token_for_client(scopes=["https://graph.microsoft.com/.default"])
+
+
+drive = OneDrive(get_token_result)
+
+# Or any azure-identity credential
+from azure.identity import DefaultAzureCredential
+
+drive = OneDrive(DefaultAzureCredential())
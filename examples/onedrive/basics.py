@@ -8,6 +8,15 @@ drive.list_items()
 # List files and folders in sub-directory:
 drive.list_items(folder_path="/Documents")
 
+# Iterate over every file and folder in a large directory, one page at a time:
+for item in drive.iter_items(folder_path="/Documents", top=1000, select=["id", "name", "size"]):
+    print(item["name"])
+
+# Walk every folder under a path, listing 8 folders at a time:
+for path, folders, files in drive.walk(folder_path="/Documents", max_workers=8):
+    folders[:] = [f for f in folders if f["name"] != "Archive"]  # skip a subtree
+    print(path, sum(f.get("size", 0) for f in files))
+
 # Get file or folder metadata:
 drive.get_item_data(item_path="/Documents/my-data.csv")
 drive.get_item_data(item_id="01...") # if you know the item ID
@@ -16,6 +25,49 @@ drive.get_item_data(item_id="01...") # if you know the item ID
 drive.download_item(item_path="/Documents/my-data.csv", file_path="my-data.csv")
 drive.download_item(item_id="01...", file_path="my-data.csv") # if you know the item ID
 
+# Download a large file as 8 byte ranges in parallel
+drive.download_item(item_path="/Documents/large-file.zip", file_path="large-file.zip", max_workers=8)
+
+# Download a large file that continues where it left off if interrupted (and the file is unchanged)
+drive.download_item(item_path="/Documents/large-file.zip", file_path="large-file.zip", resume=True)
+
+# Download a file and check it against the hash OneDrive has for it (raises HashMismatch)
+drive.download_item(item_path="/Documents/large-file.zip", file_path="large-file.zip", verify=True)
+
+# Read a file without saving it to disk first
+import pandas as pd
+
+with drive.open_item(item_path="/Documents/my-data.csv") as f:
+    df = pd.read_csv(f)
+
 # Upload a new or existing file
 drive.upload_item(item_path="/Documents/new-or-existing-file.csv", file_path="new-or-existing-file.csv")
-drive.upload_item(item_id="01...", file_path="existing-file.csv") # if you know the item ID
\ No newline at end of file
+drive.upload_item(item_id="01...", file_path="existing-file.csv") # if you know the item ID
+
+# Upload a large file keeping 4 fragments of 10MB in flight
+drive.upload_item(item_path="/Documents/large-file.zip", file_path="large-file.zip", chunk_size=327680 * 32, max_workers=4)
+
+# Upload a multi-GB file from a memory map so memory stays flat however large it is
+drive.upload_item(item_path="/Documents/large-file.zip", file_path="large-file.zip", max_workers=4, read_mode="mmap")
+
+# Upload a large file that continues where it left off if interrupted
+drive.upload_item(item_path="/Documents/large-file.zip", file_path="large-file.zip", resume=True)
+
+# Upload data without writing it to disk first (bytes, a file object or pipe, or an iterator of chunks)
+drive.upload_item(item_path="/Documents/hello.txt", data=b"Hello world")
+drive.upload_item(item_path="/Documents/export.csv", data=(row.encode() for row in ["a,b\n", "1,2\n"]))
+
+# Upload a whole local directory in parallel and report any failures
+for result in drive.upload_items(local_path="reports", folder_path="/Documents/Reports", max_workers=8):
+    if not result.ok:
+        print("Failed to upload", result.file_path, result.error)
+
+# Copy a file on the server side, without downloading it:
+drive.copy_item(item_path="/Documents/my-data.csv", dest_folder_path="/Backup")
+
+# Start a copy in the background and check on it later:
+copy = drive.copy_item(item_path="/Documents/big-folder", dest_folder_path="/Backup", wait=False)
+drive.wait_for_copies([copy], timeout=600)
+
+# Move and rename a file:
+drive.move_item(item_path="/Documents/my-data.csv", dest_folder_path="/Archive", name="2023.csv")
@@ -11,6 +11,10 @@ drive.search_for_site("my sharepoint site")
 # List a SharePoint site's drives:
 drive.list_site_drives("XXX-XXX-XXX")
 
+# Iterate over every page of results:
+for site in drive.iter_followed_sites():
+    print(site["displayName"])
+
 # List files and folders in root directory:
 drive.list_items(drive_id="b!...")
 
@@ -27,4 +31,23 @@ drive.download_item(drive_id="b!...", item_id="01...", file_path="shared-data.cs
 
 # Upload a new or existing file
 drive.upload_item(drive_id="b!...", item_path="/General/new-or-existing-file.csv", file_path="new-or-existing-file.csv")
-drive.upload_item(drive_id="b!...", item_id="01...", file_path="existing-file.csv") # if you know the item ID
\ No newline at end of file
+drive.upload_item(drive_id="b!...", item_id="01...", file_path="existing-file.csv") # if you know the item ID
+
+# Get metadata for many files using batched requests (failed items are returned as exceptions)
+drive.batch([
+    ("get_item_data", {"drive_id": "b!...", "item_path": "/General/a.csv"}),
+    ("get_item_data", {"drive_id": "b!...", "item_path": "/General/b.csv"}),
+    ("list_items", {"drive_id": "b!...", "folder_path": "/General"}),
+    ("list_site_drives", {"site_id": "XXX-XXX-XXX"}),
+])
+
+# Sync only the changes since the last run (the deltaLink is kept in delta-state.json)
+for item in drive.iter_delta(drive_id="b!...", state_path="delta-state.json"):
+    if "deleted" in item:
+        print("Deleted:", item["id"])
+    else:
+        print("Created or changed:", item["name"])
+
+# Mirror a folder to a local directory, downloading only changed files
+result = drive.sync_folder(drive_id="b!...", folder_path="/General", local_path="general", delete=True)
+print(result.files_downloaded, "files and", result.bytes_downloaded, "bytes downloaded")
@@ -0,0 +1,365 @@
+"""Asyncio versions of the OneDrive and SharePoint classes.
+
+These require the optional httpx dependency:
+
+    pip install onedrive-sharepoint-python-sdk[async]
+"""
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+
+try:
+    import httpx
+except ImportError as err:
+    raise ImportError(
+        "The async classes require httpx, install it with "
+        "pip install onedrive-sharepoint-python-sdk[async]"
+    ) from err
+
+from .constants import (
+    ASYNC_WRITE_BUFFER_SIZE,
+    BASE_GRAPH_URL,
+    DEFAULT_ASYNC_MAX_CONNECTIONS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_MAXSIZE,
+    DOWNLOAD_CHUNK_SIZE,
+    SIMPLE_UPLOAD_MAX_SIZE,
+)
+from .drive import MSDrive
+from .exceptions import exception_for_status
+from .onedrive import OneDrive
+from .ranges import content_range, parse_ranges, split_ranges
+from .sharepoint import SharePoint
+
+
+class AsyncMSDrive(ABC):
+    """Abstract class for accessing files stored in OneDrive and SharePoint using the Microsoft Graph API with asyncio."""
+
+    def __init__(
+        self,
+        access_token: str,
+        max_connections: int = DEFAULT_ASYNC_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_POOL_MAXSIZE,
+        keepalive_expiry: float = 5.0,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        timeout: float = None,
+        transport: httpx.AsyncBaseTransport = None,
+        base_url: str = BASE_GRAPH_URL,
+    ) -> None:
+        """Class constructor that accepts a Microsoft access token for use with the API
+
+        Every instance owns a single pooled httpx.AsyncClient that is shared by all
+        requests made through it. Use the instance as an async context manager or
+        await aclose() to release the pooled connections.
+
+        Args:
+            access_token (str): The access token
+            max_connections (int): Maximum number of concurrent connections
+            max_keepalive_connections (int): Maximum number of idle connections kept alive
+            keepalive_expiry (float): Seconds an idle connection is kept alive for
+            max_retries (int): Retries for failed connection attempts
+            timeout (float): Request timeout in seconds (default is no timeout)
+            transport (httpx.AsyncBaseTransport): [OPTIONAL] Custom transport to send requests with
+            base_url (str): [OPTIONAL] Graph API root to send requests to (e.g. a local stand-in for testing)
+        """
+        self.access_token = access_token
+        self.base_url = base_url.rstrip("/")
+
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                retries=max_retries,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+            )
+
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=timeout,
+            event_hooks={"response": [self.raise_error_hook]},
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release its connections."""
+        await self._client.aclose()
+
+    async def get_item_data(self, **kwargs) -> dict:
+        """Get metadata for a DriveItem.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            item_id (str): [EITHER] The item ID
+            item_path (str): [EITHER] The item path
+
+        Returns:
+            dict: JSON representation of a DriveItem resource
+        """
+        r = await self._request("GET", self._get_drive_item_url(**kwargs))
+
+        return r.json()
+
+    async def list_items(self, **kwargs) -> dict:
+        """List the DriveItems in a specific folder path.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            folder_path (str): The folder path (or leave out for root)
+
+        Returns:
+            dict: JSON representation of a collection of DriveItem resources
+        """
+        r = await self._request("GET", self._get_drive_children_url(**kwargs))
+
+        return r.json()
+
+    async def download_item(self, **kwargs) -> None:
+        """Download a DriveItem file to a specific local path.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            item_id (str): [EITHER] The item ID
+            item_path (str): [EITHER] The item path
+            file_path (str): Local path to save the file to (e.g. /tmp/blah.csv)
+        """
+        if not kwargs.get("file_path"):
+            raise ValueError("Missing file_path argument")
+
+        data = await self.get_item_data(**kwargs)
+        url = data["@microsoft.graph.downloadUrl"]
+
+        # Disk I/O can block for a long time, so it runs in the default executor
+        loop = asyncio.get_running_loop()
+        buffer = bytearray()
+
+        async with self._client.stream("GET", url) as r:
+            f = await loop.run_in_executor(None, open, kwargs["file_path"], "wb")
+
+            try:
+                async for chunk in r.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    buffer += chunk
+
+                    if len(buffer) >= ASYNC_WRITE_BUFFER_SIZE:
+                        await loop.run_in_executor(None, f.write, bytes(buffer))
+                        buffer.clear()
+
+                await loop.run_in_executor(None, f.write, bytes(buffer))
+            finally:
+                await loop.run_in_executor(None, f.close)
+
+    async def upload_item(self, **kwargs) -> dict:
+        """Upload a local file to an existing or new DriveItem.
+
+        Specify the item_path for a new file.
+        Specify the item_path or item_id for an existing file.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            item_id (str): [EITHER] The item ID
+            item_path (str): [EITHER] The item path
+            file_path (str): Local path to upload the file from (e.g. /tmp/blah.csv)
+            chunk_size (int): [OPTIONAL] Fragment size, a multiple of 327680 bytes up to 60MiB
+            max_workers (int): [OPTIONAL] Number of fragments to upload concurrently (default 1)
+
+        Returns:
+            dict: JSON representation of the uploaded DriveItem resource
+        """
+        if not kwargs.get("file_path"):
+            raise ValueError("Missing file_path argument")
+
+        file_size = await asyncio.get_running_loop().run_in_executor(
+            None, os.path.getsize, kwargs["file_path"]
+        )
+
+        if file_size <= SIMPLE_UPLOAD_MAX_SIZE:
+            return await self._upload_item_small(**kwargs)
+        else:
+            return await self._upload_item_large(file_size, **kwargs)
+
+    @abstractmethod
+    def _get_drive_url(self, **kwargs) -> str:
+        raise NotImplementedError("Must be overridden")
+
+    @abstractmethod
+    def _get_drive_item_url(self, **kwargs) -> str:
+        raise NotImplementedError("Must be overridden")
+
+    @abstractmethod
+    def _get_drive_children_url(self, **kwargs) -> str:
+        raise NotImplementedError("Must be overridden")
+
+    _get_chunk_size = MSDrive._get_chunk_size
+
+    async def _request(
+        self, method: str, url: str, auth: bool = True, **kwargs
+    ) -> httpx.Response:
+        if auth:
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                "Authorization": "Bearer " + self.access_token,
+            }
+
+        return await self._client.request(method, url, **kwargs)
+
+    async def _upload_item_small(self, **kwargs) -> dict:
+        url = self._get_drive_item_url(**kwargs)
+
+        if kwargs.get("item_id"):
+            url += "/content"
+        else:
+            url += ":/content"
+
+        data = await asyncio.get_running_loop().run_in_executor(
+            None, _read_file, kwargs["file_path"], 0, -1
+        )
+        r = await self._request("PUT", url, content=data)
+
+        return r.json()
+
+    async def _upload_item_large(self, file_size: int, **kwargs) -> dict:
+        chunk_size = self._get_chunk_size(**kwargs)
+        file_path = kwargs["file_path"]
+        upload_session = await self._get_upload_session(**kwargs)
+        upload_url = upload_session["uploadUrl"]
+        ranges = parse_ranges(
+            upload_session.get("nextExpectedRanges") or ["0-"], file_size
+        )
+        semaphore = asyncio.Semaphore(kwargs.get("max_workers") or 1)
+        loop = asyncio.get_running_loop()
+
+        async def upload_fragment(start: int, end: int) -> httpx.Response:
+            async with semaphore:
+                data = await loop.run_in_executor(
+                    None, _read_file, file_path, start, end - start
+                )
+
+                headers = {"Content-Range": content_range(start, end, file_size)}
+
+                return await self._request(
+                    "PUT", upload_url, auth=False, content=data, headers=headers
+                )
+
+        tasks = [
+            asyncio.ensure_future(upload_fragment(start, end))
+            for start, end in split_ranges(ranges, chunk_size)
+        ]
+
+        try:
+            responses = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+
+            raise
+
+        for r in responses:
+            if r.status_code in (200, 201):
+                return r.json()
+
+        return None
+
+    async def _get_upload_session(self, **kwargs) -> dict:
+        url = self._get_drive_item_url(**kwargs)
+
+        if kwargs.get("item_id"):
+            url += "/createUploadSession"
+        else:
+            url += ":/createUploadSession"
+
+        r = await self._request("POST", url)
+
+        return r.json()
+
+    async def raise_error_hook(self, resp: httpx.Response) -> None:
+        if not resp.is_error:
+            return
+
+        await resp.aread()
+
+        try:
+            error = resp.json()["error"]
+            message = error["message"]
+        except Exception:
+            message = None
+
+        if message is None:
+            resp.raise_for_status()
+
+        raise exception_for_status(resp.status_code, message, error.get("code"))
+
+
+class AsyncOneDrive(AsyncMSDrive):
+    """Class for accessing DriveItems stored in OneDrive with asyncio.
+
+    See the OneDrive class, the methods are the same but must be awaited.
+
+    """
+
+    _get_drive_url = OneDrive._get_drive_url
+    _get_drive_item_url = OneDrive._get_drive_item_url
+    _get_drive_children_url = OneDrive._get_drive_children_url
+
+
+class AsyncSharePoint(AsyncMSDrive):
+    """Class for accessing DriveItems stored in SharePoint with asyncio.
+
+    See the SharePoint class, the methods are the same but must be awaited.
+
+    """
+
+    async def list_followed_sites(self) -> dict:
+        """List the SharePoint sites that you follow.
+
+        Returns:
+            dict: JSON representation of a collection of site resources
+        """
+        r = await self._request("GET", f"{self.base_url}/me/followedSites")
+
+        return r.json()
+
+    async def search_for_site(self, search_query: str) -> dict:
+        """Search for a SharePoint site.
+
+        Args:
+            search_query (str): The search query
+
+        Returns:
+            dict: JSON representation of a collection of site resources
+        """
+        r = await self._request(
+            "GET", f"{self.base_url}/sites", params={"search": search_query}
+        )
+
+        return r.json()
+
+    async def list_site_drives(self, site_id: str) -> dict:
+        """List a SharePoint site's drives.
+
+        Args:
+            site_id (str): The site ID
+
+        Returns:
+            dict: JSON representation of a collection of drive resources
+        """
+        r = await self._request("GET", f"{self.base_url}/sites/{site_id}/drives")
+
+        return r.json()
+
+    _get_drive_url = SharePoint._get_drive_url
+    _get_drive_item_url = SharePoint._get_drive_item_url
+    _get_drive_children_url = SharePoint._get_drive_children_url
+
+
+def _read_file(file_path: str, start: int, size: int) -> bytes:
+    with open(file_path, "rb") as f:
+        f.seek(start)
+
+        return f.read(size)
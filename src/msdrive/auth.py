@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Callable, Optional, Tuple, Union
+
+from requests import Response
+
+from .constants import GRAPH_SCOPE, TOKEN_REFRESH_MARGIN
+from .throttle import can_resend
+
+
+class TokenProvider:
+    """Thread-safe cache of an access token that is refreshed before it expires.
+
+    The source can be:
+        - a callable returning a token string, a (token, expires_on) tuple, an
+          object with token and expires_on attributes (e.g. azure.core AccessToken)
+          or an MSAL result dict with access_token and expires_in
+        - a credential with a get_token(*scopes) method (e.g. from azure-identity)
+
+    expires_on is a Unix timestamp. Tokens without expiry information are only
+    refreshed when the API rejects them.
+    """
+
+    def __init__(
+        self,
+        source: Union[Callable[[], object], object],
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        scopes: Tuple[str, ...] = (GRAPH_SCOPE,),
+    ) -> None:
+        """Class constructor
+
+        Args:
+            source (callable): Callable or credential that fetches a new token
+            refresh_margin (float): Seconds before expiry to fetch a new token
+            scopes (tuple): Scopes requested from a credential's get_token
+        """
+        if hasattr(source, "get_token"):
+            self._fetch = lambda: source.get_token(*scopes)
+        elif callable(source):
+            self._fetch = source
+        else:
+            raise TypeError("source must be a callable or have a get_token method")
+
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._token = None
+        self._expires_on = None
+        self._lock = threading.Lock()
+
+    def token(self) -> str:
+        """Get the current token, refreshing it first if it is about to expire.
+
+        Returns:
+            str: The access token
+        """
+        token = self._token
+
+        if token is None or self._expiring():
+            with self._lock:
+                # Another thread may have refreshed while we waited for the lock
+                if self._token is None or self._expiring():
+                    self._refresh()
+
+                token = self._token
+
+        return token
+
+    def invalidate(self, token: str) -> None:
+        """Mark a token the API rejected as stale so the next call to token() refreshes.
+
+        Only the first of several threads rejected with the same token causes a refresh.
+
+        Args:
+            token (str): The rejected token
+        """
+        with self._lock:
+            if self._token == token:
+                self._token = None
+
+    def refresh_hook(self, r: Response, *args, **kwargs) -> Response:
+        """Response hook that refreshes the token once and resends on a 401.
+
+        Requests without an Authorization header (pre-authenticated upload and
+        download URLs) are left alone.
+        """
+        auth = r.request.headers.get("Authorization")
+
+        if r.status_code != 401 or not auth or not auth.startswith("Bearer "):
+            return r
+
+        self.invalidate(auth[7:])
+        token = self.token()
+
+        if token == auth[7:] or not can_resend(r.request):
+            return r
+
+        request = r.request.copy()
+        request.headers["Authorization"] = "Bearer " + token
+        r.close()
+
+        return r.connection.send(request, **kwargs)
+
+    def _expiring(self) -> bool:
+        return (
+            self._expires_on is not None
+            and self._expires_on - self.refresh_margin <= time.time()
+        )
+
+    def _refresh(self) -> None:
+        token, expires_on = _parse_token(self._fetch())
+        self._token = token
+        self._expires_on = expires_on
+        self.refreshes += 1
+
+
+def _parse_token(value: object) -> Tuple[str, Optional[float]]:
+    if isinstance(value, str):
+        return value, None
+
+    if isinstance(value, dict):
+        if "expires_on" in value:
+            return value["access_token"], float(value["expires_on"])
+
+        if "expires_in" in value:
+            return value["access_token"], time.time() + float(value["expires_in"])
+
+        return value["access_token"], None
+
+    if isinstance(value, tuple) and not hasattr(value, "token"):
+        return value[0], None if value[1] is None else float(value[1])
+
+    return value.token, getattr(value, "expires_on", None)
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional
+
+from .constants import DEFAULT_CACHE_MAXSIZE, DEFAULT_CACHE_TTL
+
+
+class MetadataCache:
+    """Thread-safe in-process cache of DriveItem metadata with a TTL and LRU eviction.
+
+    A cached item can be stored under several keys (e.g. its path and its ID),
+    invalidating any of them removes it under all of them. Expired items are
+    kept until they are evicted so they can be revalidated with their eTag.
+    """
+
+    def __init__(
+        self, ttl: float = DEFAULT_CACHE_TTL, maxsize: int = DEFAULT_CACHE_MAXSIZE
+    ) -> None:
+        """Class constructor
+
+        Args:
+            ttl (float): Seconds an item stays cached for
+            maxsize (int): Maximum number of keys to cache before evicting the least recently used
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        """Get a cached item, counting the lookup as a hit or miss.
+
+        Args:
+            key (Hashable): The cache key
+
+        Returns:
+            dict: The cached item or None if it is missing or has expired
+        """
+        with self._lock:
+            value = self._get(key)
+
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            return value
+
+    def peek(self, key: Hashable) -> Optional[dict]:
+        """Get a cached item without counting it or changing its LRU position."""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                return None
+
+            return entry[1]
+
+    def stale(self, key: Hashable) -> Optional[dict]:
+        """Get a cached item even if it has expired, without counting it.
+
+        Args:
+            key (Hashable): The cache key
+
+        Returns:
+            dict: The item or None if it was never cached, evicted or invalidated
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            return None if entry is None else entry[1]
+
+    def set(self, keys: Iterable[Hashable], value: dict) -> None:
+        """Cache an item under one or more keys.
+
+        Args:
+            keys (list): The cache keys
+            value (dict): The item to cache
+        """
+        keys = list(keys)
+        entry = [time.monotonic() + self.ttl, value, keys]
+
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+            for key in keys:
+                self._entries[key] = entry
+
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove an item from the cache under all of its keys."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every item from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Get the hit and miss counters.
+
+        Returns:
+            dict: The hits, misses and current number of keys
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def _get(self, key: Hashable) -> Optional[dict]:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        if entry[0] < time.monotonic():
+            return None
+
+        self._entries.move_to_end(key)
+
+        return entry[1]
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            for k in entry[2]:
+                if self._entries.get(k) is entry:
+                    del self._entries[k]
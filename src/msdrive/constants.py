@@ -1,3 +1,44 @@
 BASE_GRAPH_URL = "https://graph.microsoft.com/v1.0"
 SIMPLE_UPLOAD_MAX_SIZE = 4000000  # 4MB
-CHUNK_UPLOAD_MAX_SIZE = 3276800  # ~3MB must be divisible by 327680 bytes
\ No newline at end of file
+CHUNK_UPLOAD_MAX_SIZE = 3276800  # ~3MB must be divisible by 327680 bytes
+DEFAULT_POOL_CONNECTIONS = 10  # number of host pools to cache
+DEFAULT_POOL_MAXSIZE = 10  # max connections kept alive per host
+DEFAULT_ASYNC_MAX_CONNECTIONS = 100
+DEFAULT_MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 1
+RETRY_STATUS_CODES = [500, 502, 504]
+CHUNK_UPLOAD_ALIGNMENT = 327680  # 320KiB, fragment sizes must be a multiple of this
+CHUNK_UPLOAD_LIMIT = 62914560  # 60MiB, the largest fragment Graph accepts
+UPLOAD_STATE_SUFFIX = ".upload-state.json"
+DOWNLOAD_CHUNK_SIZE = 8192
+ASYNC_WRITE_BUFFER_SIZE = 1048576  # 1MB gathered before each write off the event loop
+DOWNLOAD_SEGMENT_SIZE = 10485760  # 10MB
+DOWNLOAD_PARTIAL_SUFFIX = ".partial"
+BATCH_MAX_REQUESTS = 20  # the most sub-requests Graph accepts in one $batch
+SYNC_STATE_FILENAME = ".msdrive-sync.json"
+DEFAULT_CACHE_TTL = 60  # seconds
+DEFAULT_CACHE_MAXSIZE = 10000
+DOWNLOAD_URL_REJECTED_STATUS_CODES = [401, 403, 410]
+READER_BLOCK_SIZE = 1048576  # 1MB
+READER_MAX_BLOCKS = 16  # blocks kept in memory per open item
+READER_READ_AHEAD = 4  # blocks fetched at once when reading sequentially
+DEFAULT_THROTTLE_RETRIES = 5
+THROTTLE_BACKOFF_FACTOR = 1
+THROTTLE_MAX_BACKOFF = 60
+THROTTLE_STATUS_CODES = [429, 503]
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+TOKEN_REFRESH_MARGIN = 300  # refresh tokens 5 minutes before they expire
+COPY_POLL_INTERVAL = 1  # seconds before a copy monitor is first checked
+COPY_MAX_POLL_INTERVAL = 30  # the interval grows by half each round up to this
+DEFAULT_WALK_WORKERS = 8  # folders listed in parallel by walk
+WALK_PAGE_SIZE = 1000  # Graph caps larger pages at its own maximum
+WALK_SELECT = [
+    "id",
+    "name",
+    "size",
+    "eTag",
+    "cTag",
+    "lastModifiedDateTime",
+    "folder",
+    "file",
+]
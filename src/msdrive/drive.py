@@ -1,29 +1,206 @@
+import calendar
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from functools import partial
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import quote, urlencode
 
-from requests import Session
+from requests import Response, Session
 from requests.adapters import HTTPAdapter
-from requests.exceptions import HTTPError
+from requests.exceptions import ConnectionError, HTTPError, RequestException
 from urllib3.util.retry import Retry
 
-from .constants import CHUNK_UPLOAD_MAX_SIZE, SIMPLE_UPLOAD_MAX_SIZE
+from .auth import TokenProvider
+from .cache import MetadataCache
+from .constants import (
+    BASE_GRAPH_URL,
+    BATCH_MAX_REQUESTS,
+    CHUNK_UPLOAD_ALIGNMENT,
+    CHUNK_UPLOAD_LIMIT,
+    CHUNK_UPLOAD_MAX_SIZE,
+    COPY_MAX_POLL_INTERVAL,
+    COPY_POLL_INTERVAL,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_WALK_WORKERS,
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_PARTIAL_SUFFIX,
+    DOWNLOAD_SEGMENT_SIZE,
+    DOWNLOAD_URL_REJECTED_STATUS_CODES,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_STATUS_CODES,
+    SIMPLE_UPLOAD_MAX_SIZE,
+    SYNC_STATE_FILENAME,
+    UPLOAD_STATE_SUFFIX,
+    WALK_PAGE_SIZE,
+    WALK_SELECT,
+)
 from .exceptions import *
+from .hashes import HashVerifier
+from .instrumentation import RequestEvent, TransferProgress
+from .models import DriveItem, typed_page
+from .ranges import (
+    content_range,
+    merge_ranges,
+    parse_ranges,
+    range_header,
+    split_ranges,
+    subtract_ranges,
+)
+from .reader import ItemReader
+from .results import CopyResult, SyncResult, UploadResult
+from .state import TransferState, file_identity
+from .streams import (
+    BufferFragments,
+    BufferTypes,
+    FileFragments,
+    StreamSource,
+    source_size,
+)
+from .throttle import Throttle, ThrottledSession
+
+
+def _parse_datetime(value: str) -> int:
+    # Graph timestamps are UTC (e.g. 2022-01-31T12:00:00.123Z), seconds are enough here
+    return calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S"))
+
+
+def _parent_folders(item_path: str) -> List[str]:
+    # e.g. /a/b/c.csv -> ["/a", "/a/b"]
+    parts = item_path.strip("/").split("/")[:-1]
+
+    return ["/" + "/".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+def _if_match(**kwargs) -> Optional[dict]:
+    if kwargs.get("if_match"):
+        return {"If-Match": kwargs["if_match"]}
+
+    return None
+
+
+def _walk_select(select: Union[str, List[str], None]) -> List[str]:
+    if isinstance(select, str):
+        select = select.split(",")
+
+    fields = list(select or WALK_SELECT)
+
+    # walk needs these to tell folders from files and to descend into them
+    for field in ("id", "name", "folder", "file"):
+        if field not in fields:
+            fields.append(field)
+
+    return fields
+
+
+def _status_code(err: Exception) -> Optional[int]:
+    response = getattr(err, "response", None)
+
+    if response is not None:
+        return response.status_code
+
+    return getattr(err, "status_code", None)
+
+
+# Pre-authenticated URLs (upload sessions, download URLs) must not receive the
+# bearer token, setting a header to None drops it from the session defaults
+NO_AUTH = {"Authorization": None}
 
 
 class MSDrive(ABC):
     """Abstract class for accessing files stored in OneDrive and SharePoint using the Microsoft Graph API."""
 
-    def __init__(self, access_token: str) -> None:
+    def __init__(
+        self,
+        access_token: Union[str, TokenProvider, Callable[[], object], object],
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        metadata_cache: Optional[MetadataCache] = None,
+        download_url_ttl: float = 0,
+        throttle: Optional[Throttle] = None,
+        on_request: Optional[Callable[[RequestEvent], None]] = None,
+        base_url: str = BASE_GRAPH_URL,
+    ) -> None:
         """Class constructor that accepts a Microsoft access token for use with the API
 
+        Every instance owns a single pooled HTTP session that is shared by all
+        requests (and threads) made through it. Use the instance as a context
+        manager or call close() to release the pooled connections.
+
+        For long-running jobs pass a token provider instead of a token string: a
+        TokenProvider, or a callable or credential that a TokenProvider accepts.
+        The token is then refreshed shortly before it expires, and once more (with
+        the request resent) if the API rejects it, without resetting the pooled
+        connections or any upload session in progress.
+
         Args:
-            access_token (str): The access token
+            access_token (str): The access token, or a token provider
+            pool_connections (int): Number of host connection pools to cache
+            pool_maxsize (int): Maximum number of connections kept alive per host
+            pool_block (bool): Block when no free connection is available instead of opening a throwaway one
+            keep_alive (bool): Keep connections open between requests
+            max_retries (int): Retries for connection errors and 500, 502 and 504 responses
+            metadata_cache (MetadataCache): [OPTIONAL] Cache DriveItem metadata to skip repeated lookups
+            download_url_ttl (float): [OPTIONAL] Seconds to reuse an item's pre-authenticated download URL for
+            throttle (Throttle): [OPTIONAL] Rate limit and 429/503 retry policy, share one between instances to share its limit
+            on_request (callable): [OPTIONAL] Called with a RequestEvent after every request (e.g. an OpenTelemetryListener)
+            base_url (str): [OPTIONAL] Graph API root to send requests to (e.g. a local stand-in for testing)
         """
-        self.access_token = access_token
+        self.access_token = None
+        self.token_provider = None
+
+        if isinstance(access_token, str):
+            self.access_token = access_token
+        elif isinstance(access_token, TokenProvider):
+            self.token_provider = access_token
+        else:
+            self.token_provider = TokenProvider(access_token)
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self.metadata_cache = metadata_cache
+        self.throttle = throttle or Throttle()
+        self.on_request = on_request
+        self.base_url = base_url.rstrip("/")
+        self._download_urls = None
+
+        if download_url_ttl:
+            self._download_urls = MetadataCache(ttl=download_url_ttl)
+
+        self._http = None
+        self._http_lock = threading.Lock()
+        self._known_folders = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled HTTP session and release its connections."""
+        with self._http_lock:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
 
     def get_item_data(self, **kwargs) -> dict:
         """Get metadata for a DriveItem.
 
+        With a metadata cache an expired item is revalidated with If-None-Match
+        and its eTag, and reused (for another TTL) if the API answers 304.
+
         Args:
             drive_id (str): The drive ID (only for SharePoint)
             item_id (str): [EITHER] The item ID
@@ -32,25 +209,189 @@ class MSDrive(ABC):
         Returns:
             dict: JSON representation of a DriveItem resource
         """
-        r = self._session().get(self._get_drive_item_url(**kwargs))
+        url = self._get_drive_item_url(**kwargs)
+        stale = None
+        headers = None
 
-        return r.json()
+        if self.metadata_cache is not None:
+            key = self._get_cache_key(**kwargs)
+            data = self.metadata_cache.get(key)
+
+            if data is not None:
+                return data
+
+            stale = self.metadata_cache.stale(key)
+
+            if stale is not None and stale.get("eTag"):
+                headers = {"If-None-Match": stale["eTag"]}
+
+        r = self._session().get(url, headers=headers)
+        data = stale if r.status_code == 304 else r.json()
+
+        if self.metadata_cache is not None:
+            self._cache_item(data, **kwargs)
+
+        return data
 
     def list_items(self, **kwargs) -> dict:
         """List the DriveItems in a specific folder path.
 
+        Only the first page of results is returned, follow @odata.nextLink
+        or use iter_items for the rest. With a metadata cache a listing that
+        came with an ETag header is revalidated with If-None-Match next time,
+        and reused if the API answers 304.
+
         Args:
             drive_id (str): The drive ID (only for SharePoint)
-            folder_path (str): The folder path (or leave out for root)
+            folder_id (str): [EITHER] The folder item ID
+            folder_path (str): [EITHER] The folder path (or leave out for root)
+            top (int): [OPTIONAL] Page size
+            select (list): [OPTIONAL] Properties to return (e.g. ["id", "name"])
+            orderby (str): [OPTIONAL] Property to sort by (e.g. "name desc")
+            typed (bool): [OPTIONAL] Return the items as compact DriveItem objects instead of dicts (default False)
 
         Returns:
             dict: JSON representation of a collection of DriveItem resources
         """
-        r = self._session().get(self._get_drive_children_url(**kwargs))
+        url = self._get_drive_children_url(**kwargs)
+        params = self._get_query_params(**kwargs)
+        cached = None
+        headers = None
 
-        return r.json()
+        if self.metadata_cache is not None:
+            drive_url = self._get_drive_url(**kwargs)
+            key = (drive_url, "children", url, tuple(sorted(params.items())))
+            cached = self.metadata_cache.stale(key)
+
+            if cached is not None:
+                headers = {"If-None-Match": cached["eTag"]}
+
+        r = self._session().get(url, params=params, headers=headers)
+
+        if r.status_code == 304:
+            data = cached["page"]
+            return typed_page(data, DriveItem) if kwargs.get("typed") else data
+
+        data = r.json()
+
+        if self.metadata_cache is not None:
+            for item in data.get("value", []):
+                self._check_cached_item(item, drive_url)
+
+            if r.headers.get("ETag"):
+                self.metadata_cache.set(
+                    [key], {"eTag": r.headers["ETag"], "page": data}
+                )
+
+        return typed_page(data, DriveItem) if kwargs.get("typed") else data
+
+    def iter_items(self, **kwargs) -> Iterator[dict]:
+        """Iterate over all the DriveItems in a specific folder path.
+
+        Pages are fetched lazily as the iterator is consumed.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            folder_id (str): [EITHER] The folder item ID
+            folder_path (str): [EITHER] The folder path (or leave out for root)
+            top (int): [OPTIONAL] Page size
+            select (list): [OPTIONAL] Properties to return (e.g. ["id", "name"])
+            orderby (str): [OPTIONAL] Property to sort by (e.g. "name desc")
+            typed (bool): [OPTIONAL] Yield compact DriveItem objects instead of dicts (default False)
+
+        Yields:
+            dict: JSON representation of a DriveItem resource (a DriveItem if typed)
+        """
+        items = self._iter_pages(
+            self._get_drive_children_url(**kwargs), self._get_query_params(**kwargs)
+        )
+
+        if self.metadata_cache is not None:
+            drive_url = self._get_drive_url(**kwargs)
+            items = (self._check_cached_item(item, drive_url) for item in items)
+
+        return map(DriveItem, items) if kwargs.get("typed") else items
+
+    def walk(self, **kwargs) -> Iterator[Tuple[str, List[dict], List[dict]]]:
+        """Walk a folder tree like os.walk, yielding each folder's subfolders and files.
+
+        Folders are listed breadth-first, several at a time, and addressed by item
+        ID so no path is resolved twice. Only the properties in select are fetched.
+        Paths are relative to the folder the walk starts from ("" for that folder
+        itself, then e.g. "Reports/2023"). Remove items from the subfolders list
+        before the next iteration to skip walking them, as with os.walk.
 
-    def download_item(self, **kwargs) -> None:
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            folder_id (str): [EITHER] The folder item ID
+            folder_path (str): [EITHER] The folder path (or leave out for root)
+            max_workers (int): [OPTIONAL] Number of folders to list in parallel (default 8)
+            top (int): [OPTIONAL] Page size (default 1000)
+            select (list): [OPTIONAL] Properties to return (id, name, folder and file are always included)
+
+        Yields:
+            tuple: The folder path, its subfolders and its other items (DriveItem dicts)
+        """
+        drive_kwargs = {"drive_id": kwargs.get("drive_id")}
+        params = self._get_query_params(
+            top=kwargs.get("top") or WALK_PAGE_SIZE,
+            select=_walk_select(kwargs.get("select")),
+        )
+        max_workers = kwargs.get("max_workers") or DEFAULT_WALK_WORKERS
+        pending = deque(
+            [
+                (
+                    "",
+                    {
+                        **drive_kwargs,
+                        "folder_id": kwargs.get("folder_id"),
+                        "folder_path": kwargs.get("folder_path"),
+                    },
+                )
+            ]
+        )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+
+            try:
+                while pending or running:
+                    # Only list as many folders as there are workers, the rest wait
+                    # in pending so pruned subfolders are never requested
+                    while pending and len(running) < max_workers:
+                        path, folder_kwargs = pending.popleft()
+                        future = executor.submit(
+                            self._list_folder, params, **folder_kwargs
+                        )
+                        running[future] = path
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        path = running.pop(future)
+                        folders, files = [], []
+
+                        for item in future.result():
+                            (folders if "folder" in item else files).append(item)
+
+                        yield path, folders, files
+
+                        for folder in folders:
+                            pending.append(
+                                (
+                                    (
+                                        path + "/" + folder["name"]
+                                        if path
+                                        else folder["name"]
+                                    ),
+                                    {**drive_kwargs, "folder_id": folder["id"]},
+                                )
+                            )
+            finally:
+                for future in running:
+                    future.cancel()
+
+    def download_item(self, **kwargs) -> bool:
         """Download a DriveItem file to a specific local path.
 
         Args:
@@ -58,40 +399,601 @@ class MSDrive(ABC):
             item_id (str): [EITHER] The item ID
             item_path (str): [EITHER] The item path
             file_path (str): Local path to save the file to (e.g. /tmp/blah.csv)
+            max_workers (int): [OPTIONAL] Number of byte ranges to download in parallel (default 1)
+            segment_size (int): [OPTIONAL] Size of each byte range when downloading in parallel
+            segment_retries (int): [OPTIONAL] How many times to retry a failed byte range
+            resume (bool): [OPTIONAL] Keep a .partial file to continue from if the download is interrupted
+            verify (bool|list): [OPTIONAL] Compare the file with the item's hashes, True picks the best available
+                hash or pass names (quickXorHash, sha256Hash, sha1Hash), raises HashMismatch on a difference
+            progress (callable): [OPTIONAL] Called with (bytes downloaded, total bytes) as the download proceeds
+            if_none_match (str): [OPTIONAL] Skip the download if the item's eTag or cTag is still this one (e.g. from the last download)
+
+        Returns:
+            bool: False if the download was skipped because of if_none_match
         """
         if not kwargs.get("file_path"):
             raise ValueError("Missing file_path argument")
 
-        data = self.get_item_data(**kwargs)
+        data, cached = self._get_download_data(**kwargs)
 
-        with Session().get(data["@microsoft.graph.downloadUrl"], stream=True) as r:
-            r.raise_for_status()
+        tag = kwargs.get("if_none_match")
 
-            with open(kwargs["file_path"], "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        if tag and tag in (data.get("eTag"), data.get("cTag")):
+            return False
+
+        try:
+            self._download(data, **kwargs)
+        except (DriveException, HTTPError) as err:
+            if (
+                not cached
+                or _status_code(err) not in DOWNLOAD_URL_REJECTED_STATUS_CODES
+            ):
+                raise
+
+            # The cached download URL has expired, get a new one and try again
+            data, _ = self._get_download_data(refresh=True, **kwargs)
+            self._download(data, **kwargs)
+
+        return True
+
+    def open_item(self, **kwargs) -> ItemReader:
+        """Open a DriveItem file as a seekable read-only binary stream.
+
+        Nothing is written to disk, byte ranges are requested as they are read.
+        The stream can be passed straight to libraries such as zipfile, pandas
+        or pyarrow.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            item_id (str): [EITHER] The item ID
+            item_path (str): [EITHER] The item path
+            block_size (int): [OPTIONAL] Size of each block requested and cached
+            max_blocks (int): [OPTIONAL] Maximum number of blocks kept in memory
+            read_ahead (int): [OPTIONAL] Blocks requested at once when reading sequentially
 
-    def upload_item(self, **kwargs) -> None:
-        """Upload a local file to an existing or new DriveItem.
+        Returns:
+            ItemReader: A file-like object over the item contents
+        """
+        data, _ = self._get_download_data(**kwargs)
+
+        def fetch_range(start: int, end: int) -> bytes:
+            nonlocal data
+
+            try:
+                return self._get_range(data["@microsoft.graph.downloadUrl"], start, end)
+            except (DriveException, HTTPError) as err:
+                if _status_code(err) not in DOWNLOAD_URL_REJECTED_STATUS_CODES:
+                    raise
+
+            # The download URL has expired, get a new one and try again
+            data, _ = self._get_download_data(refresh=True, **kwargs)
+
+            return self._get_range(data["@microsoft.graph.downloadUrl"], start, end)
+
+        options = ("block_size", "max_blocks", "read_ahead")
+
+        return ItemReader(
+            fetch_range,
+            data.get("size", 0),
+            name=data.get("name"),
+            **{k: kwargs[k] for k in options if kwargs.get(k)},
+        )
+
+    def upload_item(self, **kwargs) -> dict:
+        """Upload a local file or in-memory/streamed data to an existing or new DriveItem.
 
         Specify the item_path for a new file.
         Specify the item_path or item_id for an existing file.
 
+        Files larger than 4MB are sent in fragments through an upload session.
+        Setting max_workers above 1 keeps that many fragments in flight at once,
+        note that some Graph backends only accept fragments in order.
+
+        Instead of a file_path, data can be bytes, a memoryview, a readable file
+        object (including pipes) or an iterable of bytes chunks of unknown total
+        length. Bytes-like data is sent as zero-copy slices, other sources are read
+        through two reused chunk_size buffers so the whole payload is never held in
+        memory. Streamed sources are uploaded sequentially and cannot be resumed.
+
+        For large files, read_mode="buffer" reads every fragment into one reused
+        buffer per worker and read_mode="mmap" sends zero-copy slices of a memory
+        map, keeping memory at a fixed multiple of chunk_size instead of
+        allocating a new bytes object per fragment.
+
         Args:
             drive_id (str): The drive ID (only for SharePoint)
             item_id (str): [EITHER] The item ID
             item_path (str): [EITHER] The item path
-            file_path (str): Local path to upload the file from (e.g. /tmp/blah.csv)
+            file_path (str): [EITHER] Local path to upload the file from (e.g. /tmp/blah.csv)
+            data (object): [EITHER] Bytes-like data, a readable file object or an iterable of bytes
+            chunk_size (int): [OPTIONAL] Fragment size, a multiple of 327680 bytes up to 60MiB
+            max_workers (int): [OPTIONAL] Number of fragments to upload in parallel (default 1)
+            resume (bool): [OPTIONAL] Persist the upload session so an interrupted upload can continue
+            state_path (str): [OPTIONAL] Where to keep the resume state (defaults to next to file_path)
+            resume_hash (str): [OPTIONAL] Also hash the file (e.g. sha256) to detect changed contents
+            read_mode (str): [OPTIONAL] How fragments of file_path are read: copy (default), buffer or mmap
+            verify (bool|list): [OPTIONAL] Compare the uploaded item's hashes with the source, True uses
+                quickXorHash or pass names (quickXorHash, sha256Hash, sha1Hash), raises HashMismatch on a difference
+            progress (callable): [OPTIONAL] Called with (bytes uploaded, total bytes or None if unknown) after each fragment
+            if_match (str): [OPTIONAL] Only replace the item if its eTag or cTag is still this one, raises PreconditionFailed otherwise
+
+        Returns:
+            dict: JSON representation of the uploaded DriveItem resource
         """
-        if not kwargs.get("file_path"):
-            raise ValueError("Missing file_path argument")
+        if kwargs.get("data") is None and not kwargs.get("file_path"):
+            raise ValueError("Missing file_path or data argument")
+
+        # Raises ValueError for a missing item reference before the cache is touched
+        self._get_drive_item_url(**kwargs)
+
+        if kwargs.get("data") is not None:
+            size = source_size(kwargs["data"])
+        else:
+            size = os.stat(kwargs["file_path"]).st_size
+
+        verifier = HashVerifier.create(kwargs.get("verify"))
+        tracker = TransferProgress.create(kwargs.get("progress"), size)
+        item = None
+
+        try:
+            if kwargs.get("data") is not None:
+                item = self._upload_data(verifier, tracker, **kwargs)
+            elif size <= SIMPLE_UPLOAD_MAX_SIZE:
+                item = self._upload_item_small(verifier, tracker, **kwargs)
+            else:
+                item = self._upload_item_large(verifier, tracker, **kwargs)
+        finally:
+            self._invalidate_cached_item(item, **kwargs)
+
+        if verifier is not None:
+            if kwargs.get("data") is None:
+                # Only fragments sent before a resumed upload are read again
+                verifier.finish(kwargs["file_path"], size)
+
+            self._verify_upload(verifier, item, **kwargs)
+
+        return item
+
+    def upload_items(self, **kwargs) -> List[UploadResult]:
+        """Upload many local files, or a whole local directory, in parallel.
+
+        Missing remote folders are created once up front (and remembered for
+        later calls). A failed file does not stop the others, check each
+        result for its error.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            local_path (str): [EITHER] Local directory to upload recursively
+            files (list): [EITHER] (file_path, item_path) tuples to upload
+            folder_path (str): [OPTIONAL] Remote folder to upload local_path into (or leave out for root)
+            max_workers (int): [OPTIONAL] Number of files to upload in parallel (default 4)
+            chunk_size (int): [OPTIONAL] Fragment size for large files
+
+        Returns:
+            list: An UploadResult for each file
+        """
+        if kwargs.get("local_path"):
+            files, folders = self._get_local_files(**kwargs)
+        elif kwargs.get("files") is not None:
+            files, folders = list(kwargs["files"]), set()
+        else:
+            raise ValueError("Missing argument: local_path or files")
+
+        for _, item_path in files:
+            folders.update(_parent_folders(item_path))
+
+        failed_folders = self._create_folders(folders, **kwargs)
+        upload_kwargs = {
+            k: v for k, v in kwargs.items() if k in ("drive_id", "chunk_size")
+        }
+        results = []
+
+        with ThreadPoolExecutor(max_workers=kwargs.get("max_workers") or 4) as executor:
+            futures = {}
+
+            for file_path, item_path in files:
+                result = UploadResult(file_path, item_path)
+                results.append(result)
+
+                for folder in _parent_folders(item_path):
+                    if folder in failed_folders:
+                        result.error = failed_folders[folder]
+                        break
+                else:
+                    futures[
+                        executor.submit(
+                            self.upload_item,
+                            item_path=item_path,
+                            file_path=file_path,
+                            **upload_kwargs,
+                        )
+                    ] = result
+
+            for future in as_completed(futures):
+                try:
+                    futures[future].item = future.result()
+                except Exception as err:
+                    futures[future].error = err
+
+        return results
+
+    def copy_item(self, **kwargs) -> CopyResult:
+        """Copy a DriveItem (a file or a whole folder) on the server side.
+
+        No content passes through this client, Graph makes the copy in the
+        background (also into another drive) and reports its progress through a
+        monitor URL. By default this waits for the copy to finish, pass
+        wait=False to return once it has started and check on it later with
+        get_copy_status or wait_for_copies.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            item_id (str): [EITHER] The item ID
+            item_path (str): [EITHER] The item path
+            dest_drive_id (str): [OPTIONAL] The drive to copy into (default is the same drive)
+            dest_folder_id (str): [EITHER] The destination folder ID
+            dest_folder_path (str): [EITHER] The destination folder path (leave out both to copy next to the item)
+            name (str): [OPTIONAL] Name for the copy (default is the item's name)
+            conflict_behavior (str): [OPTIONAL] fail, replace or rename when the name is taken
+            wait (bool): [OPTIONAL] Wait for the copy to finish (default True)
+            timeout (float): [OPTIONAL] Seconds to wait for it (default is no limit)
+            poll_interval (float): [OPTIONAL] Seconds before the first progress check (default 1)
+
+        Returns:
+            CopyResult: The progress of the copy, with the new item ID once completed
+
+        Raises:
+            DriveException: When the copy fails or is still running after the timeout
+        """
+        result = self._start_copy(**kwargs)
+
+        if kwargs.get("wait", True):
+            self.wait_for_copies([result], **kwargs)
+
+            if result.error is not None:
+                raise result.error
+
+            if not result.done:
+                raise DriveException(
+                    "Copy still running after {} seconds".format(kwargs["timeout"])
+                )
+
+        return result
+
+    def copy_items(self, copies: list, **kwargs) -> List[CopyResult]:
+        """Start many server-side copies in parallel and wait for them together.
+
+        Each destination folder path is only looked up once. A failed copy does
+        not stop the others, check each result's status and error.
+
+        Args:
+            copies (list): copy_item arguments for each copy, e.g. {"item_path": "/a.csv", "dest_folder_path": "/Archive"}
+            max_workers (int): [OPTIONAL] Number of copies to start and monitors to check in parallel (default 4)
+            wait (bool): [OPTIONAL] Wait for every copy to finish (default True)
+            timeout (float): [OPTIONAL] Seconds to wait for them (default is no limit)
+            poll_interval (float): [OPTIONAL] Seconds before the first progress check (default 1)
+
+        Returns:
+            list: A CopyResult for each copy, in the same order as copies
+        """
+        results = [CopyResult() for _ in copies]
+        folder_ids = {}
+
+        with ThreadPoolExecutor(max_workers=kwargs.get("max_workers") or 4) as executor:
+            futures = {}
+
+            for i, copy in enumerate(copies):
+                try:
+                    copy = self._resolve_dest_folder(copy, folder_ids)
+                except Exception as err:
+                    results[i].status = "failed"
+                    results[i].error = err
+                    continue
+
+                futures[executor.submit(self._start_copy, **copy)] = i
+
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as err:
+                    results[futures[future]].status = "failed"
+                    results[futures[future]].error = err
+
+        if kwargs.get("wait", True):
+            self.wait_for_copies(results, **kwargs)
+
+        return results
+
+    def get_copy_status(self, result: CopyResult) -> CopyResult:
+        """Check the progress of a server-side copy once.
+
+        Args:
+            result (CopyResult): The copy, from copy_item or copy_items
+
+        Returns:
+            CopyResult: The same result, updated
+        """
+        # The monitor redirects to the new item when done, which needs a token
+        r = self._session().get(
+            result.monitor_url, headers=NO_AUTH, allow_redirects=False
+        )
+
+        if r.is_redirect:
+            result.status = "completed"
+            result.percentage_complete = 100.0
+            result.item_id = r.headers["Location"].rstrip("/").rsplit("/", 1)[-1]
+
+            return result
+
+        data = r.json()
+        result.status = data.get("status", result.status)
+        result.percentage_complete = data.get(
+            "percentageComplete", result.percentage_complete
+        )
+        result.item_id = data.get("resourceId", result.item_id)
+
+        if result.status == "completed":
+            result.percentage_complete = 100.0
+        elif result.status == "failed":
+            error = data.get("error") or {}
+            result.error = DriveException(error.get("message") or "Copy failed")
+
+        return result
+
+    def wait_for_copies(self, results: List[CopyResult], **kwargs) -> List[CopyResult]:
+        """Wait for server-side copies to finish, checking their monitors together.
+
+        Every round checks all the unfinished copies in parallel, and the
+        interval between rounds grows by half each time up to 30 seconds.
+
+        Args:
+            results (list): CopyResults from copy_item or copy_items
+            max_workers (int): [OPTIONAL] Number of monitors to check in parallel (default 4)
+            timeout (float): [OPTIONAL] Seconds to wait for them (default is no limit)
+            poll_interval (float): [OPTIONAL] Seconds before the first progress check (default 1)
+
+        Returns:
+            list: The same CopyResults, updated (those still running at the timeout are not done)
+        """
+        interval = kwargs.get("poll_interval", COPY_POLL_INTERVAL)
+        deadline = None
+
+        if kwargs.get("timeout") is not None:
+            deadline = time.monotonic() + kwargs["timeout"]
+
+        with ThreadPoolExecutor(max_workers=kwargs.get("max_workers") or 4) as executor:
+            while True:
+                pending = [r for r in results if not r.done]
+
+                if not pending:
+                    break
+
+                if deadline is None:
+                    time.sleep(interval)
+                elif deadline > time.monotonic():
+                    time.sleep(min(interval, deadline - time.monotonic()))
+                else:
+                    break
+
+                list(executor.map(self._poll_copy, pending))
+                interval = min(interval * 1.5, COPY_MAX_POLL_INTERVAL)
+
+        return results
+
+    def move_item(self, **kwargs) -> dict:
+        """Move or rename a DriveItem.
 
-        file_size = os.stat(kwargs["file_path"]).st_size
+        Within a drive the item is moved on the server with a PATCH and keeps
+        its ID. Graph cannot move items between drives, so then it is copied on
+        the server side, the copy is waited for and the original is deleted.
 
-        if file_size <= SIMPLE_UPLOAD_MAX_SIZE:
-            self._upload_item_small(**kwargs)
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            item_id (str): [EITHER] The item ID
+            item_path (str): [EITHER] The item path
+            dest_drive_id (str): [OPTIONAL] The drive to move into (default is the same drive)
+            dest_folder_id (str): [EITHER] The destination folder ID
+            dest_folder_path (str): [EITHER] The destination folder path (leave out both to rename in place)
+            name (str): [OPTIONAL] New name for the item
+            conflict_behavior (str): [OPTIONAL] fail, replace or rename when the name is taken
+            timeout (float): [OPTIONAL] Seconds to wait for a copy between drives (default is no limit)
+
+        Returns:
+            dict: JSON representation of the moved DriveItem resource
+        """
+        if kwargs.get("dest_drive_id") and kwargs["dest_drive_id"] != kwargs.get(
+            "drive_id"
+        ):
+            result = self.copy_item(**{**kwargs, "wait": True})
+            r = self._session().get(
+                f"{self._get_dest_drive_url(**kwargs)}/items/{result.item_id}"
+            )
+            self._session().delete(self._get_drive_item_url(**kwargs))
+            item = r.json()
         else:
-            self._upload_item_large(**kwargs)
+            r = self._session().patch(
+                self._get_drive_item_url(**kwargs),
+                json=self._get_move_body(**kwargs),
+                params=self._get_conflict_params(**kwargs),
+            )
+            item = r.json()
+
+        self._invalidate_cached_item(item, **kwargs)
+
+        return item
+
+    def batch(self, calls: list, max_workers: int = 4) -> list:
+        """Run many metadata calls through Graph JSON batching ($batch).
+
+        Calls are grouped into batches of up to 20 sub-requests and several
+        batches are sent at once. A failed call does not fail the others, its
+        exception (e.g. ItemNotFound or RateLimited) is returned in its place.
+
+        Args:
+            calls (list): (method, kwargs) tuples where method is get_item_data or list_items
+                (or list_site_drives for SharePoint), e.g. ("get_item_data", {"item_path": "/a.csv"})
+            max_workers (int): Number of batches to send in parallel
+
+        Returns:
+            list: JSON response or DriveException for each call, in the same order as calls
+        """
+        sub_requests = [
+            {
+                "id": str(i),
+                "method": "GET",
+                "url": self._get_batch_url(method, **kwargs)[len(self.base_url) :],
+            }
+            for i, (method, kwargs) in enumerate(calls)
+        ]
+        batches = [
+            sub_requests[i : i + BATCH_MAX_REQUESTS]
+            for i in range(0, len(sub_requests), BATCH_MAX_REQUESTS)
+        ]
+        results = [None] * len(sub_requests)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for responses in executor.map(self._send_batch, batches):
+                for response in responses:
+                    results[int(response["id"])] = self._get_batch_result(response)
+
+        return results
+
+    def iter_delta(self, **kwargs) -> Iterator[dict]:
+        """Iterate over the DriveItems created, changed or deleted since the last sync.
+
+        Without a delta_link (or saved state) every item in the drive is returned.
+        Deleted items have a "deleted" facet. The new deltaLink is saved to
+        state_path once every page has been consumed and is also the return
+        value of the generator (e.g. delta_link = yield from drive.iter_delta()).
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            delta_link (str): [OPTIONAL] The deltaLink returned by the previous sync
+            state_path (str): [OPTIONAL] Local file to load and save the deltaLink between runs
+            top (int): [OPTIONAL] Page size
+            select (list): [OPTIONAL] Properties to return (e.g. ["id", "name", "deleted"])
+
+        Yields:
+            dict: JSON representation of a DriveItem resource
+        """
+        drive_url = self._get_drive_url(**kwargs)
+        root_url = drive_url + "/root/delta"
+        url = kwargs.get("delta_link")
+        state = None
+        params = None
+
+        if kwargs.get("state_path"):
+            state = TransferState(kwargs["state_path"])
+            url = url or state.load().get(root_url)
+
+        if not url:
+            url, params = root_url, self._get_query_params(**kwargs)
+
+        while True:
+            try:
+                page = self._session().get(url, params=params).json()
+            except ResyncRequired:
+                if url == root_url:
+                    raise
+
+                # The token expired so enumerate the whole drive again
+                url, params = root_url, self._get_query_params(**kwargs)
+                continue
+
+            for item in page.get("value", []):
+                if self.metadata_cache is not None:
+                    self._check_cached_item(item, drive_url)
+
+                yield item
+
+            if not page.get("@odata.nextLink"):
+                break
+
+            url, params = page["@odata.nextLink"], None
+
+        delta_link = page.get("@odata.deltaLink")
+
+        if state is not None and delta_link:
+            state.save(**{root_url: delta_link})
+
+        return delta_link
+
+    def sync_folder(self, **kwargs) -> SyncResult:
+        """Mirror a remote folder and its subfolders to a local directory.
+
+        Only files whose size, modified time or cTag differ from the last sync
+        are downloaded. Sync details are kept in a .msdrive-sync.json file in
+        the local directory.
+
+        Args:
+            drive_id (str): The drive ID (only for SharePoint)
+            folder_path (str): The folder path (or leave out for root)
+            local_path (str): Local directory to mirror the folder to
+            max_workers (int): [OPTIONAL] Number of files to download in parallel (default 4)
+            delete (bool): [OPTIONAL] Delete local files that no longer exist remotely
+
+        Returns:
+            SyncResult: The number of files and bytes transferred
+        """
+        if not kwargs.get("local_path"):
+            raise ValueError("Missing local_path argument")
+
+        local_path = kwargs["local_path"]
+        state = TransferState(os.path.join(local_path, SYNC_STATE_FILENAME))
+        os.makedirs(local_path, exist_ok=True)
+        synced = state.load()
+        remote = {}
+        result = SyncResult()
+
+        for rel_path, item in self._iter_files(**kwargs):
+            remote[rel_path] = item
+
+        with ThreadPoolExecutor(max_workers=kwargs.get("max_workers") or 4) as executor:
+            futures = {}
+
+            for rel_path, item in remote.items():
+                file_path = os.path.join(local_path, *rel_path.split("/"))
+
+                if self._is_synced(file_path, item, synced.get(rel_path)):
+                    result.files_skipped += 1
+                    continue
+
+                futures[executor.submit(self._sync_file, file_path, item, **kwargs)] = (
+                    rel_path
+                )
+
+            for future in as_completed(futures):
+                rel_path = futures[future]
+
+                try:
+                    synced[rel_path] = future.result()
+                except Exception as err:
+                    result.errors[rel_path] = err
+                    continue
+
+                result.files_downloaded += 1
+                result.bytes_downloaded += remote[rel_path].get("size", 0)
+
+        if kwargs.get("delete"):
+            for root, _, files in os.walk(local_path):
+                for name in files:
+                    file_path = os.path.join(root, name)
+                    rel_path = os.path.relpath(file_path, local_path).replace(
+                        os.sep, "/"
+                    )
+
+                    if rel_path != SYNC_STATE_FILENAME and rel_path not in remote:
+                        os.remove(file_path)
+                        result.files_deleted += 1
+
+        state.delete()
+        state.save(**{k: v for k, v in synced.items() if k in remote})
+
+        return result
+
+    @abstractmethod
+    def _get_drive_url(self, **kwargs) -> str:
+        raise NotImplementedError("Must be overridden")
 
     @abstractmethod
     def _get_drive_item_url(self, **kwargs) -> str:
@@ -101,75 +1003,864 @@ class MSDrive(ABC):
     def _get_drive_children_url(self, **kwargs) -> str:
         raise NotImplementedError("Must be overridden")
 
+    def _get_batch_url(self, method: str, **kwargs) -> str:
+        if method == "get_item_data":
+            return self._get_drive_item_url(**kwargs)
+
+        if method == "list_items":
+            url = self._get_drive_children_url(**kwargs)
+            params = self._get_query_params(**kwargs)
+
+            # Same query as list_items sends, kept readable as in the Graph docs
+            return url + "?" + urlencode(params, safe="$,") if params else url
+
+        raise ValueError("Unsupported batch method: " + method)
+
+    def _send_batch(self, sub_requests: list) -> list:
+        r = self._session().post(
+            f"{self.base_url}/$batch", json={"requests": sub_requests}
+        )
+
+        return r.json()["responses"]
+
+    def _get_batch_result(self, response: dict):
+        if response["status"] < 400:
+            return response.get("body")
+
+        try:
+            message = response["body"]["error"]["message"]
+        except Exception:
+            message = "Request failed with status {}".format(response["status"])
+
+        return exception_for_status(response["status"], message)
+
+    def _get_cache_key(self, **kwargs) -> tuple:
+        if kwargs.get("item_id"):
+            return (self._get_drive_url(**kwargs), "id", kwargs["item_id"])
+
+        return (self._get_drive_url(**kwargs), "path", kwargs["item_path"].strip("/"))
+
+    def _cache_item(self, data: dict, **kwargs) -> None:
+        keys = [self._get_cache_key(**kwargs)]
+
+        if data.get("id"):
+            keys.append(
+                self._get_cache_key(drive_id=kwargs.get("drive_id"), item_id=data["id"])
+            )
+
+        self.metadata_cache.set(keys, data)
+
+    def _invalidate_cached_item(self, item: Optional[dict], **kwargs) -> None:
+        # Drop the item by path and by ID from the metadata and download URL caches
+        if self.metadata_cache is None and self._download_urls is None:
+            return
+
+        keys = [self._get_cache_key(**kwargs)]
+
+        if item and item.get("id"):
+            keys.append(
+                self._get_cache_key(drive_id=kwargs.get("drive_id"), item_id=item["id"])
+            )
+
+        for cache in (self.metadata_cache, self._download_urls):
+            if cache is not None:
+                for key in keys:
+                    cache.invalidate(key)
+
+    def _check_cached_item(self, item: dict, drive_url: str) -> dict:
+        # Drop a cached item that a listing shows has since changed or been deleted
+        key = (drive_url, "id", item.get("id"))
+        cached = self.metadata_cache.peek(key)
+
+        if cached is not None and (
+            "deleted" in item or cached.get("eTag") != item.get("eTag")
+        ):
+            self.metadata_cache.invalidate(key)
+
+        return item
+
+    def _get_query_params(self, **kwargs) -> dict:
+        params = {}
+
+        if kwargs.get("top"):
+            params["$top"] = kwargs["top"]
+
+        if kwargs.get("select"):
+            select = kwargs["select"]
+            params["$select"] = select if isinstance(select, str) else ",".join(select)
+
+        if kwargs.get("orderby"):
+            params["$orderby"] = kwargs["orderby"]
+
+        return params
+
+    def _iter_pages(self, url: str, params: Optional[dict] = None) -> Iterator[dict]:
+        while url:
+            page = self._session().get(url, params=params).json()
+            url = page.get("@odata.nextLink")
+            params = None  # the next link already carries the query
+
+            yield from page.get("value", [])
+
+    def _get_local_files(self, **kwargs) -> tuple:
+        local_path = kwargs["local_path"]
+        folder_path = (kwargs.get("folder_path") or "").strip("/")
+        prefix = "/" + folder_path + "/" if folder_path else "/"
+        files = []
+        folders = set()
+
+        for root, dir_names, file_names in os.walk(local_path):
+            rel_root = os.path.relpath(root, local_path).replace(os.sep, "/")
+            rel_root = "" if rel_root == "." else rel_root + "/"
+
+            for name in dir_names:
+                folders.add(prefix + rel_root + name)
+
+            for name in file_names:
+                files.append((os.path.join(root, name), prefix + rel_root + name))
+
+        return files, folders
+
+    def _create_folders(self, folders: set, **kwargs) -> dict:
+        drive_url = self._get_drive_url(**kwargs)
+        failed = {}
+
+        # Parents must exist before their children, so create one level at a time
+        for depth in sorted({folder.count("/") for folder in folders}):
+            level = [
+                folder
+                for folder in folders
+                if folder.count("/") == depth
+                and (drive_url, folder) not in self._known_folders
+            ]
+
+            with ThreadPoolExecutor(
+                max_workers=kwargs.get("max_workers") or 4
+            ) as executor:
+                futures = {
+                    executor.submit(self._create_folder, folder, **kwargs): folder
+                    for folder in level
+                    if not any(f in failed for f in _parent_folders(folder))
+                }
+
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as err:
+                        failed[futures[future]] = err
+                    else:
+                        self._known_folders.add((drive_url, futures[future]))
+
+        return failed
+
+    def _create_folder(self, folder: str, **kwargs) -> None:
+        parent, _, name = folder.rpartition("/")
+        url = self._get_drive_children_url(
+            drive_id=kwargs.get("drive_id"), folder_path=parent
+        )
+        body = {
+            "name": name,
+            "folder": {},
+            "@microsoft.graph.conflictBehavior": "fail",
+        }
+
+        try:
+            self._session().post(url, json=body)
+        except ItemAlreadyExists:
+            pass
+
+    def _list_folder(self, params: dict, **kwargs) -> List[dict]:
+        items = list(self._iter_pages(self._get_drive_children_url(**kwargs), params))
+
+        if self.metadata_cache is not None:
+            drive_url = self._get_drive_url(**kwargs)
+
+            for item in items:
+                self._check_cached_item(item, drive_url)
+
+        return items
+
+    def _iter_files(self, **kwargs) -> Iterator[tuple]:
+        walk = self.walk(
+            drive_id=kwargs.get("drive_id"),
+            folder_path=kwargs.get("folder_path"),
+            select=WALK_SELECT + ["@microsoft.graph.downloadUrl"],
+        )
+
+        for path, _, items in walk:
+            prefix = path + "/" if path else ""
+
+            for item in items:
+                if "file" in item:
+                    yield prefix + item["name"], item
+
+    def _is_synced(self, file_path: str, item: dict, synced: Optional[dict]) -> bool:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return False
+
+        if stat.st_size != item.get("size"):
+            return False
+
+        if synced:
+            return synced["cTag"] == item.get("cTag") and synced["mtime"] == (
+                stat.st_mtime_ns
+            )
+
+        return int(stat.st_mtime) == _parse_datetime(item["lastModifiedDateTime"])
+
+    def _sync_file(self, file_path: str, item: dict, **kwargs) -> dict:
+        tmp_path = file_path + DOWNLOAD_PARTIAL_SUFFIX
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        url = item.get("@microsoft.graph.downloadUrl")
+
+        try:
+            if url:
+                self._download_stream(url, tmp_path)
+        except (DriveException, HTTPError) as err:
+            if _status_code(err) not in DOWNLOAD_URL_REJECTED_STATUS_CODES:
+                raise
+
+            # The URL from the listing has expired since the walk, get a new one
+            url = None
+
+        if not url:
+            self.download_item(
+                drive_id=kwargs.get("drive_id"), item_id=item["id"], file_path=tmp_path
+            )
+
+        mtime = _parse_datetime(item["lastModifiedDateTime"])
+        os.utime(tmp_path, (mtime, mtime))
+        os.replace(tmp_path, file_path)
+
+        return {"cTag": item.get("cTag"), "mtime": os.stat(file_path).st_mtime_ns}
+
     def _session(self) -> Session:
-        s = Session()
-        s.hooks["response"] = [self.raise_error_hook]
-        s.headers.update({"Authorization": "Bearer " + self.access_token})
+        s = self._http
+
+        if s is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = self._create_session()
+
+                s = self._http
+
+        if self.token_provider is not None:
+            auth = "Bearer " + self.token_provider.token()
+        else:
+            auth = "Bearer " + self.access_token
+
+        if s.headers.get("Authorization") != auth:
+            s.headers["Authorization"] = auth
 
         return s
 
-    def _session_upload(self) -> Session:
+    def _create_session(self) -> Session:
         retries = Retry(
-            total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504]
+            total=self.max_retries,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            raise_on_status=False,
+            # 429 and 503 are left to the throttle, which pauses every request
+            respect_retry_after_header=False,
         )
 
-        adapter = HTTPAdapter(max_retries=retries)
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=retries,
+        )
 
-        s = Session()
+        s = ThrottledSession(self.throttle, self.on_request, self.base_url)
         s.mount("http://", adapter)
         s.mount("https://", adapter)
-        s.hooks["response"] = [self.raise_error_hook]
+        s.hooks["response"] = [self.throttle.retry_hook, self.raise_error_hook]
+
+        if self.token_provider is not None:
+            s.hooks["response"].insert(0, self.token_provider.refresh_hook)
+
+        if not self.keep_alive:
+            s.headers["Connection"] = "close"
 
         return s
 
-    def _upload_item_small(self, **kwargs) -> None:
+    def _download(self, data: dict, **kwargs) -> None:
+        url = data["@microsoft.graph.downloadUrl"]
+        max_workers = kwargs.get("max_workers") or 1
+
+        verifier = HashVerifier.create(kwargs.get("verify"), data)
+        tracker = TransferProgress.create(kwargs.get("progress"), data.get("size"))
+        if kwargs.get("resume"):
+            self._download_resumable(url, data, tracker, verifier, **kwargs)
+        elif max_workers > 1 and data.get("size"):
+            self._download_ranges(url, data["size"], tracker, verifier, **kwargs)
+        else:
+            self._download_stream(url, kwargs["file_path"], verifier, tracker)
+
+        if verifier is not None:
+            # Only ranges received before a resumed download (or SHA hashes of
+            # segments that arrived out of order) are read back from the file
+            verifier.finish(kwargs["file_path"], os.path.getsize(kwargs["file_path"]))
+            verifier.verify(data)
+
+    def _get_download_data(self, refresh: bool = False, **kwargs) -> tuple:
+        key = self._get_cache_key(**kwargs)
+
+        if refresh:
+            for cache in (self._download_urls, self.metadata_cache):
+                if cache is not None:
+                    cache.invalidate(key)
+
+        if self._download_urls is not None:
+            data = self._download_urls.get(key)
+
+            if data is not None:
+                return data, True
+
+        # An expired entry counts too, a 304 hands back its (possibly old) URL
+        cached = (
+            self.metadata_cache is not None
+            and self.metadata_cache.stale(key) is not None
+        )
+        data = self.get_item_data(**kwargs)
+
+        if self._download_urls is not None:
+            keys = [key]
+
+            if data.get("id"):
+                keys.append(
+                    self._get_cache_key(
+                        drive_id=kwargs.get("drive_id"), item_id=data["id"]
+                    )
+                )
+
+            fields = (
+                "id",
+                "name",
+                "eTag",
+                "cTag",
+                "size",
+                "file",  # for the hashes to verify downloads against
+                "@microsoft.graph.downloadUrl",
+            )
+            self._download_urls.set(keys, {k: data[k] for k in fields if k in data})
+
+        return data, cached
+
+    def _get_range(self, url: str, start: int, end: int) -> bytes:
+        headers = {**NO_AUTH, "Range": range_header(start, end)}
+
+        with self._session().get(url, stream=True, headers=headers) as r:
+            # Don't read a whole file that came back instead of the range
+            if r.status_code != 206:
+                raise DriveException("Server does not support range requests")
+
+            return r.content
+
+    def _download_stream(
+        self,
+        url: str,
+        file_path: str,
+        verifier: Optional[HashVerifier] = None,
+        tracker: Optional[TransferProgress] = None,
+    ) -> None:
+        with self._session().get(url, stream=True, headers=NO_AUTH) as r:
+            r.raise_for_status()
+
+            with open(file_path, "wb") as f:
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+                    if verifier is not None:
+                        verifier.update(chunk)
+
+                    if tracker is not None:
+                        tracker.add(len(chunk))
+
+    def _download_ranges(
+        self,
+        url: str,
+        size: int,
+        tracker: Optional[TransferProgress],
+        verifier: Optional[HashVerifier],
+        **kwargs,
+    ) -> None:
+        file_path = kwargs["file_path"]
+
+        # Preallocate the file so every worker can write at its own offset
+        with open(file_path, "wb") as f:
+            f.truncate(size)
+
+        self._download_segments(
+            url,
+            file_path,
+            [(0, size)],
+            on_segment=tracker.add_range if tracker else None,
+            verifier=verifier,
+            **kwargs,
+        )
+
+    def _download_resumable(
+        self,
+        url: str,
+        data: dict,
+        tracker: Optional[TransferProgress],
+        verifier: Optional[HashVerifier],
+        **kwargs,
+    ) -> None:
+        file_path = kwargs["file_path"]
+        partial_path = file_path + DOWNLOAD_PARTIAL_SUFFIX
+        state = TransferState(partial_path + ".json")
+        saved = state.load()
+        size = data.get("size") or 0
+        identity = {"eTag": data.get("eTag"), "cTag": data.get("cTag"), "size": size}
+        received = []
+
+        if os.path.exists(partial_path) and all(
+            saved.get(k) == v for k, v in identity.items()
+        ):
+            received = [tuple(r) for r in saved.get("received", [])]
+        else:
+            # Nothing to resume or the item changed since, so start over
+            with open(partial_path, "wb") as f:
+                f.truncate(size)
+
+            state.delete()
+            state.save(received=[], **identity)
+
+        if tracker is not None:
+            tracker.done = sum(end - start for start, end in received)
+
+        def on_segment(start: int, end: int) -> None:
+            received.append((start, end))
+            state.save(received=merge_ranges(received))
+
+            if tracker is not None:
+                tracker.add_range(start, end)
+
+        self._download_segments(
+            url,
+            partial_path,
+            subtract_ranges([(0, size)], received),
+            on_segment=on_segment,
+            verifier=verifier,
+            **kwargs,
+        )
+
+        os.replace(partial_path, file_path)
+        state.delete()
+
+    def _download_segments(
+        self,
+        url: str,
+        dest_path: str,
+        ranges: list,
+        on_segment: Optional[Callable[[int, int], None]] = None,
+        verifier: Optional[HashVerifier] = None,
+        **kwargs,
+    ) -> None:
+        segment_size = kwargs.get("segment_size") or DOWNLOAD_SEGMENT_SIZE
+        retries = kwargs.get("segment_retries", self.max_retries)
+        segments = split_ranges(ranges, segment_size)
+
+        if (kwargs.get("max_workers") or 1) <= 1:
+            for start, end in segments:
+                self._download_segment(url, dest_path, start, end, retries, verifier)
+
+                if on_segment:
+                    on_segment(start, end)
+
+            return
+
+        with ThreadPoolExecutor(max_workers=kwargs["max_workers"]) as executor:
+            futures = {
+                executor.submit(
+                    self._download_segment,
+                    url,
+                    dest_path,
+                    start,
+                    end,
+                    retries,
+                    verifier,
+                ): (start, end)
+                for start, end in segments
+            }
+
+            try:
+                for future in as_completed(futures):
+                    future.result()
+
+                    if on_segment:
+                        on_segment(*futures[future])
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+    def _download_segment(
+        self,
+        url: str,
+        file_path: str,
+        start: int,
+        end: int,
+        retries: int,
+        verifier: Optional[HashVerifier] = None,
+    ) -> None:
+        headers = {**NO_AUTH, "Range": range_header(start, end)}
+        attempt = 0
+
+        while True:
+            # Hash each attempt separately, a failed one is dropped
+            part = verifier.fork(start) if verifier is not None else None
+
+            try:
+                with self._session().get(url, stream=True, headers=headers) as r:
+                    if r.status_code != 206:
+                        raise DriveException("Server does not support range requests")
+
+                    with open(file_path, "r+b") as f:
+                        f.seek(start)
+
+                        for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+
+                            if part is not None:
+                                part.update(chunk)
+
+                        received = f.tell() - start
+
+                if received != end - start:
+                    raise ConnectionError(
+                        "Connection closed after {} of {} bytes".format(
+                            received, end - start
+                        )
+                    )
+
+                if part is not None:
+                    verifier.join(part)
+
+                return
+            except RequestException as err:
+                if attempt >= retries or 400 <= (_status_code(err) or 0) < 500:
+                    raise
+
+                # Retry straight away once, then back off like the adapter does
+                if attempt:
+                    time.sleep(RETRY_BACKOFF_FACTOR * 2 ** (attempt - 1))
+
+                attempt += 1
+
+    def _upload_item_small(
+        self,
+        verifier: Optional[HashVerifier],
+        tracker: Optional[TransferProgress],
+        **kwargs,
+    ) -> dict:
+        with open(kwargs["file_path"], "rb") as f:
+            if verifier is None:
+                size = os.fstat(f.fileno()).st_size
+                return self._put_content(f, size, tracker, **kwargs)
+
+            # Small enough to hash in memory on the way out
+            content = f.read()
+
+        verifier.update(content)
+
+        return self._put_content(content, len(content), tracker, **kwargs)
+
+    def _put_content(
+        self,
+        content: object,
+        size: int,
+        tracker: Optional[TransferProgress] = None,
+        **kwargs,
+    ) -> dict:
         url = self._get_drive_item_url(**kwargs)
-        file_data = open(kwargs["file_path"], "rb")
 
         if kwargs.get("item_id"):
             url += "/content"
         else:
             url += ":/content"
 
+        r = self._session().put(url, data=content, headers=_if_match(**kwargs))
+
+        if tracker is not None:
+            tracker.add(size)
+
+        return r.json()
+
+    def _upload_data(
+        self,
+        verifier: Optional[HashVerifier],
+        tracker: Optional[TransferProgress],
+        **kwargs,
+    ) -> dict:
+        data = kwargs["data"]
+
+        if not isinstance(data, BufferTypes):
+            return self._upload_stream(
+                data, source_size(data), verifier, tracker, **kwargs
+            )
+
+        source = BufferFragments(data)
+        size = len(source)
+
+        if verifier is not None:
+            verifier.update(source.read(0, size))
+
+        if size <= SIMPLE_UPLOAD_MAX_SIZE:
+            return self._put_content(source.read(0, size), size, tracker, **kwargs)
+
+        upload_session = self._get_upload_session(**kwargs)
+
+        return self._upload_ranges(
+            upload_session["uploadUrl"],
+            source,
+            size,
+            split_ranges([(0, size)], self._get_chunk_size(**kwargs)),
+            kwargs.get("max_workers") or 1,
+            tracker=tracker,
+        )
+
+    def _upload_stream(
+        self,
+        source: object,
+        size: Optional[int],
+        verifier: Optional[HashVerifier] = None,
+        tracker: Optional[TransferProgress] = None,
+        **kwargs,
+    ) -> dict:
+        # Reading one buffer ahead tells us whether the current one is the last,
+        # which is when Graph needs the real total length instead of "*"
+        chunk_size = self._get_chunk_size(**kwargs)
+        reader = StreamSource(source)
+
+        def read(buffer: bytearray) -> int:
+            n = reader.readinto(buffer)
+
+            if verifier is not None:
+                verifier.update(memoryview(buffer)[:n])
+
+            return n
+
+        current, spare = bytearray(chunk_size), bytearray(chunk_size)
+        n = read(current)
+        m = read(spare) if n == chunk_size else 0
+
+        if not m and n <= SIMPLE_UPLOAD_MAX_SIZE:
+            return self._put_content(memoryview(current)[:n], n, tracker, **kwargs)
+
+        upload_url = self._get_upload_session(**kwargs)["uploadUrl"]
+        offset = 0
+        item = None
+
+        while True:
+            total = offset + n if not m else size
+            r = self._put_fragment(upload_url, memoryview(current)[:n], offset, total)
+            item = self._handle_fragment_response(r, None) or item
+
+            if tracker is not None:
+                tracker.add(n)
+
+            if not m:
+                return item
+
+            offset += n
+            current, spare = spare, current
+            n = m
+            m = read(spare) if n == chunk_size else 0
+
+    def _upload_item_large(
+        self,
+        verifier: Optional[HashVerifier],
+        tracker: Optional[TransferProgress],
+        **kwargs,
+    ) -> dict:
+        chunk_size = self._get_chunk_size(**kwargs)
+        file_path = kwargs["file_path"]
+        file_size = os.stat(file_path).st_size
+        source = FileFragments(file_path, chunk_size, kwargs.get("read_mode") or "copy")
+        upload_session = None
+        state = None
+
+        if kwargs.get("resume"):
+            state = TransferState(
+                kwargs.get("state_path") or file_path + UPLOAD_STATE_SUFFIX
+            )
+            target = self._get_drive_item_url(**kwargs)
+            identity = file_identity(file_path, kwargs.get("resume_hash"))
+            upload_session = self._resume_upload_session(state, target, identity)
+
+        if upload_session is None:
+            upload_session = self._get_upload_session(**kwargs)
+
+            if state is not None:
+                state.delete()
+                state.save(
+                    upload_url=upload_session["uploadUrl"],
+                    target=target,
+                    file=identity,
+                )
+
+        ranges = parse_ranges(
+            upload_session.get("nextExpectedRanges") or ["0-"], file_size
+        )
+
+        if tracker is not None:
+            tracker.done = file_size - sum(end - start for start, end in ranges)
+
+        with source:
+            item = self._upload_ranges(
+                upload_session["uploadUrl"],
+                source,
+                file_size,
+                split_ranges(ranges, chunk_size),
+                kwargs.get("max_workers") or 1,
+                state,
+                tracker,
+                verifier,
+            )
+
+        if state is not None:
+            state.delete()
+
+        return item
+
+    def _verify_upload(self, verifier: HashVerifier, item: dict, **kwargs) -> None:
+        if not (item.get("file") or {}).get("hashes"):
+            # Some upload responses leave out the hashes, fetch them by ID
+            r = self._session().get(
+                self._get_drive_item_url(
+                    drive_id=kwargs.get("drive_id"), item_id=item["id"]
+                )
+            )
+            item = r.json()
+
+        verifier.verify(item)
+
+    def _resume_upload_session(
+        self, state: TransferState, target: str, identity: dict
+    ) -> Optional[dict]:
+        saved = state.load()
+
+        if saved.get("target") != target or saved.get("file") != identity:
+            return None
+
+        try:
+            r = self._session().get(saved["upload_url"], headers=NO_AUTH)
+        except (DriveException, HTTPError):
+            return None  # the upload session has expired or was cancelled
+
+        return {**r.json(), "uploadUrl": saved["upload_url"]}
+
+    def _upload_ranges(
+        self,
+        upload_url: str,
+        source: Union[BufferFragments, FileFragments],
+        file_size: int,
+        fragments: list,
+        max_workers: int,
+        state: Optional[TransferState] = None,
+        tracker: Optional[TransferProgress] = None,
+        verifier: Optional[HashVerifier] = None,
+    ) -> dict:
+        item = None
+        upload = partial(
+            self._upload_fragment, upload_url, source, file_size, verifier=verifier
+        )
+
+        if max_workers <= 1:
+            for start, end in fragments:
+                r = upload(start, end)
+                item = self._handle_fragment_response(r, state) or item
+
+                if tracker is not None:
+                    tracker.add_range(start, end)
+
+            return item
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(upload, start, end): (start, end)
+                for start, end in fragments
+            }
+
+            try:
+                for future in as_completed(futures):
+                    r = future.result()
+                    item = self._handle_fragment_response(r, state) or item
+
+                    if tracker is not None:
+                        tracker.add_range(*futures[future])
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+        return item
+
+    def _handle_fragment_response(
+        self, r: Response, state: Optional[TransferState]
+    ) -> Optional[dict]:
+        if r.status_code in (200, 201):
+            return r.json()
+
+        if state is not None:
+            state.save(next_expected_ranges=r.json().get("nextExpectedRanges"))
+
+        return None
+
+    def _upload_fragment(
+        self,
+        upload_url: str,
+        source: Union[BufferFragments, FileFragments],
+        file_size: int,
+        start: int,
+        end: int,
+        verifier: Optional[HashVerifier] = None,
+    ) -> Response:
+        data = source.read(start, end)
+
         try:
-            self._session().put(url, data=file_data)
+            if verifier is not None:
+                part = verifier.fork(start)
+                part.update(data)
+                verifier.join(part)
+
+            return self._put_fragment(upload_url, data, start, file_size)
         finally:
-            file_data.close()
+            source.release(data, start, end)
 
-    def _upload_item_large(self, **kwargs) -> None:
-        upload_url = self._get_upload_url(**kwargs)
-        file_size = os.stat(kwargs["file_path"]).st_size
+    def _put_fragment(
+        self, upload_url: str, data: object, start: int, size: Optional[int]
+    ) -> Response:
+        end = start + len(data)
+        headers = {
+            **NO_AUTH,
+            "Content-Length": str(len(data)),
+            "Content-Range": content_range(start, end, size),
+        }
 
-        with open(kwargs["file_path"], "rb") as f:
-            chunk_size = CHUNK_UPLOAD_MAX_SIZE
-            chunk_number = file_size // chunk_size
-            chunk_leftover = file_size - chunk_size * chunk_number
-            chunk_data = f.read(chunk_size)
-            i = 0
-
-            while chunk_data:
-                start_index = i * chunk_size
-                end_index = start_index + chunk_size
-
-                if i == chunk_number:
-                    end_index = start_index + chunk_leftover
-
-                s = self._session_upload()
-
-                headers = {
-                    "Content-Length": str(chunk_size),
-                    "Content-Range": "bytes {}-{}/{}".format(
-                        start_index, end_index - 1, file_size
-                    ),
-                }
+        return self._session().put(upload_url, data=data, headers=headers)
+
+    def _get_chunk_size(self, **kwargs) -> int:
+        chunk_size = kwargs.get("chunk_size") or CHUNK_UPLOAD_MAX_SIZE
 
-                s.headers.update(headers)
-                s.put(upload_url, data=chunk_data)
+        if chunk_size % CHUNK_UPLOAD_ALIGNMENT or chunk_size > CHUNK_UPLOAD_LIMIT:
+            raise ValueError(
+                "chunk_size must be a multiple of {} bytes and at most {} bytes".format(
+                    CHUNK_UPLOAD_ALIGNMENT, CHUNK_UPLOAD_LIMIT
+                )
+            )
 
-                i = i + 1
-                chunk_data = f.read(chunk_size)
+        return chunk_size
 
-    def _get_upload_url(self, **kwargs) -> str:
+    def _get_upload_session(self, **kwargs) -> dict:
         url = self._get_drive_item_url(**kwargs)
 
         if kwargs.get("item_id"):
@@ -177,9 +1868,90 @@ class MSDrive(ABC):
         else:
             url += ":/createUploadSession"
 
-        r = self._session().post(url)
+        r = self._session().post(url, headers=_if_match(**kwargs))
+
+        return r.json()
+
+    def _start_copy(self, **kwargs) -> CopyResult:
+        url = self._get_drive_item_url(**kwargs)
+
+        if kwargs.get("item_id"):
+            url += "/copy"
+        else:
+            url += ":/copy"
+
+        r = self._session().post(
+            url,
+            json=self._get_move_body(**kwargs),
+            params=self._get_conflict_params(**kwargs),
+        )
+
+        return CopyResult(
+            monitor_url=r.headers["Location"], drive_id=kwargs.get("dest_drive_id")
+        )
+
+    def _poll_copy(self, result: CopyResult) -> None:
+        try:
+            self.get_copy_status(result)
+        except Exception as err:
+            result.status = "failed"
+            result.error = err
+
+    def _get_move_body(self, **kwargs) -> dict:
+        body = {}
+        parent = {}
+
+        if kwargs.get("dest_drive_id"):
+            parent["driveId"] = kwargs["dest_drive_id"]
+
+        if kwargs.get("dest_folder_id"):
+            parent["id"] = kwargs["dest_folder_id"]
+        elif kwargs.get("dest_folder_path") is not None or parent:
+            # Another drive without a folder means its root
+            parent["id"] = self._get_dest_folder_id(**kwargs)
+
+        if parent:
+            body["parentReference"] = parent
+
+        if kwargs.get("name"):
+            body["name"] = kwargs["name"]
 
-        return r.json()["uploadUrl"]
+        return body
+
+    def _get_conflict_params(self, **kwargs) -> dict:
+        if kwargs.get("conflict_behavior"):
+            return {"@microsoft.graph.conflictBehavior": kwargs["conflict_behavior"]}
+
+        return {}
+
+    def _get_dest_drive_url(self, **kwargs) -> str:
+        if kwargs.get("dest_drive_id"):
+            return f"{self.base_url}/drives/{kwargs['dest_drive_id']}"
+
+        return self._get_drive_url(**kwargs)
+
+    def _get_dest_folder_id(self, **kwargs) -> str:
+        drive_url = self._get_dest_drive_url(**kwargs)
+        path = quote((kwargs.get("dest_folder_path") or "").strip("/"))
+        url = f"{drive_url}/root:/{path}" if path else f"{drive_url}/root"
+        r = self._session().get(url, params={"$select": "id"})
+
+        return r.json()["id"]
+
+    def _resolve_dest_folder(self, copy: dict, folder_ids: dict) -> dict:
+        if copy.get("dest_folder_id") or copy.get("dest_folder_path") is None:
+            return copy
+
+        key = (
+            copy.get("drive_id"),
+            copy.get("dest_drive_id"),
+            copy["dest_folder_path"].strip("/"),
+        )
+
+        if key not in folder_ids:
+            folder_ids[key] = self._get_dest_folder_id(**copy)
+
+        return {**copy, "dest_folder_id": folder_ids[key]}
 
     def raise_error_hook(self, resp, *args, **kwargs) -> None:
         try:
@@ -197,13 +1969,6 @@ class MSDrive(ABC):
         except Exception:
             raise err
 
-        if err.response.status_code == 401:
-            raise InvalidAccessToken(message)
-
-        if err.response.status_code == 404:
-            raise ItemNotFound(message)
-
-        if err.response.status_code == 429:
-            raise RateLimited(message)
-
-        raise DriveException(message)
+        raise exception_for_status(
+            err.response.status_code, message, body["error"].get("code")
+        )
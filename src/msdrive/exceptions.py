@@ -1,6 +1,8 @@
 class DriveException(Exception):
     """There was an ambiguous exception that occurred"""
 
+    status_code = None  # HTTP status of the error response, if there was one
+
 
 class InvalidAccessToken(DriveException):
     """Invalid access token"""
@@ -10,5 +12,45 @@ class ItemNotFound(DriveException):
     """Item not found"""
 
 
+class ItemAlreadyExists(DriveException):
+    """An item with the same name already exists"""
+
+
 class RateLimited(DriveException):
     """Rate limit exceeded"""
+
+
+class ResyncRequired(DriveException):
+    """The delta token is no longer valid and a full resync is required"""
+
+
+class PreconditionFailed(DriveException):
+    """The item changed since the eTag given with If-Match"""
+
+
+class HashMismatch(DriveException):
+    """The hash of transferred data differs from the one the drive reports"""
+
+
+def exception_for_status(
+    status_code: int, message: str, code: str = None
+) -> DriveException:
+    """Map the status code of a Graph API error response to an exception"""
+    if status_code == 410 and code and code.startswith("resync"):
+        err = ResyncRequired(message)
+    elif status_code == 401:
+        err = InvalidAccessToken(message)
+    elif status_code == 404:
+        err = ItemNotFound(message)
+    elif status_code == 409:
+        err = ItemAlreadyExists(message)
+    elif status_code == 412:
+        err = PreconditionFailed(message)
+    elif status_code == 429:
+        err = RateLimited(message)
+    else:
+        err = DriveException(message)
+
+    err.status_code = status_code
+
+    return err
@@ -0,0 +1,355 @@
+import base64
+import hashlib
+import threading
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+from .exceptions import DriveException, HashMismatch
+from .ranges import subtract_ranges
+
+QUICK_XOR_WIDTH = 160  # bits in the digest
+QUICK_XOR_SHIFT = 11  # bits each byte is shifted by relative to the previous one
+QUICK_XOR_MASK = (1 << QUICK_XOR_WIDTH) - 1
+ROW_BITS = QUICK_XOR_WIDTH * 8  # byte i and i + 160 land on the same bits
+FOLD_BLOCK_SIZE = QUICK_XOR_WIDTH * 100  # converting 16KB ints at a time is fastest
+FOLD_BUFFER_SIZE = FOLD_BLOCK_SIZE * 64  # about 1MB
+
+# Graph's file.hashes property names, best first
+HASH_ALGORITHMS = {
+    "quickXorHash": None,
+    "sha256Hash": hashlib.sha256,
+    "sha1Hash": hashlib.sha1,
+}
+
+
+class QuickXorHash:
+    """The quickXorHash that OneDrive and SharePoint report for every file.
+
+    Byte i of the input is XORed into the 160-bit digest at bit (11 * i) % 160,
+    so all bytes 160 apart land on the same bits. Instead of shifting every byte,
+    each update folds its data into one 160-byte row with big-integer XORs (done
+    in C by Python's int), the row is only spread over the digest when it is read.
+
+    As the hash is a XOR, hashes of separate byte ranges can be combined.
+    """
+
+    name = "quickXorHash"
+
+    def __init__(self, data: bytes = b"", offset: int = 0) -> None:
+        """Class constructor
+
+        Args:
+            data (bytes): [OPTIONAL] Initial data
+            offset (int): [OPTIONAL] Position of the data in the file, to hash a range of it
+        """
+        self._row = 0
+        self._position = offset
+        self._length = 0
+        self._pending = bytearray()
+
+        if data:
+            self.update(data)
+
+    def update(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """Add data to the hash."""
+        view = memoryview(data).cast("B")
+
+        if len(view) >= FOLD_BUFFER_SIZE and not self._pending:
+            self._fold(view)
+            return
+
+        # Small updates (e.g. 8KB download chunks) are cheaper to fold together
+        self._pending += view
+
+        if len(self._pending) >= FOLD_BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._fold(memoryview(self._pending))
+            self._pending = bytearray()
+
+    def _fold(self, view: memoryview) -> None:
+        size = len(view)
+
+        # XOR blocks of whole rows together, then halve the rows of the last one
+        folded = 0
+
+        for start in range(0, size, FOLD_BLOCK_SIZE):
+            folded ^= int.from_bytes(view[start : start + FOLD_BLOCK_SIZE], "little")
+
+        rows = min(FOLD_BLOCK_SIZE, size + QUICK_XOR_WIDTH - 1) // QUICK_XOR_WIDTH
+
+        while rows > 1:
+            half = rows // 2
+            bits = half * ROW_BITS
+            folded = (folded & ((1 << bits) - 1)) ^ (folded >> bits)
+            rows -= half
+
+        shift = (self._position % QUICK_XOR_WIDTH) * 8
+
+        if shift:
+            folded = ((folded << shift) | (folded >> (ROW_BITS - shift))) & (
+                (1 << ROW_BITS) - 1
+            )
+
+        self._row ^= folded
+        self._position += size
+        self._length += size
+
+    def combine(self, other: "QuickXorHash") -> None:
+        """Add the hash of another range of the same file."""
+        self._flush()
+        other._flush()
+        self._row ^= other._row
+        self._length += other._length
+
+    def digest(self) -> bytes:
+        """Get the 20 byte digest."""
+        self._flush()
+        value = 0
+        row = self._row
+
+        for i in range(QUICK_XOR_WIDTH):
+            byte = row & 0xFF
+            row >>= 8
+
+            if byte:
+                shift = (i * QUICK_XOR_SHIFT) % QUICK_XOR_WIDTH
+                value ^= ((byte << shift) | (byte >> (QUICK_XOR_WIDTH - shift))) & (
+                    QUICK_XOR_MASK
+                )
+
+        # The total length is XORed into the last 8 bytes
+        value ^= self._length << (QUICK_XOR_WIDTH - 64)
+
+        return value.to_bytes(QUICK_XOR_WIDTH // 8, "little")
+
+    def b64digest(self) -> str:
+        """Get the digest in base64, as Graph reports it."""
+        return base64.b64encode(self.digest()).decode()
+
+
+def new_hash(name: str) -> object:
+    """Create a hasher for one of Graph's file.hashes properties."""
+    if name == QuickXorHash.name:
+        return QuickXorHash()
+
+    return HASH_ALGORITHMS[name]()
+
+
+def hash_value(hasher: object) -> str:
+    """Get a hasher's value in the encoding Graph uses for it."""
+    if isinstance(hasher, QuickXorHash):
+        return hasher.b64digest()
+
+    return hasher.hexdigest().upper()
+
+
+class HashVerifier:
+    """Computes hashes of transferred data and compares them to a DriveItem's file.hashes.
+
+    Data is hashed as it is transferred. Ranges that arrive out of order (e.g.
+    from parallel workers) are hashed separately and combined for quickXorHash,
+    the SHA hashes can only follow the data in order. Whatever could not be
+    hashed along the way (ranges sent in an earlier, resumed run or SHA hashes
+    of out of order ranges) is read back from the local file by finish().
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        """Class constructor
+
+        Args:
+            names (list): Graph hash names to compute (e.g. quickXorHash, sha256Hash)
+        """
+        self.hashers = {name: new_hash(name) for name in names}
+        self.start = 0  # where the data starts, for verifiers created by fork()
+        self.position = 0  # end of the data hashed in order from the start
+        self._ranges = []  # ranges added to the quickXorHash
+        self._unordered = set()  # SHA hashes that missed a range
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, verify: object, item: Optional[dict] = None) -> "HashVerifier":
+        """Create a verifier for the verify argument of a transfer.
+
+        Args:
+            verify (bool|list): True for the best hash (of those the item has, if
+                known) or a list of hash names
+            item (dict): [OPTIONAL] The DriveItem metadata, when it is known up front
+
+        Returns:
+            HashVerifier: The verifier or None if verify is false
+
+        Raises:
+            DriveException: When the item has none of the hashes asked for
+        """
+        if not verify:
+            return None
+
+        available = None
+
+        if item is not None:
+            available = (item.get("file") or {}).get("hashes") or {}
+
+        if verify is True:
+            names = _best_hash(available)
+        else:
+            unknown = set(verify) - set(HASH_ALGORITHMS)
+
+            if unknown:
+                raise ValueError("Unsupported hash: " + ", ".join(sorted(unknown)))
+
+            names = [name for name in verify if available is None or name in available]
+
+        if not names:
+            raise DriveException(
+                "{} has no hash to verify against".format(item.get("name") or "Item")
+            )
+
+        return cls(names)
+
+    def update(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """Add the next transferred data, in order, to every hash."""
+        size = memoryview(data).nbytes
+
+        with self._lock:
+            for hasher in self.hashers.values():
+                hasher.update(data)
+
+            self._add_range(self.position, self.position + size)
+            self.position += size
+
+    def fork(self, start: int) -> "HashVerifier":
+        """Create a verifier for the range of data starting at start.
+
+        Add the range to it with update() and hand it back with join() once the
+        whole range has been transferred, or drop it if the transfer failed.
+        """
+        part = HashVerifier([])
+        part.start = part.position = start
+
+        with self._lock:
+            for name, hasher in self.hashers.items():
+                if isinstance(hasher, QuickXorHash):
+                    part.hashers[name] = QuickXorHash(offset=start)
+                elif start == self.position and name not in self._unordered:
+                    part.hashers[name] = hasher.copy()
+
+        return part
+
+    def join(self, part: "HashVerifier") -> None:
+        """Add the hashes of a range created with fork() and fully transferred."""
+        with self._lock:
+            for name, hasher in self.hashers.items():
+                if isinstance(hasher, QuickXorHash):
+                    hasher.combine(part.hashers[name])
+                elif name in part.hashers and part.start == self.position:
+                    self.hashers[name] = part.hashers[name]
+                else:
+                    self._unordered.add(name)
+
+            self._add_range(part.start, part.position)
+
+            if part.start == self.position:
+                self.position = part.position
+
+    def _add_range(self, start: int, end: int) -> None:
+        # Extend the last range when the data follows on, as it does when streamed
+        if self._ranges and self._ranges[-1][1] == start:
+            self._ranges[-1] = (self._ranges[-1][0], end)
+        else:
+            self._ranges.append((start, end))
+
+    def finish(self, file_path: str, size: int) -> None:
+        """Hash the parts of the transferred local file that were not hashed inline."""
+        quick_xor = [n for n, h in self.hashers.items() if isinstance(h, QuickXorHash)]
+        rehash = [
+            n
+            for n in self.hashers
+            if n not in quick_xor and (n in self._unordered or self.position != size)
+        ]
+        gaps = subtract_ranges([(0, size)], self._ranges) if quick_xor else []
+
+        if not gaps and not rehash:
+            return
+
+        for name in rehash:
+            self.hashers[name] = new_hash(name)
+
+        with open(file_path, "rb") as f:
+            if rehash:
+                for view in _read_chunks(f, 0, size):
+                    for name in rehash:
+                        self.hashers[name].update(view)
+
+            for start, end in gaps:
+                offset = start
+
+                for view in _read_chunks(f, start, end):
+                    for name in quick_xor:
+                        self.hashers[name].combine(QuickXorHash(view, offset))
+
+                    offset += len(view)
+
+        self._unordered.clear()
+        self._ranges = [(0, size)]
+        self.position = size
+
+    def verify(self, item: dict) -> None:
+        """Compare the hashes with those of a DriveItem.
+
+        Args:
+            item (dict): The DriveItem metadata
+
+        Raises:
+            HashMismatch: When any of the hashes differ
+            DriveException: When the item has none of the hashes
+        """
+        expected = (item.get("file") or {}).get("hashes") or {}
+        compared = False
+
+        for name, hasher in self.hashers.items():
+            if name not in expected:
+                continue
+
+            actual = hash_value(hasher)
+            compared = True
+
+            if actual != _normalize(name, expected[name]):
+                raise HashMismatch(
+                    "{} of {} is {} but the drive has {}".format(
+                        name, item.get("name"), actual, expected[name]
+                    )
+                )
+
+        if not compared:
+            raise DriveException(
+                "{} has no hash to verify against".format(item.get("name") or "Item")
+            )
+
+
+def _best_hash(available: Optional[dict]) -> List[str]:
+    for name in HASH_ALGORITHMS:
+        if available is None or name in available:
+            return [name]
+
+    return []
+
+
+def _read_chunks(f: BinaryIO, start: int, end: int) -> Iterator[memoryview]:
+    buffer = bytearray(FOLD_BUFFER_SIZE)
+    f.seek(start)
+
+    while start < end:
+        n = f.readinto(memoryview(buffer)[: min(len(buffer), end - start)])
+
+        if not n:
+            break
+
+        yield memoryview(buffer)[:n]
+        start += n
+
+
+def _normalize(name: str, value: str) -> str:
+    # quickXorHash is base64 (case sensitive), the SHA hashes are hex
+    return value if name == QuickXorHash.name else value.upper()
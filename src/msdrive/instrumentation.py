@@ -0,0 +1,197 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response
+
+from .constants import BASE_GRAPH_URL
+
+
+@dataclass
+class RequestEvent:
+    """What happened to one HTTP request, passed to the on_request callback"""
+
+    method: str
+    endpoint: str  # metadata, list, delta, batch, upload_session, upload or download
+    url: str
+    status_code: Optional[int]  # None if no response was received
+    elapsed: float  # seconds, including retries and throttling
+    bytes_sent: int
+    bytes_received: Optional[int]  # from Content-Length, None if not known up front
+    retries: int  # resends after throttling and retried connection errors or 5xx
+    throttle_wait: float  # seconds spent waiting for the throttle
+    error: Optional[Exception] = None
+
+
+def endpoint_type(method: str, url: str, base_url: str = BASE_GRAPH_URL) -> str:
+    """Classify a request URL by the kind of API call it is."""
+    parts = urlsplit(url)
+
+    if not url.startswith(base_url + "/"):
+        # Pre-authenticated upload session and download URLs
+        return "upload" if method == "PUT" else "download"
+
+    path = parts.path
+
+    if path.endswith("/$batch"):
+        return "batch"
+
+    if "/delta" in path:
+        return "delta"
+
+    if path.endswith("/createUploadSession"):
+        return "upload_session"
+
+    if path.endswith("/content"):
+        return "upload" if method == "PUT" else "download"
+
+    if path.endswith("/children") and method == "GET":
+        return "list"
+
+    return "metadata"
+
+
+def request_event(
+    request: PreparedRequest,
+    r: Optional[Response],
+    elapsed: float,
+    retries: int,
+    throttle_wait: float,
+    error: Optional[Exception] = None,
+    base_url: str = BASE_GRAPH_URL,
+) -> RequestEvent:
+    """Build the RequestEvent for a request that has completed or failed."""
+    status_code = getattr(error, "status_code", None)
+    bytes_received = None
+
+    if r is not None:
+        status_code = r.status_code
+        length = r.headers.get("Content-Length")
+        bytes_received = int(length) if length else None
+        history = getattr(getattr(r.raw, "retries", None), "history", None)
+        retries += len(history or ())
+
+    return RequestEvent(
+        method=request.method,
+        endpoint=endpoint_type(request.method, request.url, base_url),
+        url=request.url,
+        status_code=status_code,
+        elapsed=elapsed,
+        bytes_sent=int(request.headers.get("Content-Length") or 0),
+        bytes_received=bytes_received,
+        retries=retries,
+        throttle_wait=throttle_wait,
+        error=error,
+    )
+
+
+class TransferProgress:
+    """Thread-safe running total of the bytes transferred, reported to a callback."""
+
+    def __init__(
+        self, callback: Callable[[int, int], None], total: Optional[int], done: int = 0
+    ) -> None:
+        """Class constructor
+
+        Args:
+            callback (callable): Called with (bytes transferred, total bytes or None)
+            total (int): Size of the transfer, None if it is not known up front
+            done (int): Bytes already transferred (e.g. before resuming)
+        """
+        self.callback = callback
+        self.total = total
+        self.done = done
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(
+        cls, callback: Optional[Callable[[int, int], None]], total: Optional[int]
+    ) -> Optional["TransferProgress"]:
+        return cls(callback, total) if callback else None
+
+    def add(self, size: int) -> None:
+        """Record more bytes as transferred."""
+        with self._lock:
+            self.done += size
+            self.callback(self.done, self.total)
+
+    def add_range(self, start: int, end: int) -> None:
+        """Record the exclusive byte range start-end as transferred."""
+        self.add(end - start)
+
+
+class OpenTelemetryListener:
+    """on_request callback that records each request as an OpenTelemetry span and metrics.
+
+    Requires the optional opentelemetry-api dependency:
+
+        pip install opentelemetry-api
+    """
+
+    def __init__(self, tracer: object = None, meter: object = None) -> None:
+        """Class constructor
+
+        Args:
+            tracer (Tracer): [OPTIONAL] Tracer to record spans with (defaults to the global provider's)
+            meter (Meter): [OPTIONAL] Meter to record metrics with (defaults to the global provider's)
+        """
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError as err:
+            raise ImportError(
+                "OpenTelemetryListener requires opentelemetry-api, install it with "
+                "pip install opentelemetry-api"
+            ) from err
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("msdrive")
+        meter = meter or metrics.get_meter("msdrive")
+        self.duration = meter.create_histogram(
+            "msdrive.request.duration", unit="s", description="Graph request latency"
+        )
+        self.bytes = meter.create_counter(
+            "msdrive.request.bytes", unit="By", description="Bytes sent and received"
+        )
+        self.retries = meter.create_counter(
+            "msdrive.request.retries", description="Retried requests"
+        )
+
+    def __call__(self, event: RequestEvent) -> None:
+        end = time.time_ns()
+        attributes = {
+            "http.request.method": event.method,
+            "msdrive.endpoint": event.endpoint,
+        }
+
+        if event.status_code is not None:
+            attributes["http.response.status_code"] = event.status_code
+
+        span = self.tracer.start_span(
+            "msdrive " + event.endpoint,
+            start_time=end - int(event.elapsed * 1e9),
+            attributes={
+                **attributes,
+                "url.full": event.url.split("?")[0],
+                "msdrive.retries": event.retries,
+                "msdrive.throttle_wait": event.throttle_wait,
+            },
+        )
+
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+
+        span.end(end_time=end)
+
+        self.duration.record(event.elapsed, attributes)
+        self.bytes.add(event.bytes_sent, {**attributes, "direction": "sent"})
+
+        if event.bytes_received:
+            self.bytes.add(
+                event.bytes_received, {**attributes, "direction": "received"}
+            )
+
+        if event.retries:
+            self.retries.add(event.retries, attributes)
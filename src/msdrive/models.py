@@ -0,0 +1,216 @@
+import marshal
+import sys
+from typing import Any, Optional, Tuple, Type
+
+_MISSING = object()
+
+
+class Resource:
+    """Compact view of a Graph resource.
+
+    The commonly used properties become attributes, the rest of the parsed JSON
+    is packed into one compact bytes object with marshal and unpacked again
+    whenever it is asked for. Resources can still be read like the dict they
+    came from, e.g. item["webUrl"], item.get("createdBy") or item.raw for the
+    whole dict.
+    """
+
+    __slots__ = ("_rest",)
+
+    # (attribute, JSON property) pairs moved out of the packed JSON into attributes
+    _fields: Tuple[Tuple[str, str], ...] = ()
+
+    def __init__(self, data: dict) -> None:
+        """Class constructor
+
+        Args:
+            data (dict): JSON representation of the resource
+        """
+        rest = dict(data)
+
+        # Explicit nulls stay packed so raw gives back the same dict
+        for attr, key in self._fields:
+            setattr(self, attr, _pop_value(rest, key))
+
+        self._parse(rest)
+        self._rest = marshal.dumps(rest) if rest else None
+
+    def _parse(self, rest: dict) -> None:
+        """Move nested properties out of rest into attributes."""
+
+    def _restore(self, data: dict) -> None:
+        """Put the nested properties taken by _parse back into data."""
+
+    @property
+    def raw(self) -> dict:
+        """JSON representation of the resource, unpacked again on every access."""
+        data = marshal.loads(self._rest) if self._rest else {}
+
+        for attr, key in self._fields:
+            value = getattr(self, attr)
+
+            if value is not None:
+                data[key] = value
+
+        self._restore(data)
+
+        return data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        for attr, field in self._fields:
+            if field == key:
+                value = getattr(self, attr)
+
+                if value is not None:
+                    return value
+
+                break
+
+        return self.raw.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return self.raw == other.raw
+
+    def __reduce__(self) -> tuple:
+        # Pickle the plain dict, the marshal format can change between Python versions
+        return type(self), (self.raw,)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r})"
+
+
+class DriveItem(Resource):
+    """A file, folder or other item stored in a drive"""
+
+    __slots__ = (
+        "id",
+        "name",
+        "size",
+        "etag",
+        "ctag",
+        "drive_id",  # from parentReference
+        "parent_id",
+        "parent_path",
+        "mime_type",  # from the file facet
+        "hashes",  # from the file facet, None if the item is not a file
+        "child_count",  # from the folder facet, None if the item is not a folder
+    )
+    _fields = (
+        ("id", "id"),
+        ("name", "name"),
+        ("size", "size"),
+        ("etag", "eTag"),
+        ("ctag", "cTag"),
+    )
+
+    def _parse(self, rest: dict) -> None:
+        # The facets stay packed without the values the attributes hold (even if
+        # that leaves them empty), e.g. only parentReference.siteId is kept
+        parent = rest.get("parentReference")
+        file = rest.get("file")
+        folder = rest.get("folder")
+        self.drive_id = self.parent_id = self.parent_path = None
+        self.mime_type = self.hashes = None
+        self.child_count = None
+
+        if isinstance(parent, dict):
+            parent = rest["parentReference"] = dict(parent)
+
+            # Items in a listing share these, keep one copy of each
+            self.drive_id = _intern(_pop_value(parent, "driveId"))
+            self.parent_id = _intern(_pop_value(parent, "id"))
+            self.parent_path = _intern(_pop_value(parent, "path"))
+
+        if isinstance(file, dict):
+            file = rest["file"] = dict(file)
+            self.mime_type = _intern(_pop_value(file, "mimeType"))
+            # Empty or null hashes stay packed as they were
+            self.hashes = _pop_value(file, "hashes") if file.get("hashes") else {}
+
+        if isinstance(folder, dict):
+            self.child_count = folder.get("childCount", 0)
+
+    def _restore(self, data: dict) -> None:
+        parent = data.get("parentReference")
+        file = data.get("file")
+
+        if isinstance(parent, dict):
+            for key, value in (
+                ("driveId", self.drive_id),
+                ("id", self.parent_id),
+                ("path", self.parent_path),
+            ):
+                if value is not None:
+                    parent[key] = value
+
+        if isinstance(file, dict):
+            if self.mime_type is not None:
+                file["mimeType"] = self.mime_type
+
+            if self.hashes:
+                file["hashes"] = self.hashes
+
+    @property
+    def is_file(self) -> bool:
+        return self.hashes is not None
+
+    @property
+    def is_folder(self) -> bool:
+        return self.child_count is not None
+
+
+class Site(Resource):
+    """A SharePoint site"""
+
+    __slots__ = ("id", "name", "display_name", "web_url")
+    _fields = (
+        ("id", "id"),
+        ("name", "name"),
+        ("display_name", "displayName"),
+        ("web_url", "webUrl"),
+    )
+
+
+class Drive(Resource):
+    """A OneDrive or a SharePoint document library"""
+
+    __slots__ = ("id", "name", "drive_type", "web_url")
+    _fields = (
+        ("id", "id"),
+        ("name", "name"),
+        ("drive_type", "driveType"),
+        ("web_url", "webUrl"),
+    )
+
+
+def _pop_value(data: dict, key: str) -> Any:
+    # Only values that are not null move out of the packed JSON into attributes
+    value = data.get(key)
+
+    if value is not None:
+        del data[key]
+
+    return value
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def typed_page(page: dict, model: Type[Resource]) -> dict:
+    """Copy of a collection page with its value as model objects instead of dicts."""
+    return {**page, "value": [model(data) for data in page.get("value", [])]}
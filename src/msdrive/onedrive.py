@@ -1,6 +1,5 @@
 from urllib.parse import quote
 
-from .constants import BASE_GRAPH_URL
 from .drive import MSDrive
 
 
@@ -13,19 +12,29 @@ class OneDrive(MSDrive):
 
     """
 
+    def _get_drive_url(self, **kwargs) -> str:
+        return f"{self.base_url}/me/drive"
+
     def _get_drive_item_url(self, **kwargs) -> str:
+        drive_url = self._get_drive_url(**kwargs)
+
         if kwargs.get("item_id"):
-            return f"{BASE_GRAPH_URL}/me/drive/items/{kwargs['item_id']}"
+            return f"{drive_url}/items/{kwargs['item_id']}"
 
         if kwargs.get("item_path"):
             path = quote(kwargs["item_path"].lstrip("/"))
-            return f"{BASE_GRAPH_URL}/me/drive/root:/{path}"
+            return f"{drive_url}/root:/{path}"
 
         raise ValueError("Missing argument: item_id or item_path")
 
     def _get_drive_children_url(self, **kwargs) -> str:
+        drive_url = self._get_drive_url(**kwargs)
+
+        if kwargs.get("folder_id"):
+            return f"{drive_url}/items/{kwargs['folder_id']}/children"
+
         if not kwargs.get("folder_path"):
-            return f"{BASE_GRAPH_URL}/me/drive/root/children"
+            return f"{drive_url}/root/children"
         else:
             path = quote(kwargs["folder_path"].lstrip("/").rstrip("/"))
-            return f"{BASE_GRAPH_URL}/me/drive/root:/{path}:/children"
+            return f"{drive_url}/root:/{path}:/children"
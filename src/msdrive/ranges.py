@@ -0,0 +1,92 @@
+from typing import Iterable, List, Optional, Tuple
+
+Range = Tuple[int, int]
+
+
+def parse_ranges(next_expected_ranges: Iterable[str], size: int) -> List[Range]:
+    """Parse the nextExpectedRanges of an upload session into byte ranges.
+
+    Args:
+        next_expected_ranges (list): Ranges reported by Graph (e.g. ["0-", "26-49"])
+        size (int): Total size of the file
+
+    Returns:
+        list: Sorted (start, end) tuples where end is exclusive
+    """
+    ranges = []
+
+    for value in next_expected_ranges:
+        start, _, end = value.partition("-")
+        start = int(start)
+        end = int(end) + 1 if end else size
+
+        if start < min(end, size):
+            ranges.append((start, min(end, size)))
+
+    return sorted(ranges)
+
+
+def split_ranges(ranges: Iterable[Range], chunk_size: int) -> List[Range]:
+    """Split byte ranges into fragments no larger than chunk_size.
+
+    Args:
+        ranges (list): (start, end) tuples where end is exclusive
+        chunk_size (int): Maximum size of each fragment
+
+    Returns:
+        list: (start, end) tuples for each fragment
+    """
+    fragments = []
+
+    for start, end in ranges:
+        for offset in range(start, end, chunk_size):
+            fragments.append((offset, min(offset + chunk_size, end)))
+
+    return fragments
+
+
+def content_range(start: int, end: int, size: Optional[int]) -> str:
+    """Build a Content-Range header value for the exclusive range start-end.
+
+    A size of None sends "*" for a total length that is not known yet.
+    """
+    return "bytes {}-{}/{}".format(start, end - 1, "*" if size is None else size)
+
+
+def range_header(start: int, end: int) -> str:
+    """Build a Range header value for the exclusive range start-end."""
+    return "bytes={}-{}".format(start, end - 1)
+
+
+def merge_ranges(ranges: Iterable[Range]) -> List[Range]:
+    """Merge overlapping or adjacent byte ranges."""
+    merged = []
+
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def subtract_ranges(ranges: Iterable[Range], remove: Iterable[Range]) -> List[Range]:
+    """Remove byte ranges (e.g. those already transferred) from other ranges."""
+    remaining = []
+    remove = merge_ranges(remove)
+
+    for start, end in merge_ranges(ranges):
+        for remove_start, remove_end in remove:
+            if remove_end <= start or remove_start >= end:
+                continue
+
+            if remove_start > start:
+                remaining.append((start, remove_start))
+
+            start = max(start, remove_end)
+
+        if start < end:
+            remaining.append((start, end))
+
+    return remaining
@@ -0,0 +1,147 @@
+import io
+from collections import OrderedDict
+from typing import Callable
+
+from .constants import READER_BLOCK_SIZE, READER_MAX_BLOCKS, READER_READ_AHEAD
+
+
+class ItemReader(io.RawIOBase):
+    """Seekable read-only binary stream over a DriveItem backed by HTTP Range requests.
+
+    Data is fetched in fixed-size blocks that are kept in a small LRU cache.
+    Sequential reads fetch several blocks per request, random access (e.g.
+    reading the footer of a Parquet file) only fetches the blocks it needs.
+    """
+
+    def __init__(
+        self,
+        fetch_range: Callable[[int, int], bytes],
+        size: int,
+        name: str = None,
+        block_size: int = READER_BLOCK_SIZE,
+        max_blocks: int = READER_MAX_BLOCKS,
+        read_ahead: int = READER_READ_AHEAD,
+    ) -> None:
+        """Class constructor
+
+        Args:
+            fetch_range (callable): Returns the bytes from start up to (not including) end
+            size (int): Total size of the item
+            name (str): [OPTIONAL] Name of the item
+            block_size (int): Size of each block fetched and cached
+            max_blocks (int): Maximum number of blocks kept in memory
+            read_ahead (int): Number of blocks fetched at once when reading sequentially (at most max_blocks)
+        """
+        self.name = name
+        self.size = size
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.read_ahead = max(min(read_ahead, max_blocks), 1)
+        self._fetch_range = fetch_range
+        self._blocks = OrderedDict()
+        self._last_block = None
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        self._check_closed()
+
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._check_closed()
+
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError("Invalid whence: {}".format(whence))
+
+        if pos < 0:
+            raise ValueError("Negative seek position {}".format(pos))
+
+        self._pos = pos
+
+        return pos
+
+    def read(self, size: int = -1) -> bytes:
+        self._check_closed()
+
+        if size is None or size < 0:
+            size = self.size - self._pos
+
+        end = min(self._pos + size, self.size)
+        chunks = []
+
+        while self._pos < end:
+            index, offset = divmod(self._pos, self.block_size)
+            block = self._get_block(index)
+            chunk = block[offset : offset + end - self._pos]
+
+            if not chunk:
+                raise OSError("Unexpected end of data at {}".format(self._pos))
+
+            chunks.append(chunk)
+            self._pos += len(chunk)
+
+        return b"".join(chunks)
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[: len(data)] = data
+
+        return len(data)
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def close(self) -> None:
+        self._blocks.clear()
+        super().close()
+
+    def _check_closed(self) -> None:
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+    def _get_block(self, index: int) -> bytes:
+        block = self._blocks.get(index)
+
+        if block is not None:
+            self._blocks.move_to_end(index)
+            self._last_block = index
+            return block
+
+        # Read ahead only when the stream is being read sequentially
+        count = 1
+
+        if self._last_block is not None and index == self._last_block + 1:
+            while (
+                count < self.read_ahead
+                and (index + count) * self.block_size < self.size
+                and index + count not in self._blocks
+            ):
+                count += 1
+
+        start = index * self.block_size
+        end = min(start + count * self.block_size, self.size)
+        data = self._fetch_range(start, end)
+
+        for i in range(count):
+            self._blocks[index + i] = data[
+                i * self.block_size : (i + 1) * self.block_size
+            ]
+
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+        self._last_block = index
+
+        return data[: self.block_size]
@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class SyncResult:
+    """Summary of a sync_folder run"""
+
+    files_downloaded: int = 0
+    bytes_downloaded: int = 0
+    files_skipped: int = 0
+    files_deleted: int = 0
+    errors: dict = field(default_factory=dict)  # relative path -> exception
+
+
+@dataclass
+class UploadResult:
+    """Outcome of uploading one file with upload_items"""
+
+    file_path: str
+    item_path: str
+    item: Optional[dict] = None  # the uploaded DriveItem
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class CopyResult:
+    """Progress of a server-side copy started with copy_item or copy_items"""
+
+    monitor_url: Optional[str] = None  # pre-authenticated URL reporting the progress
+    status: str = "notStarted"  # notStarted, inProgress, completed or failed
+    percentage_complete: float = 0.0
+    item_id: Optional[str] = None  # ID of the new DriveItem once completed
+    drive_id: Optional[str] = None  # drive the copy was made in, if not the source's
+    error: Optional[Exception] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "completed"
@@ -1,7 +1,8 @@
+from typing import Iterator
 from urllib.parse import quote
 
-from .constants import BASE_GRAPH_URL
 from .drive import MSDrive
+from .models import Drive, Site, typed_page
 
 
 class SharePoint(MSDrive):
@@ -13,65 +14,137 @@ class SharePoint(MSDrive):
 
     """
 
-    def list_followed_sites(self) -> dict:
+    def list_followed_sites(self, **kwargs) -> dict:
         """List the SharePoint sites that you follow.
 
+        Args:
+            typed (bool): [OPTIONAL] Return the sites as compact Site objects instead of dicts (default False)
+
         Returns:
             dict: JSON representation of a collection of site resources
         """
-        r = self._session().get(f"{BASE_GRAPH_URL}/me/followedSites")
+        r = self._session().get(f"{self.base_url}/me/followedSites")
+
+        return typed_page(r.json(), Site) if kwargs.get("typed") else r.json()
+
+    def iter_followed_sites(self, **kwargs) -> Iterator[dict]:
+        """Iterate over all the SharePoint sites that you follow, fetching pages lazily.
+
+        Args:
+            top (int): [OPTIONAL] Page size
+            select (list): [OPTIONAL] Properties to return (e.g. ["id", "displayName"])
+            typed (bool): [OPTIONAL] Yield compact Site objects instead of dicts (default False)
+
+        Yields:
+            dict: JSON representation of a site resource (a Site if typed)
+        """
+        sites = self._iter_pages(
+            f"{self.base_url}/me/followedSites", self._get_query_params(**kwargs)
+        )
 
-        return r.json()
+        return map(Site, sites) if kwargs.get("typed") else sites
 
-    def search_for_site(self, search_query: str) -> dict:
+    def search_for_site(self, search_query: str, **kwargs) -> dict:
         """Search for a SharePoint site.
 
         Args:
             search_query (str): The search query
+            typed (bool): [OPTIONAL] Return the sites as compact Site objects instead of dicts (default False)
 
         Returns:
             dict: JSON representation of a collection of site resources
         """
         r = self._session().get(
-            f"{BASE_GRAPH_URL}/sites", params={"search": search_query}
+            f"{self.base_url}/sites", params={"search": search_query}
         )
 
-        return r.json()
+        return typed_page(r.json(), Site) if kwargs.get("typed") else r.json()
 
-    def list_site_drives(self, site_id: str) -> dict:
+    def iter_search_for_site(self, search_query: str, **kwargs) -> Iterator[dict]:
+        """Iterate over all the SharePoint sites matching a search, fetching pages lazily.
+
+        Args:
+            search_query (str): The search query
+            top (int): [OPTIONAL] Page size
+            select (list): [OPTIONAL] Properties to return (e.g. ["id", "displayName"])
+            typed (bool): [OPTIONAL] Yield compact Site objects instead of dicts (default False)
+
+        Yields:
+            dict: JSON representation of a site resource (a Site if typed)
+        """
+        params = {"search": search_query, **self._get_query_params(**kwargs)}
+        sites = self._iter_pages(f"{self.base_url}/sites", params)
+
+        return map(Site, sites) if kwargs.get("typed") else sites
+
+    def list_site_drives(self, site_id: str, **kwargs) -> dict:
         """List a SharePoint site's drives.
 
         Args:
             site_id (str): The site ID
+            typed (bool): [OPTIONAL] Return the drives as compact Drive objects instead of dicts (default False)
 
         Returns:
             dict: JSON representation of a collection of drive resources
         """
-        r = self._session().get(f"{BASE_GRAPH_URL}/sites/{site_id}/drives")
+        r = self._session().get(self._get_site_drives_url(site_id))
 
-        return r.json()
+        return typed_page(r.json(), Drive) if kwargs.get("typed") else r.json()
 
-    def _get_drive_item_url(self, **kwargs) -> str:
+    def iter_site_drives(self, site_id: str, **kwargs) -> Iterator[dict]:
+        """Iterate over all of a SharePoint site's drives, fetching pages lazily.
+
+        Args:
+            site_id (str): The site ID
+            top (int): [OPTIONAL] Page size
+            select (list): [OPTIONAL] Properties to return (e.g. ["id", "name"])
+            orderby (str): [OPTIONAL] Property to sort by (e.g. "name")
+            typed (bool): [OPTIONAL] Yield compact Drive objects instead of dicts (default False)
+
+        Yields:
+            dict: JSON representation of a drive resource (a Drive if typed)
+        """
+        drives = self._iter_pages(
+            self._get_site_drives_url(site_id), self._get_query_params(**kwargs)
+        )
+
+        return map(Drive, drives) if kwargs.get("typed") else drives
+
+    def _get_site_drives_url(self, site_id: str) -> str:
+        return f"{self.base_url}/sites/{site_id}/drives"
+
+    def _get_batch_url(self, method: str, **kwargs) -> str:
+        if method == "list_site_drives":
+            return self._get_site_drives_url(kwargs["site_id"])
+
+        return super()._get_batch_url(method, **kwargs)
+
+    def _get_drive_url(self, **kwargs) -> str:
         if not kwargs.get("drive_id"):
             raise ValueError("Missing drive_id argument")
 
+        return f"{self.base_url}/drives/{kwargs['drive_id']}"
+
+    def _get_drive_item_url(self, **kwargs) -> str:
+        drive_url = self._get_drive_url(**kwargs)
+
         if kwargs.get("item_id"):
-            return f"{BASE_GRAPH_URL}/drives/{kwargs['drive_id']}/items/{kwargs['item_id']}"
+            return f"{drive_url}/items/{kwargs['item_id']}"
 
         if kwargs.get("item_path"):
             path = quote(kwargs["item_path"].lstrip("/"))
-            return f"{BASE_GRAPH_URL}/drives/{kwargs['drive_id']}/root:/{path}"
+            return f"{drive_url}/root:/{path}"
 
         raise ValueError("Missing arguments: item_id or item_path")
 
     def _get_drive_children_url(self, **kwargs) -> str:
-        if not kwargs.get("drive_id"):
-            raise ValueError("Missing drive_id argument")
+        drive_url = self._get_drive_url(**kwargs)
+
+        if kwargs.get("folder_id"):
+            return f"{drive_url}/items/{kwargs['folder_id']}/children"
 
         if not kwargs.get("folder_path"):
-            return f"{BASE_GRAPH_URL}/drives/{kwargs['drive_id']}/root/children"
+            return f"{drive_url}/root/children"
         else:
             path = quote(kwargs["folder_path"].lstrip("/").rstrip("/"))
-            return (
-                f"{BASE_GRAPH_URL}/drives/{kwargs['drive_id']}/root:/{path}:/children"
-            )
+            return f"{drive_url}/root:/{path}:/children"
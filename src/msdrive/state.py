@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+
+class TransferState:
+    """Progress of a transfer persisted to a small local JSON file so it can be resumed."""
+
+    def __init__(self, path: str) -> None:
+        """Class constructor that accepts the path of the state file
+
+        Args:
+            path (str): Local path of the JSON state file
+        """
+        self.path = path
+        self.data = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """Load the saved state, an unreadable or missing file gives an empty state.
+
+        Returns:
+            dict: The saved state
+        """
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+
+        with self._lock:
+            self.data = data if isinstance(data, dict) else {}
+
+            return dict(self.data)
+
+    def save(self, **values) -> None:
+        """Update the state with the given values and atomically write it to disk."""
+        with self._lock:
+            self.data.update(values)
+            tmp_path = self.path + ".tmp"
+
+            with open(tmp_path, "w") as f:
+                json.dump(self.data, f)
+
+            os.replace(tmp_path, self.path)
+
+    def delete(self) -> None:
+        """Remove the state file once the transfer has completed."""
+        with self._lock:
+            self.data = {}
+
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def file_identity(file_path: str, hash_algorithm: Optional[str] = None) -> dict:
+    """Describe a local file so a changed file is not resumed into an old transfer.
+
+    Args:
+        file_path (str): Local path of the file
+        hash_algorithm (str): [OPTIONAL] A hashlib algorithm (e.g. sha256) to also hash the contents
+
+    Returns:
+        dict: The size, modified time and optional hash of the file
+    """
+    stat = os.stat(file_path)
+    identity = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    if hash_algorithm:
+        h = hashlib.new(hash_algorithm)
+
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1048576), b""):
+                h.update(chunk)
+
+        identity[hash_algorithm] = h.hexdigest()
+
+    return identity
@@ -0,0 +1,238 @@
+import io
+import mmap
+import os
+import threading
+from typing import Iterable, Optional, Union
+
+BufferTypes = (bytes, bytearray, memoryview)
+
+
+class StreamSource:
+    """Fills caller-owned buffers from a file object or an iterator of chunks.
+
+    Every call to readinto fills the whole buffer unless the source is exhausted,
+    which keeps upload fragments aligned regardless of how the source chunks its data.
+    """
+
+    def __init__(self, source: Union[io.IOBase, Iterable[bytes]]) -> None:
+        """Class constructor
+
+        Args:
+            source (object): A readable file object or an iterable of bytes-like chunks
+        """
+        if hasattr(source, "readinto") or hasattr(source, "read"):
+            self._file = source
+            self._chunks = None
+        else:
+            self._file = None
+            self._chunks = iter(source)
+
+        self._pending = memoryview(b"")
+
+    def readinto(self, buffer: bytearray) -> int:
+        """Fill a buffer from the source.
+
+        Args:
+            buffer (bytearray): The buffer to fill
+
+        Returns:
+            int: Number of bytes written, less than len(buffer) only at the end of the source
+        """
+        view = memoryview(buffer)
+        filled = 0
+
+        while filled < len(view):
+            n = self._read(view[filled:])
+
+            if not n:
+                break
+
+            filled += n
+
+        return filled
+
+    def _read(self, view: memoryview) -> int:
+        if self._chunks is None:
+            if hasattr(self._file, "readinto"):
+                return self._file.readinto(view) or 0
+
+            data = self._file.read(len(view))
+            view[: len(data)] = data
+
+            return len(data)
+
+        while not self._pending:
+            chunk = next(self._chunks, None)
+
+            if chunk is None:
+                return 0
+
+            self._pending = memoryview(chunk).cast("B")
+
+        n = min(len(view), len(self._pending))
+        view[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+
+        return n
+
+
+def source_size(source: object) -> Optional[int]:
+    """Get the number of bytes left in an upload source, if it can be known up front.
+
+    Args:
+        source (object): Bytes-like data, a file object or an iterable of chunks
+
+    Returns:
+        int: The remaining size or None for pipes, sockets and iterators
+    """
+    if isinstance(source, BufferTypes):
+        return memoryview(source).nbytes
+
+    try:
+        if not source.seekable():
+            return None
+
+        position = source.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+    try:
+        return os.fstat(source.fileno()).st_size - position
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        pass
+
+    end = source.seek(0, io.SEEK_END)
+    source.seek(position)
+
+    return end - position
+
+
+class BufferFragments:
+    """Reads upload fragments as zero-copy slices of bytes-like data."""
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        self._view = memoryview(data).cast("B")
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def read(self, start: int, end: int) -> memoryview:
+        """Get the exclusive byte range start-end."""
+        return self._view[start:end]
+
+    def release(self, data: memoryview, start: int, end: int) -> None:
+        """Called once a fragment has been sent."""
+        data.release()
+
+
+class FileFragments:
+    """Reads upload fragments of a local file with a choice of memory strategy.
+
+    Modes:
+        copy: open the file and read a new bytes object for every fragment
+        buffer: read into one reusable buffer per worker thread, so memory stays
+            at max_workers * chunk_size however large the file is
+        mmap: map the file and return memoryview slices of it without copying,
+            the pages are backed by the file rather than the heap
+
+    Use as a context manager so buffers, file handles and the mapping are released.
+    """
+
+    MODES = ("copy", "buffer", "mmap")
+
+    def __init__(self, file_path: str, chunk_size: int, mode: str = "copy") -> None:
+        """Class constructor
+
+        Args:
+            file_path (str): Local path of the file
+            chunk_size (int): Largest fragment that will be read
+            mode (str): One of copy, buffer or mmap
+        """
+        if mode not in self.MODES:
+            raise ValueError("read_mode must be one of " + ", ".join(self.MODES))
+
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.mode = mode
+        self._local = threading.local()
+        self._files = []
+        self._lock = threading.Lock()
+        self._mmap = None
+        self._view = None
+
+    def __enter__(self):
+        if self.mode == "mmap":
+            with open(self.file_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self._view = memoryview(self._mmap)
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the per-thread file handles and the mapping."""
+        with self._lock:
+            for f in self._files:
+                f.close()
+
+            self._files = []
+
+        if self._view is not None:
+            self._view.release()
+            self._mmap.close()
+            self._view = None
+
+    def read(self, start: int, end: int) -> Union[bytes, memoryview]:
+        """Read the exclusive byte range start-end.
+
+        In buffer mode the returned memoryview is overwritten by the next read on
+        the same thread, in mmap mode it must be released before close.
+        """
+        if self.mode == "mmap":
+            return self._view[start:end]
+
+        if self.mode == "copy":
+            with open(self.file_path, "rb") as f:
+                f.seek(start)
+
+                return f.read(end - start)
+
+        f, buffer = self._thread_state()
+        f.seek(start)
+        view = memoryview(buffer)[: end - start]
+        n = f.readinto(view)
+        view.release()
+
+        return memoryview(buffer)[:n]
+
+    def release(self, data: Union[bytes, memoryview], start: int, end: int) -> None:
+        """Called once a fragment has been sent.
+
+        In mmap mode the sent pages are also dropped from the process (they stay
+        in the OS page cache), otherwise the resident size grows to the file size.
+        """
+        if isinstance(data, memoryview):
+            data.release()
+
+        if self._mmap is not None and hasattr(mmap, "MADV_DONTNEED"):
+            # madvise needs a page aligned start, but a resumed upload can start
+            # anywhere. Dropping the shared page is harmless, the mapping is
+            # read-only so it is read back from the page cache if still needed.
+            aligned = start - start % mmap.PAGESIZE
+            self._mmap.madvise(mmap.MADV_DONTNEED, aligned, end - aligned)
+
+    def _thread_state(self) -> tuple:
+        state = getattr(self._local, "state", None)
+
+        if state is None:
+            f = open(self.file_path, "rb")
+
+            with self._lock:
+                self._files.append(f)
+
+            state = self._local.state = (f, bytearray(self.chunk_size))
+
+        return state
@@ -0,0 +1,278 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple
+
+from requests import PreparedRequest, Response, Session
+from requests.utils import rewind_body
+
+from .constants import (
+    BASE_GRAPH_URL,
+    DEFAULT_THROTTLE_RETRIES,
+    THROTTLE_BACKOFF_FACTOR,
+    THROTTLE_MAX_BACKOFF,
+    THROTTLE_STATUS_CODES,
+)
+from .instrumentation import RequestEvent, request_event
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Args:
+        value (str): The header value
+
+    Returns:
+        float: Seconds to wait or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket that spaces out requests to a steady rate."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """Class constructor
+
+        Args:
+            rate (float): Tokens (requests) added per second
+            capacity (float): Maximum tokens saved up for a burst (defaults to rate)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, blocking until one is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1  # reserve a token even if it has not accrued yet
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+
+        return wait
+
+
+class Throttle:
+    """Client-side rate limiting and retrying of throttled (429/503) responses.
+
+    Share one Throttle between several drive instances to keep all of their
+    threads under a single limit. Once a response asks to back off, every
+    request made through the throttle pauses until the Retry-After has passed.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = DEFAULT_THROTTLE_RETRIES,
+        backoff_factor: float = THROTTLE_BACKOFF_FACTOR,
+        max_backoff: float = THROTTLE_MAX_BACKOFF,
+    ) -> None:
+        """Class constructor
+
+        Args:
+            rate (float): [OPTIONAL] Maximum requests per second (default is no limit)
+            burst (float): [OPTIONAL] Requests allowed in a burst above the rate (defaults to rate)
+            max_retries (int): Retries for a throttled request before raising RateLimited
+            backoff_factor (float): Base of the jittered exponential backoff when there is no Retry-After
+            max_backoff (float): Longest backoff in seconds
+        """
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.limited_seconds = 0.0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stats(self) -> dict:
+        """Get the throttling counters.
+
+        Returns:
+            dict: Throttled responses, seconds spent backing off after them and
+                seconds spent waiting for the client-side rate limit (both
+                summed over every waiting thread)
+        """
+        with self._lock:
+            return {
+                "throttled": self.throttled,
+                "throttled_seconds": self.throttled_seconds,
+                "limited_seconds": self.limited_seconds,
+            }
+
+    def wait(self) -> None:
+        """Block until a request may be sent."""
+        pause = self._resume_at - time.monotonic()
+
+        if pause > 0:
+            time.sleep(pause)
+
+            with self._lock:
+                self.throttled_seconds += pause
+
+            self._local.waited = getattr(self._local, "waited", 0.0) + pause
+
+        if self.bucket is not None:
+            waited = self.bucket.acquire()
+
+            if waited:
+                with self._lock:
+                    self.limited_seconds += waited
+
+                self._local.waited = getattr(self._local, "waited", 0.0) + waited
+
+    def request_stats(self) -> Tuple[int, float]:
+        """Get and reset the retries and seconds waited by this thread's current request."""
+        local = self._local
+        stats = (getattr(local, "retries", 0), getattr(local, "waited", 0.0))
+        local.retries = 0
+        local.waited = 0.0
+
+        return stats
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Record a throttled response and pause every request for the delay.
+
+        Args:
+            attempt (int): Number of retries already made for the request
+            retry_after (float): The server's Retry-After in seconds, if any
+
+        Returns:
+            float: The delay before the request is retried
+        """
+        if retry_after is None:
+            # Full jitter keeps threads throttled together from retrying in lockstep
+            retry_after = random.uniform(
+                0, min(self.max_backoff, self.backoff_factor * 2**attempt)
+            )
+
+        with self._lock:
+            self.throttled += 1
+            self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+
+        return retry_after
+
+    def retry_hook(self, r: Response, *args, **kwargs) -> Response:
+        """Response hook that resends throttled requests after backing off.
+
+        It resends through the same connection adapter (like requests' own auth
+        handlers do) and must run before any hook that raises on errors.
+        """
+        attempt = 0
+
+        while (
+            r.status_code in THROTTLE_STATUS_CODES
+            and attempt < self.max_retries
+            and can_resend(r.request)
+        ):
+            self.backoff(attempt, parse_retry_after(r.headers.get("Retry-After")))
+            r.close()
+            self.wait()
+            r = r.connection.send(r.request, **kwargs)
+            attempt += 1
+
+        if attempt:
+            self._local.retries = getattr(self._local, "retries", 0) + attempt
+
+        return r
+
+
+class ThrottledSession(Session):
+    """Session that waits for its Throttle before sending each request.
+
+    Register Throttle.retry_hook as a response hook to also retry throttled
+    responses. With a listener every request is also reported as a RequestEvent,
+    without one nothing is timed or counted.
+    """
+
+    def __init__(
+        self,
+        throttle: Throttle,
+        listener: Optional[Callable[[RequestEvent], None]] = None,
+        base_url: str = BASE_GRAPH_URL,
+    ) -> None:
+        super().__init__()
+        self.throttle = throttle
+        self.listener = listener
+        self.base_url = base_url
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if self.listener is None:
+            self.throttle.wait()
+
+            return super().send(request, **kwargs)
+
+        self.throttle.request_stats()  # start counting from zero for this request
+        started = time.perf_counter()
+
+        try:
+            self.throttle.wait()
+            r = super().send(request, **kwargs)
+        except Exception as err:
+            r = getattr(err, "response", None)
+            self._emit(request, r, started, err)
+            raise
+
+        self._emit(request, r, started)
+
+        return r
+
+    def _emit(
+        self,
+        request: PreparedRequest,
+        r: Optional[Response],
+        started: float,
+        error: Optional[Exception] = None,
+    ) -> None:
+        elapsed = time.perf_counter() - started
+        retries, waited = self.throttle.request_stats()
+        self.listener(
+            request_event(request, r, elapsed, retries, waited, error, self.base_url)
+        )
+
+
+def can_resend(request: PreparedRequest) -> bool:
+    """Rewind a request's body so it can be sent again.
+
+    Returns:
+        bool: False if the body is a generator or pipe that cannot be read again
+    """
+    body = request.body
+
+    if body is None or isinstance(body, (bytes, str, bytearray, memoryview)):
+        return True
+
+    if getattr(request, "_body_position", None) is None:
+        return False
+
+    rewind_body(request)
+
+    return True
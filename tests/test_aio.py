@@ -0,0 +1,163 @@
+import asyncio
+import os
+import threading
+
+import httpx
+import pytest
+from msdrive.aio import AsyncOneDrive, AsyncSharePoint
+from msdrive.constants import (
+    ASYNC_WRITE_BUFFER_SIZE,
+    BASE_GRAPH_URL,
+    CHUNK_UPLOAD_ALIGNMENT,
+)
+from msdrive.exceptions import ItemNotFound, RateLimited
+
+ACCESS_TOKEN = "token123"
+
+
+def run(drive, coro):
+    async def main():
+        async with drive:
+            return await coro
+
+    return asyncio.run(main())
+
+
+def test_get_item_data():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["Authorization"] == "Bearer " + ACCESS_TOKEN
+        assert str(request.url) == f"{BASE_GRAPH_URL}/me/drive/root:/Documents/test.csv"
+        return httpx.Response(200, json={"name": "test.csv"})
+
+    drive = AsyncOneDrive(ACCESS_TOKEN, transport=httpx.MockTransport(handler))
+
+    assert {"name": "test.csv"} == run(
+        drive, drive.get_item_data(item_path="/Documents/test.csv")
+    )
+
+
+def test_list_items_concurrently():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"value": [{"name": request.url.path}]})
+
+    drive = AsyncSharePoint(ACCESS_TOKEN, transport=httpx.MockTransport(handler))
+
+    async def list_many():
+        return await asyncio.gather(
+            *(
+                drive.list_items(drive_id="b!1abc", folder_path=f"/folder{i}")
+                for i in range(20)
+            )
+        )
+
+    pages = run(drive, list_many())
+
+    assert 20 == len(pages)
+    assert "/v1.0/drives/b!1abc/root:/folder7:/children" == (
+        pages[7]["value"][0]["name"]
+    )
+
+
+def test_exceptions():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("drives"):
+            return httpx.Response(429, json={"error": {"message": "Rate limited"}})
+
+        return httpx.Response(404, json={"error": {"message": "Item not found"}})
+
+    drive = AsyncSharePoint(ACCESS_TOKEN, transport=httpx.MockTransport(handler))
+
+    with pytest.raises(ItemNotFound, match="Item not found"):
+        run(drive, drive.get_item_data(drive_id="b!1abc", item_id="123"))
+
+    drive = AsyncSharePoint(ACCESS_TOKEN, transport=httpx.MockTransport(handler))
+
+    with pytest.raises(RateLimited, match="Rate limited"):
+        run(drive, drive.list_site_drives("123"))
+
+
+def test_download_item(tmp_path):
+    content = os.urandom(20000)
+    download_url = "https://download.example.com/file"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url) == download_url:
+            assert "Authorization" not in request.headers
+            return httpx.Response(200, content=content)
+
+        return httpx.Response(200, json={"@microsoft.graph.downloadUrl": download_url})
+
+    drive = AsyncOneDrive(ACCESS_TOKEN, transport=httpx.MockTransport(handler))
+    run(drive, drive.download_item(item_id="123", file_path=str(tmp_path / "f.bin")))
+
+    assert content == (tmp_path / "f.bin").read_bytes()
+
+
+def test_upload_item_large(tmp_path):
+    file_size = CHUNK_UPLOAD_ALIGNMENT * 13 + 1
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(os.urandom(file_size))
+    upload_url = "https://upload.example.com/session/abc"
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(200, json={"uploadUrl": upload_url})
+
+        assert "Authorization" not in request.headers
+        received.append(len(request.content))
+
+        if sum(received) == file_size:
+            return httpx.Response(201, json={"name": "large.bin"})
+
+        return httpx.Response(202, json={})
+
+    drive = AsyncOneDrive(ACCESS_TOKEN, transport=httpx.MockTransport(handler))
+    item = run(
+        drive,
+        drive.upload_item(
+            item_path="/large.bin",
+            file_path=str(file_path),
+            chunk_size=CHUNK_UPLOAD_ALIGNMENT * 2,
+            max_workers=3,
+        ),
+    )
+
+    assert {"name": "large.bin"} == item
+    assert 7 == len(received)
+
+
+def test_file_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    content = os.urandom(ASYNC_WRITE_BUFFER_SIZE * 2 + 1)
+    download_url = "https://download.example.com/file"
+    threads = []
+    real_open = open
+
+    def recording_open(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return real_open(*args, **kwargs)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url) == download_url:
+            return httpx.Response(200, content=content)
+
+        if request.method == "PUT":
+            assert content == request.content
+            return httpx.Response(201, json={"name": "f.bin"})
+
+        return httpx.Response(200, json={"@microsoft.graph.downloadUrl": download_url})
+
+    monkeypatch.setattr("builtins.open", recording_open)
+    drive = AsyncOneDrive(ACCESS_TOKEN, transport=httpx.MockTransport(handler))
+    file_path = str(tmp_path / "f.bin")
+
+    async def transfer():
+        await drive.download_item(item_id="123", file_path=file_path)
+        await drive.upload_item(item_path="/f.bin", file_path=file_path)
+
+    run(drive, transfer())
+
+    monkeypatch.undo()
+    assert content == (tmp_path / "f.bin").read_bytes()
+    assert 2 == len(threads)
+    assert threading.main_thread() not in threads
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+from msdrive import OneDrive
+from msdrive.auth import TokenProvider
+from msdrive.constants import BASE_GRAPH_URL
+from msdrive.exceptions import InvalidAccessToken
+from requests_mock import Mocker
+
+ITEM_URL = f"{BASE_GRAPH_URL}/me/drive/items/123"
+UNAUTHORIZED = {"status_code": 401, "json": {"error": {"message": "Token expired"}}}
+AccessToken = namedtuple("AccessToken", ["token", "expires_on"])
+
+
+class Tokens:
+    def __init__(self, lifetime: float = 3600) -> None:
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return "token{}".format(self.calls), time.time() + self.lifetime
+
+
+def test_token_is_cached_until_it_expires():
+    tokens = Tokens()
+    provider = TokenProvider(tokens)
+
+    assert "token1" == provider.token()
+    assert "token1" == provider.token()
+
+    tokens.lifetime = 60  # inside the default refresh margin
+    provider.invalidate("token1")
+
+    assert "token2" == provider.token()
+    assert "token3" == provider.token()
+
+
+def test_token_sources():
+    expires_on = time.time() + 3600
+
+    class Credential:
+        def get_token(self, *scopes):
+            assert ("https://graph.microsoft.com/.default",) == scopes
+            return AccessToken("azure", expires_on)
+
+    assert "azure" == TokenProvider(Credential()).token()
+    assert (
+        "msal"
+        == TokenProvider(lambda: {"access_token": "msal", "expires_in": 3599}).token()
+    )
+    assert "plain" == TokenProvider(lambda: "plain").token()
+
+    with pytest.raises(TypeError):
+        TokenProvider("token")
+
+
+def test_concurrent_invalidations_refresh_once():
+    tokens = Tokens()
+    provider = TokenProvider(tokens)
+    stale = provider.token()
+    barrier = threading.Barrier(8)
+
+    def rejected():
+        barrier.wait()
+        provider.invalidate(stale)
+        provider.token()
+
+    threads = [threading.Thread(target=rejected) for _ in range(8)]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    assert 2 == tokens.calls
+
+
+def test_drive_uses_provider(requests_mock: Mocker):
+    tokens = Tokens()
+    drive = OneDrive(tokens)
+    requests_mock.get(
+        ITEM_URL, request_headers={"Authorization": "Bearer token1"}, json={}
+    )
+
+    drive.get_item_data(item_id="123")
+    drive.get_item_data(item_id="123")
+
+    assert 1 == tokens.calls
+
+
+def test_drive_refreshes_and_retries_on_401(requests_mock: Mocker):
+    tokens = Tokens()
+    drive = OneDrive(tokens)
+    requests_mock.get(ITEM_URL, [UNAUTHORIZED, {"json": {"id": "123"}}])
+
+    assert {"id": "123"} == drive.get_item_data(item_id="123")
+    assert ["Bearer token1", "Bearer token2"] == [
+        r.headers["Authorization"] for r in requests_mock.request_history
+    ]
+
+    # Only once per request, a token that is rejected again raises
+    requests_mock.get(ITEM_URL, [UNAUTHORIZED])
+
+    with pytest.raises(InvalidAccessToken, match="Token expired"):
+        drive.get_item_data(item_id="123")
+
+    assert 3 == tokens.calls
+
+
+def test_static_token_is_not_refreshed(requests_mock: Mocker):
+    drive = OneDrive("token123")
+    requests_mock.get(ITEM_URL, [UNAUTHORIZED])
+
+    with pytest.raises(InvalidAccessToken):
+        drive.get_item_data(item_id="123")
+
+    assert 1 == requests_mock.call_count
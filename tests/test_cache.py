@@ -0,0 +1,55 @@
+import time
+
+from msdrive.cache import MetadataCache
+
+
+def test_get_and_set():
+    cache = MetadataCache()
+    cache.set(["path", "id"], {"id": "1"})
+
+    assert {"id": "1"} == cache.get("path")
+    assert {"id": "1"} == cache.get("id")
+    assert cache.get("other") is None
+    assert {"hits": 2, "misses": 1, "size": 2} == cache.stats()
+
+
+def test_invalidate_removes_all_keys():
+    cache = MetadataCache()
+    cache.set(["path", "id"], {"id": "1"})
+    cache.invalidate("id")
+
+    assert cache.get("path") is None
+    assert 0 == len(cache)
+
+
+def test_ttl():
+    cache = MetadataCache(ttl=0.01)
+    cache.set(["id"], {"id": "1"})
+    time.sleep(0.02)
+
+    assert cache.get("id") is None
+
+
+def test_lru_eviction():
+    cache = MetadataCache(maxsize=2)
+    cache.set(["a"], {"id": "a"})
+    cache.set(["b"], {"id": "b"})
+    cache.get("a")
+    cache.set(["c"], {"id": "c"})
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None
+    assert cache.peek("c") is not None
+
+
+def test_stale():
+    cache = MetadataCache(ttl=0.01)
+    cache.set(["path", "id"], {"id": "1"})
+    time.sleep(0.02)
+
+    assert cache.get("id") is None
+    assert {"id": "1"} == cache.stale("path")
+
+    cache.invalidate("id")
+
+    assert cache.stale("path") is None
@@ -66,6 +66,7 @@ def test_rate_limited_exception(drive: OneDrive, requests_mock: Mocker):
         f"{BASE_GRAPH_URL}/me/drive/root:/none.csv",
         request_headers=REQUEST_HEADERS,
         status_code=429,
+        headers={"Retry-After": "0"},
         json={"error": {"message": "Rate limited"}},
     )
 
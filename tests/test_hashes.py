@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import os
+
+import pytest
+from msdrive.exceptions import DriveException, HashMismatch
+from msdrive.hashes import HashVerifier, QuickXorHash
+
+
+def reference_quick_xor_hash(data: bytes) -> str:
+    # A byte at a time port of the published algorithm to check the folded version
+    value = 0
+
+    for i, byte in enumerate(data):
+        shift = (i * 11) % 160
+        value ^= ((byte << shift) | (byte >> (160 - shift))) & ((1 << 160) - 1)
+
+    value ^= len(data) << 96
+
+    return base64.b64encode(value.to_bytes(20, "little")).decode()
+
+
+@pytest.mark.parametrize("size", [0, 1, 159, 160, 161, 5000, 70000])
+def test_quick_xor_hash(size: int):
+    data = os.urandom(size)
+    h = QuickXorHash()
+
+    for i in range(0, size, 777):
+        h.update(data[i : i + 777])
+
+    assert reference_quick_xor_hash(data) == h.b64digest()
+    assert reference_quick_xor_hash(data) == QuickXorHash(data).b64digest()
+
+
+def test_quick_xor_hash_known_value():
+    assert "AAAAAAAAAAAAAAAAAAAAAAAAAAA=" == QuickXorHash().b64digest()
+
+
+def test_quick_xor_hash_combine_ranges():
+    data = os.urandom(3000000)
+    h = QuickXorHash(data[2000000:], offset=2000000)
+    h.combine(QuickXorHash(data[:1234567]))
+    h.combine(QuickXorHash(data[1234567:2000000], offset=1234567))
+
+    assert QuickXorHash(data).b64digest() == h.b64digest()
+
+
+def test_hash_verifier():
+    data = b"a,b\n1,2\n"
+    item = {
+        "name": "test.csv",
+        "file": {
+            "hashes": {
+                "quickXorHash": QuickXorHash(data).b64digest(),
+                "sha1Hash": hashlib.sha1(data).hexdigest().upper(),
+            }
+        },
+    }
+
+    verifier = HashVerifier.create(True, item)
+    assert ["quickXorHash"] == list(verifier.hashers)
+
+    verifier = HashVerifier.create(["sha1Hash", "sha256Hash"], item)
+    assert ["sha1Hash"] == list(verifier.hashers)
+    verifier.update(data)
+    verifier.verify(item)
+
+    verifier = HashVerifier.create(True, item)
+    verifier.update(b"a,b\n1,3\n")
+
+    with pytest.raises(HashMismatch, match="quickXorHash of test.csv"):
+        verifier.verify(item)
+
+    assert HashVerifier.create(False, item) is None
+
+    # Asking for verification of an item without the hashes is an error
+    with pytest.raises(DriveException, match="empty has no hash"):
+        HashVerifier.create(True, {"name": "empty"})
+
+    with pytest.raises(DriveException, match="test.csv has no hash"):
+        HashVerifier.create(["sha256Hash"], item)
+
+    with pytest.raises(DriveException, match="test.csv has no hash"):
+        HashVerifier.create(["sha256Hash"]).verify(item)
+
+    with pytest.raises(ValueError):
+        HashVerifier.create(["md5Hash"])
+
+
+def test_hash_verifier_ranges(tmp_path):
+    data = os.urandom(3000000)
+    item = {
+        "file": {
+            "hashes": {
+                "quickXorHash": QuickXorHash(data).b64digest(),
+                "sha1Hash": hashlib.sha1(data).hexdigest(),
+            }
+        }
+    }
+
+    def add(verifier, start, end):
+        part = verifier.fork(start)
+        part.update(data[start:end])
+        verifier.join(part)
+
+    # In order, both hashes follow the data and nothing is read back
+    verifier = HashVerifier(["quickXorHash", "sha1Hash"])
+
+    for start in range(0, len(data), 1000000):
+        add(verifier, start, start + 1000000)
+
+    verifier.finish(str(tmp_path / "missing.bin"), len(data))
+    verifier.verify(item)
+
+    # Out of order with a range missing (e.g. sent before resuming), the
+    # quickXorHash only reads the gap and the SHA hash reads the whole file
+    file_path = tmp_path / "file.bin"
+    file_path.write_bytes(data)
+    verifier = HashVerifier(["quickXorHash", "sha1Hash"])
+    add(verifier, 2000000, 3000000)
+    add(verifier, 0, 1000000)
+
+    verifier.finish(str(file_path), len(data))
+    verifier.verify(item)
@@ -0,0 +1,222 @@
+import os
+
+import pytest
+from msdrive import OneDrive
+from msdrive.constants import (
+    BASE_GRAPH_URL,
+    CHUNK_UPLOAD_MAX_SIZE,
+    SIMPLE_UPLOAD_MAX_SIZE,
+)
+from msdrive.exceptions import ItemNotFound
+from msdrive.instrumentation import (
+    OpenTelemetryListener,
+    TransferProgress,
+    endpoint_type,
+)
+from msdrive.throttle import Throttle
+from requests_mock import Mocker
+
+ITEM_URL = f"{BASE_GRAPH_URL}/me/drive/items/123"
+DOWNLOAD_URL = "https://download.example.com/file"
+UPLOAD_URL = "https://upload.example.com/session/abc"
+
+
+def test_endpoint_type():
+    assert "metadata" == endpoint_type("GET", ITEM_URL)
+    assert "list" == endpoint_type("GET", ITEM_URL + "/children")
+    assert "delta" == endpoint_type("GET", f"{BASE_GRAPH_URL}/me/drive/root/delta")
+    assert "batch" == endpoint_type("POST", f"{BASE_GRAPH_URL}/$batch")
+    assert "upload_session" == endpoint_type("POST", ITEM_URL + "/createUploadSession")
+    assert "upload" == endpoint_type("PUT", ITEM_URL + "/content")
+    assert "download" == endpoint_type("GET", ITEM_URL + "/content")
+    assert "upload" == endpoint_type("PUT", UPLOAD_URL)
+    assert "download" == endpoint_type("GET", DOWNLOAD_URL)
+
+    local = "http://127.0.0.1:8000/v1.0"
+    assert "list" == endpoint_type("GET", local + "/me/drive/root/children", local)
+    assert "download" == endpoint_type("GET", "http://127.0.0.1:8000/download/1", local)
+
+
+def test_request_events(requests_mock: Mocker):
+    events = []
+    drive = OneDrive("token123", on_request=events.append)
+    requests_mock.get(
+        ITEM_URL,
+        [
+            {"status_code": 429, "headers": {"Retry-After": "0"}},
+            {"json": {"id": "123"}, "headers": {"Content-Length": "13"}},
+        ],
+    )
+
+    drive.get_item_data(item_id="123")
+
+    assert 1 == len(events)
+    event = events[0]
+    assert ("GET", "metadata", ITEM_URL, 200) == (
+        event.method,
+        event.endpoint,
+        event.url,
+        event.status_code,
+    )
+    assert 1 == event.retries
+    assert 13 == event.bytes_received
+    assert 0 == event.bytes_sent
+    assert event.elapsed >= event.throttle_wait >= 0
+    assert event.error is None
+
+
+def test_request_event_on_error(requests_mock: Mocker):
+    events = []
+    drive = OneDrive("token123", on_request=events.append)
+    requests_mock.get(
+        ITEM_URL, status_code=404, json={"error": {"message": "Not found"}}
+    )
+
+    with pytest.raises(ItemNotFound):
+        drive.get_item_data(item_id="123")
+
+    assert 404 == events[0].status_code
+    assert isinstance(events[0].error, ItemNotFound)
+
+
+def test_request_event_throttle_wait(requests_mock: Mocker):
+    events = []
+    throttle = Throttle(rate=100, burst=1)
+    drive = OneDrive("token123", throttle=throttle, on_request=events.append)
+    requests_mock.get(ITEM_URL, json={})
+
+    for _ in range(3):
+        drive.get_item_data(item_id="123")
+
+    assert 0 == events[0].throttle_wait
+    assert all(e.throttle_wait > 0 for e in events[1:])
+
+
+def test_transfer_progress():
+    calls = []
+    progress = TransferProgress(lambda done, total: calls.append((done, total)), 10)
+    progress.add(4)
+    progress.add_range(4, 10)
+
+    assert [(4, 10), (10, 10)] == calls
+    assert TransferProgress.create(None, 10) is None
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_download_progress(requests_mock: Mocker, tmp_path, max_workers: int):
+    data = os.urandom(100000)
+    drive = OneDrive("token123")
+    requests_mock.get(
+        ITEM_URL,
+        json={
+            "name": "file.bin",
+            "size": len(data),
+            "@microsoft.graph.downloadUrl": DOWNLOAD_URL,
+        },
+    )
+
+    def download(request, context):
+        if "Range" not in request.headers:
+            return data
+
+        start, end = request.headers["Range"][6:].split("-")
+        context.status_code = 206
+        return data[int(start) : int(end) + 1]
+
+    requests_mock.get(DOWNLOAD_URL, content=download)
+    calls = []
+
+    drive.download_item(
+        item_id="123",
+        file_path=str(tmp_path / "file.bin"),
+        max_workers=max_workers,
+        chunk_size=32768,
+        progress=lambda done, total: calls.append((done, total)),
+    )
+
+    assert calls
+    assert (len(data), len(data)) == calls[-1]
+    assert [c[0] for c in calls] == sorted(c[0] for c in calls)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_upload_progress(requests_mock: Mocker, tmp_path, max_workers: int):
+    size = SIMPLE_UPLOAD_MAX_SIZE + 1
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(os.urandom(size))
+    drive = OneDrive("token123")
+    requests_mock.post(
+        ITEM_URL + "/createUploadSession", json={"uploadUrl": UPLOAD_URL}
+    )
+    requests_mock.put(UPLOAD_URL, status_code=202, json={})
+    calls = []
+
+    drive.upload_item(
+        item_id="123",
+        file_path=str(file_path),
+        max_workers=max_workers,
+        progress=lambda done, total: calls.append((done, total)),
+    )
+
+    # Fragments may complete in any order with several workers
+    assert 2 == len(calls)
+    assert calls[0][0] in (CHUNK_UPLOAD_MAX_SIZE, size - CHUNK_UPLOAD_MAX_SIZE)
+    assert (size, size) == calls[1]
+
+
+def test_upload_progress_stream(requests_mock: Mocker):
+    drive = OneDrive("token123")
+    requests_mock.put(ITEM_URL + "/content", json={})
+    calls = []
+
+    drive.upload_item(
+        item_id="123",
+        data=iter([b"a,b\n", b"1,2\n"]),
+        progress=lambda done, total: calls.append((done, total)),
+    )
+
+    assert [(8, None)] == calls
+
+
+def test_opentelemetry_listener(requests_mock: Mocker):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    reader = InMemoryMetricReader()
+    meter_provider = MeterProvider(metric_readers=[reader])
+
+    listener = OpenTelemetryListener(
+        tracer=tracer_provider.get_tracer("test"),
+        meter=meter_provider.get_meter("test"),
+    )
+    drive = OneDrive("token123", on_request=listener)
+    requests_mock.get(
+        ITEM_URL,
+        [
+            {"json": {"id": "123"}},
+            {"status_code": 404, "json": {"error": {"message": "Not found"}}},
+        ],
+    )
+
+    drive.get_item_data(item_id="123")
+
+    with pytest.raises(ItemNotFound):
+        drive.get_item_data(item_id="123")
+
+    spans = exporter.get_finished_spans()
+    assert ["msdrive metadata", "msdrive metadata"] == [s.name for s in spans]
+    assert 200 == spans[0].attributes["http.response.status_code"]
+    assert spans[0].status.is_ok
+    assert not spans[1].status.is_ok
+
+    metrics = reader.get_metrics_data().resource_metrics[0].scope_metrics[0].metrics
+    assert "msdrive.request.duration" in [m.name for m in metrics]
@@ -0,0 +1,126 @@
+import pickle
+
+import pytest
+from msdrive.models import Drive, DriveItem, Site, typed_page
+
+FILE = {
+    "id": "123",
+    "name": "test.csv",
+    "size": 42,
+    "eTag": '"{ABC},1"',
+    "cTag": '"c:{ABC},1"',
+    "webUrl": "https://example.com/test.csv",
+    "createdBy": {"user": {"displayName": "Test User"}},
+    "parentReference": {"driveId": "b!1abc", "id": "456", "path": "/drive/root:"},
+    "file": {"mimeType": "text/csv", "hashes": {"quickXorHash": "AAAA"}},
+}
+FOLDER = {"id": "456", "name": "Documents", "folder": {"childCount": 3}}
+
+
+def test_drive_item():
+    item = DriveItem(FILE)
+
+    assert ("123", "test.csv", 42) == (item.id, item.name, item.size)
+    assert ('"{ABC},1"', '"c:{ABC},1"') == (item.etag, item.ctag)
+    assert ("b!1abc", "456", "/drive/root:") == (
+        item.drive_id,
+        item.parent_id,
+        item.parent_path,
+    )
+    assert "text/csv" == item.mime_type
+    assert {"quickXorHash": "AAAA"} == item.hashes
+    assert item.is_file and not item.is_folder
+    assert item.child_count is None
+    assert not hasattr(item, "__dict__")
+
+    folder = DriveItem(FOLDER)
+
+    assert folder.is_folder and not folder.is_file
+    assert 3 == folder.child_count
+    assert folder.hashes is None and folder.drive_id is None
+
+
+def test_drive_item_raw_json():
+    item = DriveItem(FILE)
+
+    assert FILE == item.raw
+    assert "https://example.com/test.csv" == item["webUrl"]
+    assert "123" == item["id"]
+    assert "Test User" == item.get("createdBy")["user"]["displayName"]
+    assert item.get("deleted") is None
+    assert "webUrl" in item and "deleted" not in item
+
+    with pytest.raises(KeyError):
+        item["deleted"]
+
+    # Leaving out properties with $select does not add them back as None
+    assert {"id": "1", "name": "a"} == DriveItem({"id": "1", "name": "a"}).raw
+
+
+def test_drive_item_packs_facets_once():
+    data = {
+        **FILE,
+        "parentReference": {**FILE["parentReference"], "siteId": "s1"},
+        "file": {**FILE["file"], "processingMetadata": True},
+    }
+    item = DriveItem(data)
+
+    assert data == item.raw
+    assert b"b!1abc" not in item._rest and b"AAAA" not in item._rest
+    assert {"file": {}} == DriveItem({"file": {}}).raw
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"id": "1", "parentReference": {}},
+        {"id": "1", "parentReference": None, "file": None},
+        {"id": "1", "file": {"hashes": {}}},
+        {"id": "1", "file": {"mimeType": None, "hashes": None}},
+        {"id": "1", "name": None, "size": None, "eTag": None},
+        {"id": None, "parentReference": {"driveId": "b!1abc", "path": None}},
+        {"folder": {}, "parentReference": {"id": "456", "siteId": None}},
+    ],
+)
+def test_drive_item_raw_round_trip(data):
+    item = DriveItem(data)
+
+    assert data == item.raw
+    assert data == pickle.loads(pickle.dumps(item)).raw
+
+
+def test_drive_item_null_fields():
+    item = DriveItem({"id": "1", "name": None, "file": {"hashes": {}}})
+
+    assert item.name is None and item.get("name", "x") is None
+    assert "name" in item and "size" not in item
+    assert item.is_file and {} == item.hashes
+
+
+def test_equality_and_pickle():
+    item = DriveItem(FILE)
+
+    assert DriveItem(dict(FILE)) == item
+    assert DriveItem(FOLDER) != item
+    assert item == pickle.loads(pickle.dumps(item))
+
+
+def test_site_and_drive():
+    site = Site({"id": "s1", "displayName": "Team", "webUrl": "https://example.com"})
+    drive = Drive({"id": "b!1abc", "name": "Documents", "driveType": "business"})
+
+    assert ("s1", "Team", "https://example.com") == (
+        site.id,
+        site.display_name,
+        site.web_url,
+    )
+    assert site.name is None
+    assert ("Documents", "business") == (drive.name, drive.drive_type)
+    assert "Drive(id='b!1abc', name='Documents')" == repr(drive)
+
+
+def test_typed_page():
+    page = typed_page({"value": [FILE, FOLDER], "@odata.nextLink": "next"}, DriveItem)
+
+    assert "next" == page["@odata.nextLink"]
+    assert ["test.csv", "Documents"] == [item.name for item in page["value"]]
@@ -1,8 +1,27 @@
+import hashlib
+import io
 import os
+import zipfile
 
 import pytest
 from msdrive import OneDrive
-from msdrive.constants import BASE_GRAPH_URL
+from msdrive.cache import MetadataCache
+from msdrive.constants import (
+    BASE_GRAPH_URL,
+    CHUNK_UPLOAD_ALIGNMENT,
+    CHUNK_UPLOAD_MAX_SIZE,
+    SIMPLE_UPLOAD_MAX_SIZE,
+    UPLOAD_STATE_SUFFIX,
+)
+from msdrive.exceptions import (
+    DriveException,
+    HashMismatch,
+    ItemNotFound,
+    PreconditionFailed,
+)
+from msdrive.hashes import QuickXorHash
+from msdrive.models import DriveItem
+from requests.exceptions import HTTPError
 from requests_mock import Mocker
 
 ACCESS_TOKEN = "token123"
@@ -59,6 +78,41 @@ def test_list_items(drive: OneDrive, requests_mock: Mocker):
     assert payload == drive.list_items(folder_path="/Some Files/")
 
 
+def test_list_items_typed(drive: OneDrive, requests_mock: Mocker):
+    next_link = f"{BASE_GRAPH_URL}/me/drive/root/children?$skiptoken=abc"
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root/children",
+        json={"value": [{"id": "1", "name": "a.csv"}], "@odata.nextLink": next_link},
+    )
+    requests_mock.get(next_link, json={"value": [{"id": "2", "folder": {}}]})
+
+    page = drive.list_items(typed=True)
+
+    assert next_link == page["@odata.nextLink"]
+    assert [DriveItem({"id": "1", "name": "a.csv"})] == page["value"]
+
+    items = list(drive.iter_items(typed=True))
+
+    assert ["1", "2"] == [item.id for item in items]
+    assert items[1].is_folder
+
+
+def test_base_url(requests_mock: Mocker):
+    drive = OneDrive(ACCESS_TOKEN, base_url="http://127.0.0.1:8000/v1.0/")
+    requests_mock.get("http://127.0.0.1:8000/v1.0/me/drive/items/123", json={})
+    requests_mock.post(
+        "http://127.0.0.1:8000/v1.0/$batch",
+        json={"responses": [{"id": "0", "status": 200, "body": {}}]},
+    )
+
+    assert {} == drive.get_item_data(item_id="123")
+    assert [{}] == drive.batch([("get_item_data", {"item_id": "123"})])
+    assert (
+        "/me/drive/items/123" == requests_mock.last_request.json()["requests"][0]["url"]
+    )
+
+
 def test_download_item_missing_values(drive: OneDrive):
     with pytest.raises(ValueError):
         drive.download_item()
@@ -80,20 +134,1155 @@ def test_upload_item_missing_values(drive: OneDrive):
     with pytest.raises(ValueError):
         drive.upload_item(item_path="test.csv")
 
+    with pytest.raises(ValueError):
+        drive.upload_item(item_path="test.csv", data=iter([]), chunk_size=1000)
+
 
 def test_upload_item_small(drive: OneDrive, requests_mock: Mocker):
     file_path = os.path.join(os.path.dirname(__file__), "upload_test.txt")
+    payload = {"name": "test.csv"}
 
     requests_mock.put(
         f"{BASE_GRAPH_URL}/me/drive/items/123/content",
         request_headers=REQUEST_HEADERS,
+        json=payload,
+    )
+
+    assert payload == drive.upload_item(item_id="123", file_path=file_path)
+
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Documents/test.csv:/content",
+        request_headers=REQUEST_HEADERS,
+        json=payload,
+    )
+
+    assert payload == drive.upload_item(
+        item_path="/Documents/test.csv", file_path=file_path
     )
 
-    drive.upload_item(item_id="123", file_path=file_path)
 
+def test_upload_item_large(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(os.urandom(SIMPLE_UPLOAD_MAX_SIZE + 1))
+    upload_url = "https://upload.example.com/session/abc"
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Documents/large.bin:/createUploadSession",
+        request_headers=REQUEST_HEADERS,
+        json={"uploadUrl": upload_url},
+    )
+    requests_mock.put(upload_url, status_code=202, json={})
+
+    drive.upload_item(item_path="/Documents/large.bin", file_path=str(file_path))
+
+    puts = [r for r in requests_mock.request_history if r.method == "PUT"]
+    assert [r.headers["Content-Range"] for r in puts] == [
+        f"bytes 0-{CHUNK_UPLOAD_MAX_SIZE - 1}/{SIMPLE_UPLOAD_MAX_SIZE + 1}",
+        f"bytes {CHUNK_UPLOAD_MAX_SIZE}-{SIMPLE_UPLOAD_MAX_SIZE}/{SIMPLE_UPLOAD_MAX_SIZE + 1}",
+    ]
+    assert puts[1].headers["Content-Length"] == str(
+        SIMPLE_UPLOAD_MAX_SIZE + 1 - CHUNK_UPLOAD_MAX_SIZE
+    )
+    assert all("Authorization" not in r.headers for r in puts)
+
+
+def test_upload_item_data_small(drive: OneDrive, requests_mock: Mocker):
+    payload = {"name": "test.csv"}
     requests_mock.put(
         f"{BASE_GRAPH_URL}/me/drive/root:/Documents/test.csv:/content",
         request_headers=REQUEST_HEADERS,
+        json=payload,
+    )
+
+    for data in (b"a,b\n1,2\n", io.BytesIO(b"a,b\n1,2\n"), iter([b"a,b\n", b"1,2\n"])):
+        assert payload == drive.upload_item(item_path="/Documents/test.csv", data=data)
+        assert b"a,b\n1,2\n" == bytes(requests_mock.last_request.body)
+
+
+def test_upload_item_data_large(drive: OneDrive, requests_mock: Mocker):
+    data = os.urandom(SIMPLE_UPLOAD_MAX_SIZE + 1)
+    upload_url = "https://upload.example.com/session/abc"
+    payload = {"name": "large.bin"}
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/createUploadSession",
+        json={"uploadUrl": upload_url},
+    )
+    received = []
+
+    def upload_fragment(request, context):
+        # Fragments are released once sent, so copy each one as it arrives
+        received.append((request.headers["Content-Range"], bytes(request.body)))
+        context.status_code = 201 if len(received) == 2 else 202
+        return payload
+
+    requests_mock.put(upload_url, json=upload_fragment)
+
+    assert payload == drive.upload_item(item_id="123", data=memoryview(data))
+    assert [r[0] for r in received] == [
+        f"bytes 0-{CHUNK_UPLOAD_MAX_SIZE - 1}/{len(data)}",
+        f"bytes {CHUNK_UPLOAD_MAX_SIZE}-{len(data) - 1}/{len(data)}",
+    ]
+    assert data == b"".join(r[1] for r in received)
+
+
+def test_upload_item_data_stream(drive: OneDrive, requests_mock: Mocker):
+    chunk_size = CHUNK_UPLOAD_ALIGNMENT * 4
+    data = os.urandom(chunk_size * 3 + 5)
+    upload_url = "https://upload.example.com/session/abc"
+    received = []
+
+    def upload_fragment(request, context):
+        # The buffers are reused, so copy each fragment as it arrives
+        received.append((request.headers["Content-Range"], bytes(request.body)))
+        context.status_code = 201 if len(received) == 4 else 202
+        return {"name": "export.csv"}
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/root:/export.csv:/createUploadSession",
+        json={"uploadUrl": upload_url},
+    )
+    requests_mock.put(upload_url, json=upload_fragment)
+
+    # Uneven chunks of unknown total length, e.g. rows from a database cursor
+    chunks = (data[i : i + 100000] for i in range(0, len(data), 100000))
+    item = drive.upload_item(
+        item_path="/export.csv", data=chunks, chunk_size=chunk_size
+    )
+
+    assert {"name": "export.csv"} == item
+    assert [r[0] for r in received] == [
+        f"bytes 0-{chunk_size - 1}/*",
+        f"bytes {chunk_size}-{chunk_size * 2 - 1}/*",
+        f"bytes {chunk_size * 2}-{chunk_size * 3 - 1}/*",
+        f"bytes {chunk_size * 3}-{len(data) - 1}/{len(data)}",
+    ]
+    assert data == b"".join(r[1] for r in received)
+
+
+def test_upload_item_verify(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    file_path = tmp_path / "test.csv"
+    file_path.write_bytes(b"a,b\n1,2\n")
+    hashes = {"quickXorHash": QuickXorHash(b"a,b\n1,2\n").b64digest()}
+
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/content",
+        json={"id": "123", "file": {"hashes": hashes}},
+    )
+
+    drive.upload_item(item_id="123", file_path=str(file_path), verify=True)
+    drive.upload_item(item_id="123", data=iter([b"a,b\n", b"1,2\n"]), verify=True)
+
+    with pytest.raises(HashMismatch):
+        drive.upload_item(item_id="123", data=b"a,b\n1,3\n", verify=True)
+
+    # The hashes are fetched when the upload response leaves them out
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/content", json={"id": "123"}
+    )
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        json={"id": "123", "file": {"hashes": hashes}},
+    )
+
+    drive.upload_item(item_id="123", data=b"a,b\n1,2\n", verify=True)
+
+
+def test_session_is_reused(drive: OneDrive, requests_mock: Mocker):
+    assert drive._session() is drive._session()
+
+    drive.access_token = "token456"
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        request_headers={"Authorization": "Bearer token456"},
+        json={},
+    )
+
+    assert {} == drive.get_item_data(item_id="123")
+
+
+def test_context_manager_closes_session():
+    with OneDrive(ACCESS_TOKEN, pool_maxsize=4) as drive:
+        s = drive._session()
+        assert s.get_adapter(BASE_GRAPH_URL)._pool_maxsize == 4
+
+    assert drive._session() is not s
+
+
+def test_upload_item_large_parallel(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    file_size = CHUNK_UPLOAD_ALIGNMENT * 20 + 7
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(os.urandom(file_size))
+    upload_url = "https://upload.example.com/session/abc"
+    payload = {"name": "large.bin"}
+
+    # The session reports that only the tail after the first 5 fragments is missing
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/createUploadSession",
+        json={
+            "uploadUrl": upload_url,
+            "nextExpectedRanges": [f"{CHUNK_UPLOAD_ALIGNMENT * 5}-"],
+        },
+    )
+    requests_mock.put(
+        upload_url,
+        [{"status_code": 202, "json": {}}] * 7
+        + [{"status_code": 201, "json": payload}],
+    )
+
+    item = drive.upload_item(
+        item_id="123",
+        file_path=str(file_path),
+        chunk_size=CHUNK_UPLOAD_ALIGNMENT * 2,
+        max_workers=4,
+    )
+
+    assert payload == item
+    puts = [r for r in requests_mock.request_history if r.method == "PUT"]
+    starts = sorted(int(r.headers["Content-Range"][6:].split("-")[0]) for r in puts)
+    assert starts == list(
+        range(CHUNK_UPLOAD_ALIGNMENT * 5, file_size, CHUNK_UPLOAD_ALIGNMENT * 2)
+    )
+    assert sum(len(r.body) for r in puts) == file_size - CHUNK_UPLOAD_ALIGNMENT * 5
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+@pytest.mark.parametrize("resumed", [False, True])
+def test_upload_item_large_verify(
+    drive: OneDrive, requests_mock: Mocker, tmp_path, max_workers: int, resumed: bool
+):
+    content = os.urandom(CHUNK_UPLOAD_ALIGNMENT * 20 + 7)
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(content)
+    upload_url = "https://upload.example.com/session/abc"
+    hashes = {
+        "quickXorHash": QuickXorHash(content).b64digest(),
+        "sha1Hash": hashlib.sha1(content).hexdigest(),
+    }
+
+    # A resumed session only asks for the fragments an earlier run did not send
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/createUploadSession",
+        json={
+            "uploadUrl": upload_url,
+            "nextExpectedRanges": [f"{CHUNK_UPLOAD_ALIGNMENT * 5 if resumed else 0}-"],
+        },
+    )
+
+    def put(request, context):
+        end = int(request.headers["Content-Range"].split("/")[0].split("-")[1])
+        context.status_code = 201 if end == len(content) - 1 else 202
+        return {"id": "123", "file": {"hashes": hashes}}
+
+    requests_mock.put(upload_url, json=put)
+
+    drive.upload_item(
+        item_id="123",
+        file_path=str(file_path),
+        chunk_size=CHUNK_UPLOAD_ALIGNMENT * 2,
+        max_workers=max_workers,
+        verify=["quickXorHash", "sha1Hash"],
+    )
+
+
+@pytest.mark.parametrize("read_mode", ["copy", "buffer", "mmap"])
+def test_upload_item_large_read_mode(
+    drive: OneDrive, requests_mock: Mocker, tmp_path, read_mode: str
+):
+    chunk_size = CHUNK_UPLOAD_ALIGNMENT * 2
+    data = os.urandom(chunk_size * 7 + 3)
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(data)
+    upload_url = "https://upload.example.com/session/abc"
+    received = {}
+
+    def upload_fragment(request, context):
+        start = int(request.headers["Content-Range"][6:].split("-")[0])
+        received[start] = bytes(request.body)
+        context.status_code = 201 if start == chunk_size * 7 else 202
+        return {"name": "large.bin"}
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/createUploadSession",
+        json={"uploadUrl": upload_url},
+    )
+    requests_mock.put(upload_url, json=upload_fragment)
+
+    item = drive.upload_item(
+        item_id="123",
+        file_path=str(file_path),
+        chunk_size=chunk_size,
+        max_workers=3,
+        read_mode=read_mode,
+    )
+
+    assert {"name": "large.bin"} == item
+    assert data == b"".join(received[start] for start in sorted(received))
+
+
+@pytest.mark.parametrize("read_mode", ["copy", "buffer", "mmap"])
+def test_upload_item_large_resume_unaligned(
+    drive: OneDrive, requests_mock: Mocker, tmp_path, read_mode: str
+):
+    chunk_size = CHUNK_UPLOAD_ALIGNMENT * 7
+    data = os.urandom(chunk_size * 2 + 26)
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(data)
+    upload_url = "https://upload.example.com/session/abc"
+    received = {}
+
+    def upload_fragment(request, context):
+        start = int(request.headers["Content-Range"][6:].split("-")[0])
+        received[start] = bytes(request.body)
+        context.status_code = 201 if len(received) == 2 else 202
+        return {"name": "large.bin"}
+
+    # The server already has 26 bytes, so every fragment starts mid-page
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/createUploadSession",
+        json={"uploadUrl": upload_url, "nextExpectedRanges": ["26-"]},
+    )
+    requests_mock.put(upload_url, json=upload_fragment)
+
+    item = drive.upload_item(
+        item_id="123",
+        file_path=str(file_path),
+        chunk_size=chunk_size,
+        read_mode=read_mode,
+    )
+
+    assert {"name": "large.bin"} == item
+    assert [26, chunk_size + 26] == sorted(received)
+    assert data[26:] == b"".join(received[start] for start in sorted(received))
+
+
+def test_upload_item_large_invalid_read_mode(drive: OneDrive, tmp_path):
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(bytes(SIMPLE_UPLOAD_MAX_SIZE + 1))
+
+    with pytest.raises(ValueError):
+        drive.upload_item(item_id="123", file_path=str(file_path), read_mode="nope")
+
+
+def test_upload_item_large_invalid_chunk_size(drive: OneDrive, tmp_path):
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(bytes(SIMPLE_UPLOAD_MAX_SIZE + 1))
+
+    with pytest.raises(ValueError):
+        drive.upload_item(item_id="123", file_path=str(file_path), chunk_size=1000)
+
+
+def test_upload_item_large_resume(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    file_size = CHUNK_UPLOAD_ALIGNMENT * 16
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(os.urandom(file_size))
+    upload_url = "https://upload.example.com/session/abc"
+    received = []
+
+    def put_fragment(request, context):
+        if len(received) == 5:
+            context.status_code = 500
+            return {"error": {"message": "Connection dropped"}}
+
+        start = int(request.headers["Content-Range"][6:].split("-")[0])
+        received.append(start)
+        context.status_code = 202
+        return {"nextExpectedRanges": [f"{start + len(request.body)}-"]}
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/createUploadSession",
+        json={"uploadUrl": upload_url},
+    )
+    requests_mock.put(upload_url, json=put_fragment)
+    kwargs = dict(
+        item_id="123",
+        file_path=str(file_path),
+        chunk_size=CHUNK_UPLOAD_ALIGNMENT,
+        resume=True,
+    )
+
+    with pytest.raises(DriveException):
+        drive.upload_item(**kwargs)
+
+    state_path = str(file_path) + UPLOAD_STATE_SUFFIX
+    assert os.path.exists(state_path)
+
+    requests_mock.get(
+        upload_url, json={"nextExpectedRanges": [f"{CHUNK_UPLOAD_ALIGNMENT * 5}-"]}
+    )
+    requests_mock.put(
+        upload_url,
+        [{"status_code": 202, "json": {}}] * 10
+        + [{"status_code": 201, "json": {"name": "large.bin"}}],
+    )
+
+    assert {"name": "large.bin"} == drive.upload_item(**kwargs)
+    assert not os.path.exists(state_path)
+
+    posts = [r for r in requests_mock.request_history if r.method == "POST"]
+    puts = [r for r in requests_mock.request_history if r.method == "PUT"]
+    assert len(posts) == 1
+    assert len(puts) == 6 + 11
+    assert (
+        puts[6]
+        .headers["Content-Range"]
+        .startswith(f"bytes {CHUNK_UPLOAD_ALIGNMENT * 5}-")
+    )
+
+
+def test_download_item(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    content = os.urandom(20000)
+    download_url = "https://download.example.com/file"
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        request_headers=REQUEST_HEADERS,
+        json={"size": len(content), "@microsoft.graph.downloadUrl": download_url},
+    )
+    requests_mock.get(download_url, content=content)
+
+    drive.download_item(item_id="123", file_path=str(tmp_path / "file.bin"))
+
+    assert content == (tmp_path / "file.bin").read_bytes()
+    assert "Authorization" not in requests_mock.last_request.headers
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_download_item_verify(
+    drive: OneDrive, requests_mock: Mocker, tmp_path, max_workers: int
+):
+    content = os.urandom(20000)
+    download_url = "https://download.example.com/file"
+    hashes = {"quickXorHash": QuickXorHash(content).b64digest()}
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        json={
+            "size": len(content),
+            "file": {"hashes": hashes},
+            "@microsoft.graph.downloadUrl": download_url,
+        },
+    )
+    served = content
+
+    def get(request, context):
+        if "Range" not in request.headers:
+            return served
+
+        start, end = map(int, request.headers["Range"][6:].split("-"))
+        context.status_code = 206
+        return served[start : end + 1]
+
+    requests_mock.get(download_url, content=get)
+
+    kwargs = dict(item_id="123", max_workers=max_workers, segment_size=6000)
+    drive.download_item(file_path=str(tmp_path / "file.bin"), verify=True, **kwargs)
+
+    # Corrupted in transit
+    served = content[:-1] + b"x"
+
+    with pytest.raises(HashMismatch):
+        drive.download_item(file_path=str(tmp_path / "file.bin"), verify=True, **kwargs)
+
+
+def test_download_item_ranges(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    content = os.urandom(100000)
+    download_url = "https://download.example.com/file"
+    attempts = {}
+
+    def get_range(request, context):
+        start, end = map(int, request.headers["Range"][6:].split("-"))
+        attempts[start] = attempts.get(start, 0) + 1
+        context.status_code = 206
+
+        # Drop the connection halfway through the first attempt of one segment
+        if start == 30000 and attempts[start] == 1:
+            return content[start : start + 10]
+
+        return content[start : end + 1]
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        json={"size": len(content), "@microsoft.graph.downloadUrl": download_url},
+    )
+    requests_mock.get(download_url, content=get_range)
+
+    drive.download_item(
+        item_id="123",
+        file_path=str(tmp_path / "file.bin"),
+        max_workers=4,
+        segment_size=30000,
+    )
+
+    assert content == (tmp_path / "file.bin").read_bytes()
+    assert {0: 1, 30000: 2, 60000: 1, 90000: 1} == attempts
+
+
+def test_download_item_resume(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    content = os.urandom(50000)
+    download_url = "https://download.example.com/file"
+    file_path = str(tmp_path / "file.bin")
+    requested = []
+
+    def get_range(request, context):
+        start, end = map(int, request.headers["Range"][6:].split("-"))
+        requested.append(start)
+        context.status_code = 206
+
+        if start == 30000 and len(requested) == 4:
+            context.status_code = 500
+            return b"Server error"
+
+        return content[start : end + 1]
+
+    item = {
+        "eTag": "v1",
+        "size": len(content),
+        "file": {
+            "hashes": {
+                "quickXorHash": QuickXorHash(content).b64digest(),
+                "sha1Hash": hashlib.sha1(content).hexdigest(),
+            }
+        },
+        "@microsoft.graph.downloadUrl": download_url,
+    }
+    requests_mock.get(f"{BASE_GRAPH_URL}/me/drive/items/123", json=item)
+    requests_mock.get(download_url, content=get_range)
+    kwargs = dict(item_id="123", file_path=file_path, resume=True)
+
+    with pytest.raises(HTTPError):
+        drive.download_item(segment_size=10000, segment_retries=0, **kwargs)
+
+    assert os.path.exists(file_path + ".partial")
+    assert not os.path.exists(file_path)
+
+    # The segments received before resuming are hashed from the partial file
+    drive.download_item(
+        segment_size=10000, verify=["quickXorHash", "sha1Hash"], **kwargs
     )
 
+    assert content == open(file_path, "rb").read()
+    assert [0, 10000, 20000, 30000, 30000, 40000] == requested
+    assert not os.path.exists(file_path + ".partial")
+    assert not os.path.exists(file_path + ".partial.json")
+
+
+def test_download_item_resume_changed(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    content = os.urandom(50000)
+    download_url = "https://download.example.com/file"
+    file_path = str(tmp_path / "file.bin")
+
+    (tmp_path / "file.bin.partial").write_bytes(bytes(50000))
+    (tmp_path / "file.bin.partial.json").write_text(
+        '{"eTag": "v1", "cTag": null, "size": 50000, "received": [[0, 40000]]}'
+    )
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        json={
+            "eTag": "v2",
+            "size": len(content),
+            "@microsoft.graph.downloadUrl": download_url,
+        },
+    )
+    requests_mock.get(download_url, status_code=206, content=content)
+
+    drive.download_item(item_id="123", file_path=file_path, resume=True)
+
+    assert content == open(file_path, "rb").read()
+    assert "bytes=0-49999" == requests_mock.last_request.headers["Range"]
+
+
+def test_iter_items(drive: OneDrive, requests_mock: Mocker):
+    next_link = f"{BASE_GRAPH_URL}/me/drive/root:/Some%20Files:/children?$skiptoken=abc"
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Some%20Files:/children?$top=2&$select=id,name",
+        request_headers=REQUEST_HEADERS,
+        complete_qs=True,
+        json={"value": [{"id": "1"}, {"id": "2"}], "@odata.nextLink": next_link},
+    )
+    requests_mock.get(
+        next_link,
+        request_headers=REQUEST_HEADERS,
+        complete_qs=True,
+        json={"value": [{"id": "3"}]},
+    )
+
+    items = drive.iter_items(folder_path="/Some Files", top=2, select=["id", "name"])
+
+    assert {"id": "1"} == next(items)
+    assert 1 == requests_mock.call_count
+    assert [{"id": "2"}, {"id": "3"}] == list(items)
+    assert 2 == requests_mock.call_count
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_walk(drive: OneDrive, requests_mock: Mocker, max_workers: int):
+    def folder(item_id: str) -> dict:
+        return {"id": item_id, "name": item_id.title(), "folder": {"childCount": 1}}
+
+    def file(name: str) -> dict:
+        return {"id": name, "name": name, "file": {}}
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Docs:/children",
+        json={"value": [folder("a"), file("1.txt"), folder("b")]},
+    )
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/a/children",
+        json={"value": [folder("c")], "@odata.nextLink": f"{BASE_GRAPH_URL}/next"},
+    )
+    requests_mock.get(f"{BASE_GRAPH_URL}/next", json={"value": [file("2.txt")]})
+    requests_mock.get(f"{BASE_GRAPH_URL}/me/drive/items/b/children", json={"value": []})
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/c/children", json={"value": [file("3.txt")]}
+    )
+
+    walked = {
+        path: ([f["name"] for f in folders], [f["name"] for f in files])
+        for path, folders, files in drive.walk(
+            folder_path="/Docs", max_workers=max_workers
+        )
+    }
+
+    assert {
+        "": (["A", "B"], ["1.txt"]),
+        "A": (["C"], ["2.txt"]),
+        "B": ([], []),
+        "A/C": ([], ["3.txt"]),
+    } == walked
+
+    first = requests_mock.request_history[0]
+    assert ["1000"] == first.qs["$top"]
+    assert "id,name,size,etag,ctag,lastmodifieddatetime,folder,file" == (
+        first.qs["$select"][0]
+    )
+
+    if max_workers == 1:
+        # Breadth-first, a folder's subfolders are listed after its siblings
+        assert ["A", "B", "A/C"] == list(walked)[1:]
+
+
+def test_walk_prune(drive: OneDrive, requests_mock: Mocker):
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root/children",
+        json={
+            "value": [
+                {"id": "a", "name": "Archive", "folder": {}},
+                {"id": "b", "name": "Current", "folder": {}},
+            ]
+        },
+    )
+    requests_mock.get(f"{BASE_GRAPH_URL}/me/drive/items/b/children", json={"value": []})
+    paths = []
+
+    for path, folders, _ in drive.walk(select=["id"]):
+        paths.append(path)
+        folders[:] = [f for f in folders if f["name"] != "Archive"]
+
+    assert ["", "Current"] == paths
+    assert "id,name,folder,file" == requests_mock.request_history[0].qs["$select"][0]
+
+
+MONITOR_URL = "https://monitor.example.com/copy/abc"
+
+
+def test_copy_item(drive: OneDrive, requests_mock: Mocker):
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Archive",
+        request_headers=REQUEST_HEADERS,
+        json={"id": "F1"},
+    )
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/root:/a.csv:/copy",
+        request_headers=REQUEST_HEADERS,
+        status_code=202,
+        headers={"Location": MONITOR_URL},
+    )
+    requests_mock.get(
+        MONITOR_URL,
+        [
+            {"status_code": 202, "json": {"status": "inProgress"}},
+            {"json": {"status": "completed", "resourceId": "NEW"}},
+        ],
+    )
+
+    result = drive.copy_item(
+        item_path="/a.csv",
+        dest_folder_path="/Archive",
+        name="b.csv",
+        conflict_behavior="rename",
+        poll_interval=0,
+    )
+
+    assert result.ok
+    assert ("NEW", 100.0) == (result.item_id, result.percentage_complete)
+
+    post = [r for r in requests_mock.request_history if r.method == "POST"][0]
+    assert {"parentReference": {"id": "F1"}, "name": "b.csv"} == post.json()
+    assert ["rename"] == post.qs["@microsoft.graph.conflictbehavior"]
+    assert ["id"] == requests_mock.request_history[0].qs["$select"]
+    assert all(
+        "Authorization" not in r.headers
+        for r in requests_mock.request_history
+        if r.url == MONITOR_URL
+    )
+
+
+def test_copy_item_without_waiting(drive: OneDrive, requests_mock: Mocker):
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/copy",
+        status_code=202,
+        headers={"Location": MONITOR_URL},
+    )
+    requests_mock.get(
+        MONITOR_URL,
+        status_code=303,
+        headers={"Location": f"{BASE_GRAPH_URL}/drives/d1/items/NEW"},
+    )
+
+    result = drive.copy_item(item_id="123", name="copy.csv", wait=False)
+
+    assert not result.done
+    assert 1 == requests_mock.call_count
+    assert {"name": "copy.csv"} == requests_mock.last_request.json()
+
+    drive.get_copy_status(result)
+
+    assert result.ok
+    assert "NEW" == result.item_id
+    assert 2 == requests_mock.call_count
+
+
+def test_copy_item_failed(drive: OneDrive, requests_mock: Mocker):
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/copy",
+        status_code=202,
+        headers={"Location": MONITOR_URL},
+    )
+    requests_mock.get(
+        MONITOR_URL,
+        json={"status": "failed", "error": {"message": "Quota exceeded"}},
+    )
+
+    with pytest.raises(DriveException, match="Quota exceeded"):
+        drive.copy_item(item_id="123", dest_folder_id="F1", poll_interval=0)
+
+    requests_mock.get(MONITOR_URL, json={"status": "inProgress"})
+
+    with pytest.raises(DriveException, match="still running"):
+        drive.copy_item(item_id="123", dest_folder_id="F1", timeout=0)
+
+
+def test_copy_items(drive: OneDrive, requests_mock: Mocker):
+    folder = requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Archive", json={"id": "F1"}
+    )
+
+    for name in ("a", "b"):
+        requests_mock.post(
+            f"{BASE_GRAPH_URL}/me/drive/root:/{name}.csv:/copy",
+            status_code=202,
+            headers={"Location": f"{MONITOR_URL}/{name}"},
+        )
+        requests_mock.get(
+            f"{MONITOR_URL}/{name}",
+            json={"status": "completed", "resourceId": name.upper()},
+        )
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/root:/missing.csv:/copy",
+        status_code=404,
+        json={"error": {"message": "Item not found"}},
+    )
+
+    results = drive.copy_items(
+        [
+            {"item_path": f"/{name}.csv", "dest_folder_path": "/Archive"}
+            for name in ("a", "missing", "b")
+        ],
+        poll_interval=0,
+    )
+
+    assert ["A", None, "B"] == [r.item_id for r in results]
+    assert [True, False, True] == [r.ok for r in results]
+    assert isinstance(results[1].error, ItemNotFound)
+    assert 1 == folder.call_count
+
+
+def test_move_item(drive: OneDrive, requests_mock: Mocker):
+    requests_mock.patch(
+        f"{BASE_GRAPH_URL}/me/drive/root:/a.csv",
+        request_headers=REQUEST_HEADERS,
+        json={"id": "123", "name": "b.csv"},
+    )
+
+    assert {"id": "123", "name": "b.csv"} == drive.move_item(
+        item_path="/a.csv", dest_folder_id="F1", name="b.csv"
+    )
+    assert {
+        "parentReference": {"id": "F1"},
+        "name": "b.csv",
+    } == requests_mock.last_request.json()
+
+
+def test_upload_items(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"a")
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "sub" / "b.txt").write_bytes(b"b")
+    (tmp_path / "sub" / "deep" / "c.txt").write_bytes(b"c")
+    (tmp_path / "empty").mkdir()
+
+    for folder in ("root", "root:/Backup:", "root:/Backup/sub:"):
+        requests_mock.post(
+            f"{BASE_GRAPH_URL}/me/drive/{folder}/children",
+            request_headers=REQUEST_HEADERS,
+            json={},
+        )
+
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Backup/a.txt:/content",
+        json={"name": "a.txt"},
+    )
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Backup/sub/b.txt:/content",
+        status_code=500,
+        json={"error": {"message": "Server error"}},
+    )
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Backup/sub/deep/c.txt:/content",
+        json={"name": "c.txt"},
+    )
+
+    results = drive.upload_items(local_path=str(tmp_path), folder_path="/Backup")
+    results = {r.item_path: r for r in results}
+
+    assert {"name": "a.txt"} == results["/Backup/a.txt"].item
+    assert results["/Backup/sub/deep/c.txt"].ok
+    assert not results["/Backup/sub/b.txt"].ok
+    assert isinstance(results["/Backup/sub/b.txt"].error, DriveException)
+
+    posts = [
+        r.json()["name"] for r in requests_mock.request_history if r.method == "POST"
+    ]
+    assert ["Backup", "deep", "empty", "sub"] == sorted(posts)
+
+    # Known folders are not created again
+    drive.upload_items(files=[(str(tmp_path / "a.txt"), "/Backup/sub/deep/c.txt")])
+
+    assert 4 == len([r for r in requests_mock.request_history if r.method == "POST"])
+
+
+def test_upload_items_existing_folder(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"a")
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/root/children",
+        status_code=409,
+        json={"error": {"message": "Name already exists"}},
+    )
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Existing/a.txt:/content",
+        json={"name": "a.txt"},
+    )
+
+    results = drive.upload_items(files=[(str(tmp_path / "a.txt"), "/Existing/a.txt")])
+
+    assert results[0].ok
+
+
+def test_metadata_cache(requests_mock: Mocker):
+    drive = OneDrive(ACCESS_TOKEN, metadata_cache=MetadataCache())
+    file_path = os.path.join(os.path.dirname(__file__), "upload_test.txt")
+    item_url = f"{BASE_GRAPH_URL}/me/drive/root:/Documents/test.csv"
+
+    requests_mock.get(item_url, json={"id": "123", "eTag": "v1"})
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123", json={"id": "123", "eTag": "v2"}
+    )
+
+    assert {"id": "123", "eTag": "v1"} == drive.get_item_data(
+        item_path="/Documents/test.csv"
+    )
+    assert {"id": "123", "eTag": "v1"} == drive.get_item_data(item_id="123")
+    assert 1 == requests_mock.call_count
+    assert 1 == drive.metadata_cache.hits
+
+    # Our own uploads invalidate the item
+    requests_mock.put(item_url + ":/content", json={"id": "123", "eTag": "v2"})
     drive.upload_item(item_path="/Documents/test.csv", file_path=file_path)
+    drive.get_item_data(item_id="123")
+
+    assert 3 == requests_mock.call_count
+
+    # As do listings showing a new eTag
+    drive.get_item_data(item_id="123")
+    assert 3 == requests_mock.call_count
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Documents:/children",
+        json={"value": [{"id": "123", "eTag": "v3"}]},
+    )
+    list(drive.iter_items(folder_path="/Documents"))
+    drive.get_item_data(item_id="123")
+
+    assert 5 == requests_mock.call_count
+
+
+def test_metadata_cache_revalidation(requests_mock: Mocker):
+    drive = OneDrive(ACCESS_TOKEN, metadata_cache=MetadataCache(ttl=0))
+    item_url = f"{BASE_GRAPH_URL}/me/drive/items/123"
+    children_url = f"{BASE_GRAPH_URL}/me/drive/items/123/children"
+
+    requests_mock.get(
+        item_url,
+        [{"json": {"id": "123", "eTag": "v1"}}, {"status_code": 304}],
+    )
+    requests_mock.get(
+        children_url,
+        [
+            {"json": {"value": [{"id": "456"}]}, "headers": {"ETag": "list1"}},
+            {"status_code": 304},
+        ],
+    )
+
+    assert {"id": "123", "eTag": "v1"} == drive.get_item_data(item_id="123")
+    assert {"id": "123", "eTag": "v1"} == drive.get_item_data(item_id="123")
+    assert "v1" == requests_mock.last_request.headers["If-None-Match"]
+
+    assert {"value": [{"id": "456"}]} == drive.list_items(folder_id="123")
+    assert "If-None-Match" not in requests_mock.last_request.headers
+    assert {"value": [{"id": "456"}]} == drive.list_items(folder_id="123")
+    assert "list1" == requests_mock.last_request.headers["If-None-Match"]
+
+
+def test_download_item_after_revalidation(requests_mock: Mocker, tmp_path):
+    drive = OneDrive(ACCESS_TOKEN, metadata_cache=MetadataCache(ttl=0))
+    file_path = str(tmp_path / "file.bin")
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        [
+            {
+                "json": {
+                    "id": "123",
+                    "eTag": "v1",
+                    "@microsoft.graph.downloadUrl": "https://dl/1",
+                }
+            },
+            {"status_code": 304},
+            {
+                "json": {
+                    "id": "123",
+                    "eTag": "v1",
+                    "@microsoft.graph.downloadUrl": "https://dl/2",
+                }
+            },
+        ],
+    )
+    requests_mock.get(
+        "https://dl/1",
+        [{"content": b"data"}, {"status_code": 403, "text": "Forbidden"}],
+    )
+    requests_mock.get("https://dl/2", content=b"data")
+
+    drive.download_item(item_id="123", file_path=file_path)
+
+    # The 304 reuses the old URL, which has expired, so a new one is fetched
+    drive.download_item(item_id="123", file_path=file_path)
+
+    assert "https://dl/2" == requests_mock.last_request.url
+    assert "If-None-Match" not in requests_mock.request_history[-2].headers
+
+
+def test_download_item_if_none_match(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    download_url = "https://download.example.com/file"
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        json={"eTag": "v1", "size": 4, "@microsoft.graph.downloadUrl": download_url},
+    )
+    requests_mock.get(download_url, content=b"data")
+    file_path = str(tmp_path / "file.bin")
+
+    assert not drive.download_item(
+        item_id="123", file_path=file_path, if_none_match="v1"
+    )
+    assert not os.path.exists(file_path)
+    assert drive.download_item(item_id="123", file_path=file_path, if_none_match="v0")
+    assert b"data" == open(file_path, "rb").read()
+
+
+def test_upload_item_if_match(drive: OneDrive, requests_mock: Mocker, tmp_path):
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(os.urandom(SIMPLE_UPLOAD_MAX_SIZE + 1))
+    upload_url = "https://upload.example.com/session/abc"
+
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/content",
+        request_headers={"If-Match": "v1"},
+        json={"id": "123"},
+    )
+    drive.upload_item(item_id="123", data=b"a,b\n", if_match="v1")
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/me/drive/items/123/createUploadSession",
+        request_headers={"If-Match": "v1"},
+        status_code=412,
+        json={"error": {"message": "ETag does not match"}},
+    )
+
+    with pytest.raises(PreconditionFailed, match="ETag does not match"):
+        drive.upload_item(item_id="123", file_path=str(file_path), if_match="v1")
+
+    assert upload_url not in [r.url for r in requests_mock.request_history]
+
+
+def test_download_url_cache(requests_mock: Mocker, tmp_path):
+    drive = OneDrive(ACCESS_TOKEN, download_url_ttl=60)
+    file_path = str(tmp_path / "file.bin")
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        [
+            {"json": {"id": "123", "@microsoft.graph.downloadUrl": "https://dl/1"}},
+            {"json": {"id": "123", "@microsoft.graph.downloadUrl": "https://dl/2"}},
+        ],
+    )
+    requests_mock.get("https://dl/1", content=b"data")
+    requests_mock.get("https://dl/2", content=b"data")
+
+    drive.download_item(item_id="123", file_path=file_path)
+    drive.download_item(item_id="123", file_path=file_path)
+
+    assert ["https://dl/1", "https://dl/1"] == [
+        r.url for r in requests_mock.request_history if r.url.startswith("https://dl")
+    ]
+
+    # An expired URL is refreshed once and the download retried
+    requests_mock.get("https://dl/1", status_code=403, text="Forbidden")
+    drive.download_item(item_id="123", file_path=file_path)
+
+    assert "https://dl/2" == requests_mock.last_request.url
+    assert b"data" == open(file_path, "rb").read()
+    assert 2 == len([r for r in requests_mock.request_history if "/items/123" in r.url])
+
+
+def test_download_url_cache_verify(requests_mock: Mocker, tmp_path):
+    drive = OneDrive(ACCESS_TOKEN, download_url_ttl=60)
+    file_path = str(tmp_path / "file.bin")
+    hashes = {"quickXorHash": QuickXorHash(b"data").b64digest()}
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        json={
+            "id": "123",
+            "file": {"hashes": hashes},
+            "@microsoft.graph.downloadUrl": "https://dl/1",
+        },
+    )
+    requests_mock.get("https://dl/1", content=b"data")
+
+    drive.download_item(item_id="123", file_path=file_path, verify=True)
+
+    # The cached download data keeps the hashes to verify against
+    requests_mock.get("https://dl/1", content=b"dada")
+
+    with pytest.raises(HashMismatch):
+        drive.download_item(item_id="123", file_path=file_path, verify=True)
+
+
+def test_upload_item_missing_values_with_cache(tmp_path):
+    drive = OneDrive(ACCESS_TOKEN, metadata_cache=MetadataCache())
+    file_path = tmp_path / "file.bin"
+    file_path.write_bytes(b"abc")
+
+    with pytest.raises(ValueError, match="item_id or item_path"):
+        drive.upload_item(file_path=str(file_path))
+
+
+def test_upload_item_invalidates_download_url_cache(requests_mock: Mocker, tmp_path):
+    drive = OneDrive(ACCESS_TOKEN, download_url_ttl=60)
+    file_path = str(tmp_path / "file.bin")
+    item_url = f"{BASE_GRAPH_URL}/me/drive/items/123"
+
+    requests_mock.get(
+        item_url,
+        [
+            {
+                "json": {
+                    "id": "123",
+                    "eTag": "v1",
+                    "@microsoft.graph.downloadUrl": "https://dl/1",
+                }
+            },
+            {
+                "json": {
+                    "id": "123",
+                    "eTag": "v2",
+                    "@microsoft.graph.downloadUrl": "https://dl/2",
+                }
+            },
+        ],
+    )
+    requests_mock.get("https://dl/1", content=b"old")
+    requests_mock.get("https://dl/2", content=b"new")
+    requests_mock.put(
+        f"{BASE_GRAPH_URL}/me/drive/root:/Documents/test.csv:/content",
+        json={"id": "123", "eTag": "v2"},
+    )
+
+    drive.download_item(item_id="123", file_path=file_path)
+    drive.upload_item(item_path="/Documents/test.csv", data=b"new")
+
+    # Uploaded by path, forgotten by ID too
+    assert drive.download_item(item_id="123", file_path=file_path, if_none_match="v1")
+    assert b"new" == open(file_path, "rb").read()
+
+
+def test_open_item(drive: OneDrive, requests_mock: Mocker):
+    archive = io.BytesIO()
+
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("data.csv", "a,b\n1,2\n")
+        z.writestr("padding.bin", os.urandom(300000))
+
+    content = archive.getvalue()
+    download_url = "https://download.example.com/file"
+
+    def get_range(request, context):
+        start, end = map(int, request.headers["Range"][6:].split("-"))
+        context.status_code = 206
+        return content[start : end + 1]
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/root:/archive.zip",
+        json={"size": len(content), "@microsoft.graph.downloadUrl": download_url},
+    )
+    requests_mock.get(download_url, content=get_range)
+
+    with drive.open_item(item_path="/archive.zip", block_size=65536) as f:
+        with zipfile.ZipFile(f) as z:
+            assert b"a,b\n1,2\n" == z.read("data.csv")
+
+    # Only the blocks holding the zip directory and the small member were fetched
+    fetched = [r for r in requests_mock.request_history if r.url == download_url]
+    ranges = [map(int, r.headers["Range"][6:].split("-")) for r in fetched]
+    assert sum(end + 1 - start for start, end in ranges) < len(content) / 2
+
+
+def test_open_item_without_range_support(drive: OneDrive, requests_mock: Mocker):
+    download_url = "https://download.example.com/file"
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/me/drive/items/123",
+        json={"size": 100000, "@microsoft.graph.downloadUrl": download_url},
+    )
+    requests_mock.get(download_url, content=os.urandom(100000))
+
+    with drive.open_item(item_id="123", block_size=4096) as f:
+        f.seek(-10, io.SEEK_END)
+
+        with pytest.raises(DriveException, match="range requests"):
+            f.read()
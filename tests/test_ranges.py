@@ -0,0 +1,34 @@
+from msdrive.ranges import (
+    content_range,
+    merge_ranges,
+    parse_ranges,
+    split_ranges,
+    subtract_ranges,
+)
+
+
+def test_parse_ranges():
+    assert [(0, 100)] == parse_ranges(["0-"], 100)
+    assert [(10, 20), (50, 100)] == parse_ranges(["50-", "10-19"], 100)
+    assert [(90, 100)] == parse_ranges(["90-199"], 100)
+    assert [] == parse_ranges([], 100)
+
+
+def test_split_ranges():
+    assert [(0, 4), (4, 8), (8, 10)] == split_ranges([(0, 10)], 4)
+    assert [(0, 4), (8, 10)] == split_ranges([(0, 4), (8, 10)], 4)
+
+
+def test_content_range():
+    assert "bytes 0-9/100" == content_range(0, 10, 100)
+    assert "bytes 0-9/*" == content_range(0, 10, None)
+
+
+def test_merge_ranges():
+    assert [(0, 20), (30, 40)] == merge_ranges([(10, 20), (30, 40), (0, 10)])
+
+
+def test_subtract_ranges():
+    assert [(0, 100)] == subtract_ranges([(0, 100)], [])
+    assert [(10, 30), (40, 100)] == subtract_ranges([(0, 100)], [(0, 10), (30, 40)])
+    assert [] == subtract_ranges([(0, 100)], [(0, 50), (50, 100)])
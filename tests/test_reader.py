@@ -0,0 +1,64 @@
+import io
+import os
+
+import pytest
+from msdrive.reader import ItemReader
+
+
+class FakeItem:
+    def __init__(self, size: int) -> None:
+        self.content = os.urandom(size)
+        self.requests = []
+
+    def fetch_range(self, start: int, end: int) -> bytes:
+        self.requests.append((start, end))
+        return self.content[start:end]
+
+
+def test_read_and_seek():
+    item = FakeItem(1000)
+    reader = ItemReader(item.fetch_range, 1000, block_size=100, max_blocks=4)
+
+    assert item.content[:150] == reader.read(150)
+    assert 150 == reader.tell()
+    assert 990 == reader.seek(-10, io.SEEK_END)
+    assert item.content[990:] == reader.read()
+    assert b"" == reader.read(10)
+    assert 10 == reader.seek(10)
+    assert item.content[10:20] == reader.read(10)
+
+
+def test_read_ahead_only_when_sequential():
+    item = FakeItem(1000)
+    reader = ItemReader(
+        item.fetch_range, 1000, block_size=100, max_blocks=4, read_ahead=3
+    )
+
+    reader.seek(900)
+    reader.read(10)
+    reader.seek(0)
+    reader.read(100)
+    reader.read(100)
+    reader.read(250)
+
+    assert [(900, 1000), (0, 100), (100, 400), (400, 700)] == item.requests
+
+
+def test_block_cache_is_bounded():
+    item = FakeItem(1000)
+    reader = ItemReader(item.fetch_range, 1000, block_size=100, max_blocks=2)
+
+    reader.read()
+    reader.seek(0)
+    reader.read(10)
+
+    assert 2 == len(reader._blocks)
+    assert (0, 100) == item.requests[-1]
+
+
+def test_closed():
+    reader = ItemReader(FakeItem(10).fetch_range, 10)
+    reader.close()
+
+    with pytest.raises(ValueError):
+        reader.read()
@@ -3,6 +3,8 @@ import os
 import pytest
 from msdrive import SharePoint
 from msdrive.constants import BASE_GRAPH_URL
+from msdrive.exceptions import ItemNotFound
+from msdrive.models import Drive, Site
 from requests_mock import Mocker
 
 ACCESS_TOKEN = "token123"
@@ -99,20 +101,25 @@ def test_upload_item_missing_values(drive: SharePoint):
 
 def test_upload_item_small(drive: SharePoint, requests_mock: Mocker):
     file_path = os.path.join(os.path.dirname(__file__), "upload_test.txt")
+    payload = {"name": "test.csv"}
 
     requests_mock.put(
         f"{BASE_GRAPH_URL}/drives/b!1abc/items/123/content",
         request_headers=REQUEST_HEADERS,
+        json=payload,
     )
 
-    drive.upload_item(drive_id="b!1abc", item_id="123", file_path=file_path)
+    assert payload == drive.upload_item(
+        drive_id="b!1abc", item_id="123", file_path=file_path
+    )
 
     requests_mock.put(
         f"{BASE_GRAPH_URL}/drives/b!1abc/root:/Documents/test.csv:/content",
         request_headers=REQUEST_HEADERS,
+        json=payload,
     )
 
-    drive.upload_item(
+    assert payload == drive.upload_item(
         drive_id="b!1abc", item_path="/Documents/test.csv", file_path=file_path
     )
 
@@ -151,3 +158,288 @@ def test_list_site_drives(drive: SharePoint, requests_mock: Mocker):
     )
 
     assert payload == drive.list_site_drives("123")
+
+
+def test_site_listings_typed(drive: SharePoint, requests_mock: Mocker):
+    site = {"id": "s1", "displayName": "Test site"}
+
+    requests_mock.get(f"{BASE_GRAPH_URL}/me/followedSites", json={"value": [site]})
+    requests_mock.get(f"{BASE_GRAPH_URL}/sites", json={"value": [site]})
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/sites/s1/drives",
+        json={"value": [{"id": "b!1abc", "name": "Documents"}]},
+    )
+
+    assert [Site(site)] == drive.list_followed_sites(typed=True)["value"]
+    assert [Site(site)] == list(drive.iter_followed_sites(typed=True))
+    assert (
+        "Test site"
+        == drive.search_for_site("test", typed=True)["value"][0].display_name
+    )
+    assert [Site(site)] == list(drive.iter_search_for_site("test", typed=True))
+
+    drives = drive.list_site_drives("s1", typed=True)["value"]
+
+    assert [Drive({"id": "b!1abc", "name": "Documents"})] == drives
+    assert drives == list(drive.iter_site_drives("s1", typed=True))
+
+
+def test_batch(drive: SharePoint, requests_mock: Mocker):
+    def batch(request, context):
+        responses = []
+
+        for sub_request in request.json()["requests"]:
+            if sub_request["url"].endswith("missing.csv"):
+                status, body = 404, {"error": {"message": "Item not found"}}
+            else:
+                status, body = 200, {"url": sub_request["url"]}
+
+            responses.append({"id": sub_request["id"], "status": status, "body": body})
+
+        return {"responses": responses[::-1]}
+
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/$batch", request_headers=REQUEST_HEADERS, json=batch
+    )
+
+    calls = [
+        ("get_item_data", {"drive_id": "b!1abc", "item_id": str(i)}) for i in range(22)
+    ]
+    calls += [
+        ("get_item_data", {"drive_id": "b!1abc", "item_path": "/missing.csv"}),
+        ("list_items", {"drive_id": "b!1abc", "folder_path": "/General"}),
+        ("list_site_drives", {"site_id": "123"}),
+        (
+            "list_items",
+            {"drive_id": "b!1abc", "top": 5, "select": ["id", "name"]},
+        ),
+    ]
+
+    results = drive.batch(calls)
+
+    assert 2 == requests_mock.call_count
+    assert {"url": "/drives/b!1abc/items/7"} == results[7]
+    assert isinstance(results[22], ItemNotFound)
+    assert {"url": "/drives/b!1abc/root:/General:/children"} == results[23]
+    assert {"url": "/sites/123/drives"} == results[24]
+    assert {"url": "/drives/b!1abc/root/children?$top=5&$select=id,name"} == results[25]
+
+    with pytest.raises(ValueError):
+        drive.batch([("download_item", {"drive_id": "b!1abc", "item_id": "1"})])
+
+
+def test_iter_site_drives(drive: SharePoint, requests_mock: Mocker):
+    next_link = f"{BASE_GRAPH_URL}/sites/123/drives?$skiptoken=abc"
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/sites/123/drives",
+        request_headers=REQUEST_HEADERS,
+        json={"value": [{"name": "Documents"}], "@odata.nextLink": next_link},
+    )
+    requests_mock.get(next_link, json={"value": [{"name": "Archive"}]})
+
+    assert [{"name": "Documents"}, {"name": "Archive"}] == list(
+        drive.iter_site_drives("123")
+    )
+
+
+def test_iter_search_for_site(drive: SharePoint, requests_mock: Mocker):
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/sites?search=test+site&$select=id",
+        request_headers=REQUEST_HEADERS,
+        complete_qs=True,
+        json={"value": [{"id": "1"}]},
+    )
+
+    assert [{"id": "1"}] == list(drive.iter_search_for_site("test site", select="id"))
+
+
+def test_iter_delta(drive: SharePoint, requests_mock: Mocker, tmp_path):
+    state_path = str(tmp_path / "delta.json")
+    delta_url = f"{BASE_GRAPH_URL}/drives/b!1abc/root/delta"
+
+    requests_mock.get(
+        delta_url,
+        request_headers=REQUEST_HEADERS,
+        complete_qs=True,
+        json={
+            "value": [{"id": "1"}],
+            "@odata.nextLink": f"{delta_url}?token=page2",
+        },
+    )
+    requests_mock.get(
+        f"{delta_url}?token=page2",
+        complete_qs=True,
+        json={"value": [{"id": "2"}], "@odata.deltaLink": f"{delta_url}?token=t1"},
+    )
+    requests_mock.get(
+        f"{delta_url}?token=t1",
+        complete_qs=True,
+        json={
+            "value": [{"id": "2", "deleted": {}}],
+            "@odata.deltaLink": f"{delta_url}?token=t2",
+        },
+    )
+
+    items = list(drive.iter_delta(drive_id="b!1abc", state_path=state_path))
+    assert [{"id": "1"}, {"id": "2"}] == items
+
+    items = list(drive.iter_delta(drive_id="b!1abc", state_path=state_path))
+    assert [{"id": "2", "deleted": {}}] == items
+
+    requests_mock.get(
+        f"{delta_url}?token=t2",
+        complete_qs=True,
+        json={"value": [], "@odata.deltaLink": f"{delta_url}?token=t3"},
+    )
+    items = drive.iter_delta(drive_id="b!1abc", state_path=state_path)
+
+    with pytest.raises(StopIteration) as stop:
+        next(items)
+
+    assert f"{delta_url}?token=t3" == stop.value.value
+
+
+def test_iter_delta_resync(drive: SharePoint, requests_mock: Mocker):
+    delta_url = f"{BASE_GRAPH_URL}/drives/b!1abc/root/delta"
+
+    requests_mock.get(
+        f"{delta_url}?token=expired",
+        complete_qs=True,
+        status_code=410,
+        json={"error": {"code": "resyncRequired", "message": "Resync required"}},
+    )
+    requests_mock.get(
+        delta_url,
+        complete_qs=True,
+        json={"value": [{"id": "1"}], "@odata.deltaLink": f"{delta_url}?token=t1"},
+    )
+
+    items = drive.iter_delta(drive_id="b!1abc", delta_link=f"{delta_url}?token=expired")
+
+    assert [{"id": "1"}] == list(items)
+
+
+def test_sync_folder(drive: SharePoint, requests_mock: Mocker, tmp_path):
+    files = {"a.csv": b"a" * 10, "b.csv": b"b" * 20}
+
+    def item(name, **values):
+        return {
+            "id": name,
+            "name": name,
+            "lastModifiedDateTime": "2022-01-31T12:00:00Z",
+            **values,
+        }
+
+    def file_item(name, content, ctag="c1"):
+        url = f"https://download.example.com/{name}"
+        requests_mock.get(url, content=content)
+        return item(
+            name,
+            file={},
+            size=len(content),
+            cTag=ctag,
+            **{"@microsoft.graph.downloadUrl": url},
+        )
+
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/drives/b!1abc/root:/General:/children",
+        request_headers=REQUEST_HEADERS,
+        json={"value": [file_item("a.csv", files["a.csv"]), item("Sub", folder={})]},
+    )
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/drives/b!1abc/items/Sub/children",
+        request_headers=REQUEST_HEADERS,
+        json={"value": [file_item("b.csv", files["b.csv"])]},
+    )
+    (tmp_path / "old.csv").write_bytes(b"old")
+
+    result = drive.sync_folder(
+        drive_id="b!1abc", folder_path="/General", local_path=str(tmp_path), delete=True
+    )
+
+    assert 2 == result.files_downloaded
+    assert 30 == result.bytes_downloaded
+    assert 1 == result.files_deleted
+    assert files["a.csv"] == (tmp_path / "a.csv").read_bytes()
+    assert files["b.csv"] == (tmp_path / "Sub" / "b.csv").read_bytes()
+    assert not (tmp_path / "old.csv").exists()
+
+    result = drive.sync_folder(
+        drive_id="b!1abc", folder_path="/General", local_path=str(tmp_path)
+    )
+
+    assert 0 == result.files_downloaded
+    assert 2 == result.files_skipped
+
+    # A new cTag means the remote file changed
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/drives/b!1abc/items/Sub/children",
+        json={"value": [file_item("b.csv", b"c" * 20, ctag="c2")]},
+    )
+
+    result = drive.sync_folder(
+        drive_id="b!1abc", folder_path="/General", local_path=str(tmp_path)
+    )
+
+    assert 1 == result.files_downloaded
+    assert b"c" * 20 == (tmp_path / "Sub" / "b.csv").read_bytes()
+
+
+def test_sync_folder_expired_download_url(
+    drive: SharePoint, requests_mock: Mocker, tmp_path
+):
+    expired_url = "https://download.example.com/expired"
+    fresh_url = "https://download.example.com/fresh"
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/drives/b!1abc/root/children",
+        json={
+            "value": [
+                {
+                    "id": "123",
+                    "name": "a.csv",
+                    "file": {},
+                    "size": 3,
+                    "lastModifiedDateTime": "2022-01-31T12:00:00Z",
+                    "@microsoft.graph.downloadUrl": expired_url,
+                }
+            ]
+        },
+    )
+    requests_mock.get(expired_url, status_code=401)
+    requests_mock.get(
+        f"{BASE_GRAPH_URL}/drives/b!1abc/items/123",
+        request_headers=REQUEST_HEADERS,
+        json={"id": "123", "size": 3, "@microsoft.graph.downloadUrl": fresh_url},
+    )
+    requests_mock.get(fresh_url, content=b"abc")
+
+    result = drive.sync_folder(drive_id="b!1abc", local_path=str(tmp_path))
+
+    assert {} == result.errors
+    assert 1 == result.files_downloaded
+    assert b"abc" == (tmp_path / "a.csv").read_bytes()
+
+
+def test_move_item_between_drives(drive: SharePoint, requests_mock: Mocker):
+    monitor_url = "https://monitor.example.com/copy/abc"
+    requests_mock.get(f"{BASE_GRAPH_URL}/drives/b!2def/root", json={"id": "ROOT"})
+    requests_mock.post(
+        f"{BASE_GRAPH_URL}/drives/b!1abc/items/123/copy",
+        status_code=202,
+        headers={"Location": monitor_url},
+    )
+    requests_mock.get(monitor_url, json={"status": "completed", "resourceId": "NEW"})
+    requests_mock.get(f"{BASE_GRAPH_URL}/drives/b!2def/items/NEW", json={"id": "NEW"})
+    delete = requests_mock.delete(
+        f"{BASE_GRAPH_URL}/drives/b!1abc/items/123", status_code=204
+    )
+
+    item = drive.move_item(
+        drive_id="b!1abc", item_id="123", dest_drive_id="b!2def", poll_interval=0
+    )
+
+    assert {"id": "NEW"} == item
+    assert 1 == delete.call_count
+    copy = [r for r in requests_mock.request_history if r.method == "POST"][0]
+    assert {"parentReference": {"driveId": "b!2def", "id": "ROOT"}} == copy.json()
@@ -0,0 +1,29 @@
+import os
+
+from msdrive.state import TransferState, file_identity
+
+
+def test_transfer_state(tmp_path):
+    path = str(tmp_path / "state.json")
+    state = TransferState(path)
+
+    assert {} == state.load()
+
+    state.save(upload_url="https://upload.example.com", ranges=["0-"])
+    assert {"upload_url": "https://upload.example.com", "ranges": ["0-"]} == (
+        TransferState(path).load()
+    )
+
+    state.delete()
+    assert not os.path.exists(path)
+
+
+def test_file_identity(tmp_path):
+    file_path = tmp_path / "file.txt"
+    file_path.write_bytes(b"hello")
+
+    identity = file_identity(str(file_path), "sha256")
+
+    assert 5 == identity["size"]
+    assert identity["sha256"].startswith("2cf24dba")
+    assert "sha256" not in file_identity(str(file_path))
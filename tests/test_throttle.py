@@ -0,0 +1,118 @@
+import time
+
+import pytest
+from msdrive import OneDrive
+from msdrive.constants import BASE_GRAPH_URL
+from msdrive.exceptions import RateLimited
+from msdrive.throttle import Throttle, TokenBucket, parse_retry_after
+from requests_mock import Mocker
+
+ITEM_URL = f"{BASE_GRAPH_URL}/me/drive/items/123"
+THROTTLED = {
+    "status_code": 429,
+    "headers": {"Retry-After": "0"},
+    "json": {"error": {"message": "Rate limited"}},
+}
+
+
+def test_parse_retry_after():
+    assert 5.0 == parse_retry_after("5")
+    assert 0.0 == parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, capacity=1)
+    started = time.monotonic()
+
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - started >= 0.045
+
+
+def test_retries_throttled_requests(requests_mock: Mocker):
+    throttle = Throttle()
+    drive = OneDrive("token123", throttle=throttle)
+    requests_mock.get(
+        ITEM_URL,
+        [THROTTLED, {"status_code": 503, "headers": {"Retry-After": "0"}}]
+        + [{"json": {"id": "123"}}],
+    )
+
+    assert {"id": "123"} == drive.get_item_data(item_id="123")
+    assert 3 == requests_mock.call_count
+    assert 2 == throttle.stats()["throttled"]
+
+
+def test_retries_throttled_requests_without_retry_after(requests_mock: Mocker):
+    throttle = Throttle(backoff_factor=0.01)
+    drive = OneDrive("token123", throttle=throttle)
+    requests_mock.get(ITEM_URL, [{"status_code": 429}, {"json": {"id": "123"}}])
+
+    assert {"id": "123"} == drive.get_item_data(item_id="123")
+    assert 1 == throttle.stats()["throttled"]
+
+
+def test_raises_when_retries_are_exhausted(requests_mock: Mocker):
+    drive = OneDrive("token123", throttle=Throttle(max_retries=2))
+    requests_mock.get(ITEM_URL, [THROTTLED])
+
+    with pytest.raises(RateLimited, match="Rate limited"):
+        drive.get_item_data(item_id="123")
+
+    assert 3 == requests_mock.call_count
+
+
+def test_rewinds_file_bodies(requests_mock: Mocker, tmp_path):
+    file_path = tmp_path / "test.csv"
+    file_path.write_bytes(b"a,b\n1,2\n")
+    drive = OneDrive("token123")
+    bodies = []
+
+    def upload(request, context):
+        bodies.append(request.body.read())
+        context.status_code = 429 if len(bodies) == 1 else 200
+        context.headers["Retry-After"] = "0"
+        return {"error": {"message": "Rate limited"}}
+
+    requests_mock.put(f"{ITEM_URL}/content", json=upload)
+    drive.upload_item(item_id="123", file_path=str(file_path))
+
+    assert [b"a,b\n1,2\n"] * 2 == bodies
+
+
+def test_does_not_resend_generator_bodies(requests_mock: Mocker):
+    drive = OneDrive("token123")
+    requests_mock.put(f"{ITEM_URL}/content", [THROTTLED])
+
+    with pytest.raises(RateLimited):
+        drive._session().put(f"{ITEM_URL}/content", data=(b for b in [b"a", b"b"]))
+
+    assert 1 == requests_mock.call_count
+
+
+def test_retry_after_pauses_shared_throttle(requests_mock: Mocker):
+    throttle = Throttle()
+    drives = [OneDrive("token123", throttle=throttle) for _ in range(2)]
+    requests_mock.get(
+        ITEM_URL,
+        [{**THROTTLED, "headers": {"Retry-After": "0.05"}}, {"json": {}}, {"json": {}}],
+    )
+
+    drives[0].get_item_data(item_id="123")
+    throttle.backoff(0, 0.05)
+    started = time.monotonic()
+    drives[1].get_item_data(item_id="123")
+
+    assert time.monotonic() - started >= 0.04
+    assert throttle.stats()["throttled_seconds"] >= 0.08
+
+
+def test_adapter_leaves_throttled_responses_to_the_throttle():
+    retries = OneDrive("token123")._session().get_adapter(ITEM_URL).max_retries
+
+    assert not retries.is_retry("GET", 429, has_retry_after=True)
+    assert not retries.is_retry("GET", 503, has_retry_after=True)
+    assert retries.is_retry("GET", 502)